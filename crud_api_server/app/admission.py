@@ -0,0 +1,120 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from .config import DB_MAX_CONCURRENCY, DB_MAX_QUEUE, DB_QUEUE_TIMEOUT, DB_RETRY_AFTER
+from .metrics import ADMISSION_REJECTED, ADMISSION_WAIT
+
+# Every call into the database (run_db, run_read) takes a slot first. The
+# slots and the queue live on the event loop, so a request waiting for one
+# holds neither a threadpool thread nor a connection, and a full queue or a
+# long wait is answered with 503 right away instead of piling up behind
+# the connection pool until DB_POOL_TIMEOUT.
+
+BUSY_DETAIL = "Server busy, retry later"
+
+def _busy(reason: str) -> HTTPException:
+    ADMISSION_REJECTED.labels(reason).inc()
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=BUSY_DETAIL,
+        headers={"Retry-After": str(DB_RETRY_AFTER)},
+    )
+
+class Lease:
+    """A slot held beyond one ``async with``, for work that outlives the
+    handler, like a streamed response. Only the first release counts, so
+    every way the work can end may release it."""
+
+    def __init__(self, limiter=None):
+        self._limiter = limiter
+
+    def release(self):
+        limiter, self._limiter = self._limiter, None
+        if limiter is not None:
+            limiter.release()
+
+    async def arelease(self):
+        # For BackgroundTask, which would run a plain function in the
+        # threadpool, off the event loop the limiter lives on.
+        self.release()
+
+class Limiter:
+    """At most ``limit`` holders at a time; up to ``queue`` more wait, in
+    arrival order, for at most ``timeout`` seconds each."""
+
+    def __init__(self, limit: int, queue: int, timeout: float):
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.active = 0
+        self._waiters = deque()
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue:
+            raise _busy("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait((waiter,), timeout=self.timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        ADMISSION_WAIT.observe(time.perf_counter() - started)
+        if not waiter.done():
+            self._abandon(waiter)
+            raise _busy("timeout")
+
+    def release(self):
+        # A released slot goes straight to the next waiter, so active stays.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _abandon(self, waiter):
+        if waiter.done():
+            # Granted while giving up: pass the slot on.
+            self.release()
+        else:
+            self._waiters.remove(waiter)
+            waiter.cancel()
+
+    async def lease(self) -> Lease:
+        """Wait for a slot like ``slot()``, but leave releasing it to the caller."""
+        if self.limit <= 0:
+            return Lease()
+        await self.acquire()
+        return Lease(self)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.limit <= 0:
+            yield
+            return
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+limiter = Limiter(DB_MAX_CONCURRENCY, DB_MAX_QUEUE, DB_QUEUE_TIMEOUT)
+
+async def pool_timeout(request: Request, exc: Exception) -> JSONResponse:
+    """Handler for the pool's TimeoutError: overloaded, not broken."""
+    ADMISSION_REJECTED.labels("pool_timeout").inc()
+    return JSONResponse(
+        {"detail": BUSY_DETAIL},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(DB_RETRY_AFTER)},
+    )
@@ -0,0 +1,98 @@
+import json
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import crud, schemas
+from .config import BULK_CHUNK_SIZE
+from .database import run_db
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+def request_body(schema) -> dict:
+    """OpenAPI description of a bulk body: a JSON array or NDJSON stream of ``schema``."""
+    item = schema.model_json_schema(ref_template="#/components/schemas/{model}")
+    item.pop("$defs", None)
+    content = {
+        "application/json": {"schema": {"type": "array", "items": item}},
+        "application/x-ndjson": {"schema": item},
+    }
+    return {"requestBody": {"required": True, "content": content}}
+
+async def _items(request: Request):
+    """Yield ``(index, object or error message)`` from a JSON array or an NDJSON stream."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_line(buffer)
+        return
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body is not valid JSON")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array")
+    for index, item in enumerate(body):
+        yield index, item
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return ValueError(f"Invalid JSON: {exc}")
+
+async def ingest(request: Request, db, schema, write_chunk, tables) -> schemas.BulkResult:
+    """Validate the rows of a bulk request and write them chunk by chunk
+    with ``write_chunk(session, [(index, item), ...]) -> (written, errors)``.
+
+    All chunks share one transaction, committed once at the end. Rows that
+    fail validation are skipped and reported; the rest are written.
+    ``written`` counts the rows inserted or changed, so duplicates and rows
+    sent unchanged are not in it.
+    """
+    result = schemas.BulkResult(received=0, written=0)
+    chunk = []
+
+    async def flush():
+        written, errors = await run_db(db, write_chunk, chunk)
+        result.written += written
+        result.errors.extend(schemas.BulkRowError(index=index, detail=detail) for index, detail in errors)
+        chunk.clear()
+
+    try:
+        async for index, raw in _items(request):
+            result.received += 1
+            if isinstance(raw, ValueError):
+                result.errors.append(schemas.BulkRowError(index=index, detail=str(raw)))
+                continue
+            try:
+                chunk.append((index, schema.model_validate(raw)))
+            except ValidationError as exc:
+                result.errors.append(schemas.BulkRowError(
+                    index=index, detail=exc.errors(include_url=False, include_context=False, include_input=False),
+                ))
+                continue
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                await flush()
+        if chunk:
+            await flush()
+        await run_db(db, crud.bulk.finish, result.written, *tables)
+    except SQLAlchemyError as exc:
+        await run_db(db, lambda session: session.rollback())
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bulk write rolled back: {getattr(exc, 'orig', exc)}",
+        )
+    result.errors.sort(key=lambda error: error.index)
+    return result
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from functools import partial
+
+from fastapi import Request
+
+from .config import COALESCE_MAX_ENTRIES, COALESCE_READS, COALESCE_TTL
+from .database import run_db, run_read
+from .metrics import COALESCED_READS
+
+# Single-flight for the list endpoints. A read is keyed on the function,
+# its normalized arguments and the table versions the request's ETag was
+# computed from (see app/http_cache.py). The first request with a key runs
+# the query in a task on a read session of its own; requests with the same
+# key arriving while it runs await that task, and for COALESCE_TTL seconds
+# afterwards get its result directly. Any write moves the versions and so
+# the key, which keeps a shared result as fresh as the ETag sent with it.
+# The task is shielded: a waiter going away does not cancel the others'.
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return tuple(sorted((name, _normalize(item)) for name, item in value.items() if item is not None))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+class Coalescer:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight = {}
+        self._recent = {}
+
+    async def run(self, key, fn, *args, **kwargs):
+        recent = self._recent.get(key)
+        if recent is not None and recent[0] > time.monotonic():
+            COALESCED_READS.labels("recent").inc()
+            return recent[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._done, key))
+            COALESCED_READS.labels("executed").inc()
+        else:
+            COALESCED_READS.labels("shared").inc()
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Errors (and cancellation) are never kept: the next request retries.
+        # A TTL or size of 0 keeps nothing, and only shares reads in flight.
+        if task.cancelled() or task.exception() is not None or self.ttl <= 0 or self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        # The TTL is fixed, so insertion order is expiry order.
+        self._recent.pop(key, None)
+        while self._recent and (len(self._recent) >= self.max_entries or next(iter(self._recent.values()))[0] <= now):
+            del self._recent[next(iter(self._recent))]
+        self._recent[key] = (now + self.ttl, task.result())
+
+coalescer = Coalescer(COALESCE_TTL, COALESCE_MAX_ENTRIES)
+
+async def read(request: Request, db, fn, **kwargs):
+    """``run_db(db, fn, **kwargs)``, shared with identical concurrent reads.
+
+    Falls back to the request's own session when coalescing is off or the
+    route has no conditional() dependency to provide table versions.
+    """
+    table_versions = getattr(request.state, "table_versions", None)
+    if not COALESCE_READS or table_versions is None:
+        return await run_db(db, fn, **kwargs)
+    key = (fn.__module__, fn.__qualname__, _normalize(table_versions), _normalize(kwargs))
+    return await coalescer.run(key, run_read, fn, **kwargs)
@@ -0,0 +1 @@
+from . import bulk, domains, subdomains, skills, job_titles, links
@@ -0,0 +1,44 @@
+import uuid
+
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .. import versions
+
+def upsert(db: Session, model, items) -> int:
+    """Write ``(index, schema)`` pairs as INSERT ... ON CONFLICT (id) DO
+    UPDATE and return how many rows were inserted or changed. Rows without
+    an id get a fresh one; an existing row that would not change is left
+    alone and not counted.
+
+    The statement is executed with the whole list of parameter sets, which
+    SQLAlchemy's "insertmanyvalues" batching sends as multi-row VALUES
+    statements from a single cached compilation.
+    """
+    rows = {}
+    for _, item in items:
+        row = item.model_dump()
+        row["id"] = row["id"] or uuid.uuid4()
+        # Postgres rejects a statement that updates the same row twice;
+        # the last occurrence of an id wins, as it would row by row.
+        rows[row["id"]] = row
+    if not rows:
+        return 0
+    table = model.__table__
+    stmt = insert(table)
+    columns = [column for column in table.columns if column.name != "id"]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={column.name: stmt.excluded[column.name] for column in columns},
+        where=or_(*(column.is_distinct_from(stmt.excluded[column.name]) for column in columns)),
+    )
+    return len(db.execute(stmt.returning(table.c.id), list(rows.values())).all())
+
+def existing_ids(db: Session, column, ids) -> set:
+    return set(db.scalars(select(column).where(column.in_(set(ids)))))
+
+def finish(db: Session, written: int, *tables: str):
+    if written:
+        versions.bump(db, *tables)
+    db.commit()
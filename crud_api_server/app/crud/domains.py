@@ -0,0 +1,58 @@
+import uuid
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from .. import graph, models, schemas, versions
+from . import bulk
+from ..filters import DOMAIN_FILTERS
+from ..pagination import paginate
+
+# Response fields, in DomainResponse order, for the FAST_SERIALIZATION list path.
+DOMAIN_COLUMNS = (models.Domain.domain, models.Domain.id)
+
+def create_domain(db: Session, domain: schemas.DomainCreate):
+    table = models.Domain.__table__
+    stmt = insert(table).values(id=uuid.uuid4(), domain=domain.domain).returning(*table.c)
+    row = versions.write(db, stmt, "domain")[0]
+    db.commit()
+    return row._asdict()
+
+def list_domains(db: Session, after=None, skip: int = 0, limit: int = 100, as_dicts: bool = False, **filters):
+    snapshot = graph.snapshot(db)
+    if snapshot is not None:
+        items = snapshot.list_domains(after=after, skip=skip, limit=limit, **filters)
+        if items is not None:
+            return items
+    query = DOMAIN_FILTERS.apply(db.query(models.Domain), **filters)
+    if as_dicts:
+        query = query.with_entities(*DOMAIN_COLUMNS)
+    rows = paginate(query, models.Domain.domain, models.Domain.id, after=after, skip=skip, limit=limit)
+    return [row._asdict() for row in rows] if as_dicts else rows
+
+def get_domain(db: Session, domain_id):
+    return db.query(models.Domain).filter(models.Domain.id == domain_id).first()
+
+def update_domain(db: Session, domain_id, domain: schemas.DomainUpdate):
+    changes = domain.model_dump(exclude_unset=True, exclude_none=True)
+    if not changes:
+        return get_domain(db, domain_id)
+    table = models.Domain.__table__
+    stmt = update(table).where(table.c.id == domain_id).values(**changes).returning(*table.c)
+    rows = versions.write(db, stmt, "domain")
+    if not rows:
+        return None
+    db.commit()
+    return rows[0]._asdict()
+
+def delete_domain(db: Session, domain_id) -> bool:
+    # Subdomains and their links go with it through ON DELETE CASCADE.
+    table = models.Domain.__table__
+    stmt = delete(table).where(table.c.id == domain_id).returning(table.c.id)
+    if not versions.write(db, stmt, "domain", "subdomain", "skill_subdomain", "job_title_subdomain"):
+        return False
+    db.commit()
+    return True
+
+def bulk_upsert_domains(db: Session, items):
+    return bulk.upsert(db, models.Domain, items), []
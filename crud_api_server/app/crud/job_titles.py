@@ -0,0 +1,64 @@
+import uuid
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from .. import graph, models, schemas, versions
+from . import bulk
+from ..filters import JOB_TITLE_FILTERS
+from ..pagination import paginate
+from ..serialization import raw
+
+# Response fields, in JobTitleResponse order, for the FAST_SERIALIZATION list path.
+JOB_TITLE_COLUMNS = (
+    models.JobTitle.job_title,
+    raw(models.JobTitle.synonyms_en),
+    raw(models.JobTitle.synonyms_jp),
+    models.JobTitle.id,
+)
+
+def create_job_title(db: Session, job_title: schemas.JobTitleCreate):
+    table = models.JobTitle.__table__
+    stmt = insert(table).values(id=uuid.uuid4(), **job_title.model_dump()).returning(*table.c)
+    row = versions.write(db, stmt, "job_title")[0]
+    db.commit()
+    return row._asdict()
+
+def list_job_titles(db: Session, after=None, skip: int = 0, limit: int = 100, options=(), as_dicts: bool = False, **filters):
+    snapshot = graph.snapshot(db)
+    if snapshot is not None and not options:
+        items = snapshot.list_job_titles(after=after, skip=skip, limit=limit, **filters)
+        if items is not None:
+            return items
+    query = JOB_TITLE_FILTERS.apply(db.query(models.JobTitle).options(*options), **filters)
+    if as_dicts:
+        query = query.with_entities(*JOB_TITLE_COLUMNS)
+    rows = paginate(query, models.JobTitle.job_title, models.JobTitle.id, after=after, skip=skip, limit=limit)
+    return [row._asdict() for row in rows] if as_dicts else rows
+
+def get_job_title(db: Session, job_title_id, options=()):
+    return db.query(models.JobTitle).options(*options).filter(models.JobTitle.id == job_title_id).first()
+
+def update_job_title(db: Session, job_title_id, job_title: schemas.JobTitleUpdate):
+    changes = job_title.model_dump(exclude_unset=True, exclude_none=True)
+    if not changes:
+        return get_job_title(db, job_title_id)
+    table = models.JobTitle.__table__
+    stmt = update(table).where(table.c.id == job_title_id).values(**changes).returning(*table.c)
+    rows = versions.write(db, stmt, "job_title")
+    if not rows:
+        return None
+    db.commit()
+    return rows[0]._asdict()
+
+def delete_job_title(db: Session, job_title_id) -> bool:
+    # Link rows go with it through ON DELETE CASCADE.
+    table = models.JobTitle.__table__
+    stmt = delete(table).where(table.c.id == job_title_id).returning(table.c.id)
+    if not versions.write(db, stmt, "job_title", "job_title_core_skill", "job_title_subdomain"):
+        return False
+    db.commit()
+    return True
+
+def bulk_upsert_job_titles(db: Session, items):
+    return bulk.upsert(db, models.JobTitle, items), []
@@ -0,0 +1,72 @@
+from sqlalchemy import bindparam, delete, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlalchemy.orm import Session
+
+from .. import models, versions
+
+def link(db: Session, model, pairs) -> int:
+    """Insert ``(left, right)`` pairs, ignoring ones that already exist.
+    Returns how many were new. Versions only move if something changed,
+    here and in unlink() and replace()."""
+    if not pairs:
+        return 0
+    table = model.__table__
+    left, right = table.primary_key.columns
+    stmt = insert(table).on_conflict_do_nothing().returning(left)
+    inserted = db.execute(stmt, [{left.name: a, right.name: b} for a, b in dict.fromkeys(pairs)]).all()
+    if inserted:
+        versions.bump(db, table.name)
+    db.commit()
+    return len(inserted)
+
+def unlink(db: Session, model, pairs) -> int:
+    if not pairs:
+        return 0
+    table = model.__table__
+    left, right = table.primary_key.columns
+    result = db.execute(delete(table).where(tuple_(left, right).in_(list(pairs))))
+    if result.rowcount > 0:
+        versions.bump(db, table.name)
+    db.commit()
+    return result.rowcount
+
+def replace(db: Session, model, owner_model, owner_column: str, other_column: str, owner_id, other_ids):
+    """Make ``other_ids`` the exact set linked to ``owner_id`` in a single
+    statement. Returns ``(added, removed)``, or None if the owner does not exist."""
+    table = model.__table__.name
+    owner_table = owner_model.__table__.name
+    stmt = text(f"""
+        WITH owner AS (
+            SELECT id FROM {owner_table} WHERE id = :owner_id
+        ), removed AS (
+            DELETE FROM {table}
+            WHERE {owner_column} = :owner_id AND NOT ({other_column} = ANY(:other_ids))
+            RETURNING 1
+        ), added AS (
+            INSERT INTO {table} ({owner_column}, {other_column})
+            SELECT owner.id, other_id FROM owner, unnest(:other_ids) AS other_id
+            ON CONFLICT DO NOTHING
+            RETURNING 1
+        )
+        SELECT EXISTS (SELECT 1 FROM owner), (SELECT count(*) FROM added), (SELECT count(*) FROM removed)
+    """).bindparams(
+        bindparam("owner_id", type_=UUID(as_uuid=True)),
+        bindparam("other_ids", type_=ARRAY(UUID(as_uuid=True))),
+    )
+    found, added, removed = db.execute(stmt, {"owner_id": owner_id, "other_ids": list(dict.fromkeys(other_ids))}).one()
+    if not found:
+        db.rollback()
+        return None
+    if added or removed:
+        versions.bump(db, table)
+    db.commit()
+    return added, removed
+
+def replace_job_title_core_skills(db: Session, job_title_id, skill_ids):
+    return replace(db, models.JobTitleCoreSkill, models.JobTitle, "job_title_id", "skill_id", job_title_id, skill_ids)
+
+def replace_job_title_subdomains(db: Session, job_title_id, subdomain_ids):
+    return replace(db, models.JobTitleSubdomain, models.JobTitle, "job_title_id", "subdomain_id", job_title_id, subdomain_ids)
+
+def replace_skill_subdomains(db: Session, skill_id, subdomain_ids):
+    return replace(db, models.SkillSubdomain, models.Skill, "skill_id", "subdomain_id", skill_id, subdomain_ids)
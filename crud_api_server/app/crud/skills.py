@@ -0,0 +1,68 @@
+import uuid
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from .. import graph, models, schemas, versions
+from . import bulk
+from ..filters import SKILL_FILTERS
+from ..pagination import paginate
+from ..serialization import raw
+
+# Response fields, in SkillResponse order, for the FAST_SERIALIZATION list path.
+SKILL_COLUMNS = (
+    models.Skill.skill_name_en,
+    models.Skill.skill_name_jp,
+    raw(models.Skill.skill_type),
+    raw(models.Skill.synonyms_en),
+    raw(models.Skill.synonyms_jp),
+    models.Skill.id,
+)
+
+def create_skill(db: Session, skill: schemas.SkillCreate):
+    table = models.Skill.__table__
+    stmt = insert(table).values(id=uuid.uuid4(), **skill.model_dump()).returning(*table.c)
+    row = versions.write(db, stmt, "skill")[0]
+    db.commit()
+    return row._asdict()
+
+def list_skills(db: Session, after=None, skip: int = 0, limit: int = 100, options=(), as_dicts: bool = False, **filters):
+    snapshot = graph.snapshot(db)
+    if snapshot is not None and not options:
+        items = snapshot.list_skills(after=after, skip=skip, limit=limit, **filters)
+        if items is not None:
+            return items
+    query = SKILL_FILTERS.apply(db.query(models.Skill).options(*options), **filters)
+    if as_dicts:
+        query = query.with_entities(*SKILL_COLUMNS)
+    rows = paginate(query, models.Skill.skill_name_en, models.Skill.id, after=after, skip=skip, limit=limit)
+    return [row._asdict() for row in rows] if as_dicts else rows
+
+def get_skill(db: Session, skill_id, options=()):
+    return db.query(models.Skill).options(*options).filter(models.Skill.id == skill_id).first()
+
+def update_skill(db: Session, skill_id, skill: schemas.SkillUpdate):
+    # Omitted fields and explicit nulls keep their values; only the Japanese
+    # name can be cleared.
+    changes = {key: value for key, value in skill.model_dump(exclude_unset=True).items() if value is not None or key == "skill_name_jp"}
+    if not changes:
+        return get_skill(db, skill_id)
+    table = models.Skill.__table__
+    stmt = update(table).where(table.c.id == skill_id).values(**changes).returning(*table.c)
+    rows = versions.write(db, stmt, "skill")
+    if not rows:
+        return None
+    db.commit()
+    return rows[0]._asdict()
+
+def delete_skill(db: Session, skill_id) -> bool:
+    # Link rows go with it through ON DELETE CASCADE.
+    table = models.Skill.__table__
+    stmt = delete(table).where(table.c.id == skill_id).returning(table.c.id)
+    if not versions.write(db, stmt, "skill", "skill_subdomain", "job_title_core_skill"):
+        return False
+    db.commit()
+    return True
+
+def bulk_upsert_skills(db: Session, items):
+    return bulk.upsert(db, models.Skill, items), []
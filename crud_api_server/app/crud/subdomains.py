@@ -0,0 +1,75 @@
+import uuid
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session, aliased, joinedload
+
+from .. import graph, models, schemas, versions
+from . import bulk
+from ..filters import SUBDOMAIN_FILTERS
+from ..pagination import paginate
+
+def _with_domain(changed):
+    # The written row joined to its parent, so the response never lazy-loads.
+    return select(changed, models.Domain.domain.label("parent_domain")).join(models.Domain, models.Domain.id == changed.c.domain_id)
+
+def _response(row):
+    return {"subdomain": row.subdomain, "domain_id": row.domain_id, "id": row.id, "domain": {"domain": row.parent_domain, "id": row.domain_id}}
+
+def create_subdomain(db: Session, subdomain: schemas.SubdomainCreate):
+    table = models.Subdomain.__table__
+    stmt = insert(table).values(id=uuid.uuid4(), subdomain=subdomain.subdomain, domain_id=subdomain.domain_id).returning(*table.c)
+    row = versions.write(db, stmt, "subdomain", query=_with_domain)[0]
+    db.commit()
+    return _response(row)
+
+def list_subdomains(db: Session, after=None, skip: int = 0, limit: int = 100, options=(), as_dicts: bool = False, **filters):
+    snapshot = graph.snapshot(db)
+    if snapshot is not None and not options:
+        items = snapshot.list_subdomains(after=after, skip=skip, limit=limit, **filters)
+        if items is not None:
+            return items
+    if as_dicts:
+        # Aliased so the domain_name EXISTS keeps its own domain table.
+        parent = aliased(models.Domain)
+        query = db.query(
+            models.Subdomain.subdomain, models.Subdomain.domain_id, models.Subdomain.id, parent.domain, parent.id,
+        ).select_from(models.Subdomain).join(parent, models.Subdomain.domain)
+    else:
+        query = db.query(models.Subdomain).options(joinedload(models.Subdomain.domain), *options)
+    query = SUBDOMAIN_FILTERS.apply(query, **filters)
+    rows = paginate(query, models.Subdomain.subdomain, models.Subdomain.id, after=after, skip=skip, limit=limit)
+    if as_dicts:
+        return [
+            {"subdomain": name, "domain_id": domain_id, "id": id, "domain": {"domain": domain, "id": parent_id}}
+            for name, domain_id, id, domain, parent_id in rows
+        ]
+    return rows
+
+def get_subdomain(db: Session, subdomain_id, options=()):
+    return db.query(models.Subdomain).options(joinedload(models.Subdomain.domain), *options).filter(models.Subdomain.id == subdomain_id).first()
+
+def update_subdomain(db: Session, subdomain_id, subdomain: schemas.SubdomainUpdate):
+    changes = subdomain.model_dump(exclude_unset=True, exclude_none=True)
+    if not changes:
+        return get_subdomain(db, subdomain_id)
+    table = models.Subdomain.__table__
+    stmt = update(table).where(table.c.id == subdomain_id).values(**changes).returning(*table.c)
+    rows = versions.write(db, stmt, "subdomain", query=_with_domain)
+    if not rows:
+        return None
+    db.commit()
+    return _response(rows[0])
+
+def delete_subdomain(db: Session, subdomain_id) -> bool:
+    table = models.Subdomain.__table__
+    stmt = delete(table).where(table.c.id == subdomain_id).returning(table.c.id)
+    if not versions.write(db, stmt, "subdomain", "skill_subdomain", "job_title_subdomain"):
+        return False
+    db.commit()
+    return True
+
+def bulk_upsert_subdomains(db: Session, items):
+    known = bulk.existing_ids(db, models.Domain.id, [item.domain_id for _, item in items])
+    valid = [(index, item) for index, item in items if item.domain_id in known]
+    errors = [(index, "Domain not found") for index, item in items if item.domain_id not in known]
+    return bulk.upsert(db, models.Subdomain, valid), errors
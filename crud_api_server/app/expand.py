@@ -0,0 +1,84 @@
+from typing import List
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import selectinload
+
+from . import models, schemas
+from .serialization import json_response
+
+# ``expand=`` on the read endpoints embeds related rows. Each relation is
+# loaded with one selectinload through its association table, with the
+# target (and a subdomain's domain) joined onto that same SELECT, so a page
+# costs one query plus one per expanded relation whatever its size.
+
+def expand_query(choices):
+    return Query(
+        [],
+        description=f"Embed related rows: {', '.join(choices)}. Repeat the parameter or separate values with commas.",
+    )
+
+class Expansion:
+    def __init__(self, loaders, models_by_names):
+        self.loaders = loaders
+        self.choices = tuple(loaders)
+        self.adapters = {
+            frozenset(names): (TypeAdapter(model), TypeAdapter(List[model]))
+            for names, model in models_by_names.items()
+        }
+
+    def parse(self, values: List[str]) -> frozenset:
+        names = frozenset(name.strip() for value in values for name in value.split(",") if name.strip())
+        unknown = names.difference(self.choices)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown expand value(s): {', '.join(sorted(unknown))}; expected {', '.join(self.choices)}",
+            )
+        return names
+
+    def options(self, names):
+        return [self.loaders[name] for name in self.choices if name in names]
+
+    def response(self, names, result, response: Response = None) -> Response:
+        """Serialize ``result`` (one ORM row or a list) with the schema for ``names``,
+        keeping headers already set on ``response``."""
+        one, many = self.adapters[names]
+        adapter = many if isinstance(result, list) else one
+        return json_response(adapter.dump_json(adapter.validate_python(result, from_attributes=True)), response)
+
+def _through(relationship, target, *nested):
+    loader = selectinload(relationship).joinedload(target)
+    for attribute in nested:
+        loader = loader.joinedload(attribute)
+    return loader
+
+SUBDOMAIN_EXPAND = Expansion(
+    loaders={
+        "skills": _through(models.Subdomain.skills, models.SkillSubdomain.skill),
+    },
+    models_by_names={
+        ("skills",): schemas.SubdomainWithSkills,
+    },
+)
+
+SKILL_EXPAND = Expansion(
+    loaders={
+        "subdomains": _through(models.Skill.subdomains, models.SkillSubdomain.subdomain, models.Subdomain.domain),
+    },
+    models_by_names={
+        ("subdomains",): schemas.SkillWithSubdomains,
+    },
+)
+
+JOB_TITLE_EXPAND = Expansion(
+    loaders={
+        "core_skills": _through(models.JobTitle.core_skills, models.JobTitleCoreSkill.skill),
+        "subdomains": _through(models.JobTitle.subdomains, models.JobTitleSubdomain.subdomain, models.Subdomain.domain),
+    },
+    models_by_names={
+        ("core_skills",): schemas.JobTitleWithSkills,
+        ("subdomains",): schemas.JobTitleWithSubdomains,
+        ("core_skills", "subdomains"): schemas.JobTitleWithSkillsAndSubdomains,
+    },
+)
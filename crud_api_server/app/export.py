@@ -0,0 +1,144 @@
+import csv
+import enum
+import io
+import json
+import zlib
+
+from pydantic_core import to_json
+from sqlalchemy import select
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from . import models
+from .admission import Lease
+from .config import EXPORT_BATCH_SIZE
+from .database import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal, use_async_replica, use_replica
+
+# Exports read each table through a server-side cursor (yield_per), encode
+# one batch of rows at a time and hand it to the response as it is
+# produced, so memory stays flat however large the tables are. All tables
+# of one export are read in a single REPEATABLE READ transaction, which
+# makes a full-graph export a consistent snapshot. An export holds an
+# admission slot (app/admission.py) for as long as it streams, like any
+# other database work.
+
+class ExportTable(str, enum.Enum):
+    domain = "domain"
+    subdomain = "subdomain"
+    skill = "skill"
+    job_title = "job_title"
+    skill_subdomain = "skill_subdomain"
+    job_title_core_skill = "job_title_core_skill"
+    job_title_subdomain = "job_title_subdomain"
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+# Entities before the edges that reference them.
+_MODELS = {
+    ExportTable.domain: models.Domain,
+    ExportTable.subdomain: models.Subdomain,
+    ExportTable.skill: models.Skill,
+    ExportTable.job_title: models.JobTitle,
+    ExportTable.skill_subdomain: models.SkillSubdomain,
+    ExportTable.job_title_core_skill: models.JobTitleCoreSkill,
+    ExportTable.job_title_subdomain: models.JobTitleSubdomain,
+}
+ALL_TABLES = tuple(_MODELS)
+
+def _statement(table: ExportTable):
+    table = _MODELS[table].__table__
+    return select(table).order_by(*table.primary_key.columns)
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+class ExportWriter:
+    """Encodes batches of rows to NDJSON or CSV, optionally gzipping the stream.
+
+    With ``tagged`` every NDJSON line carries the table it came from in a
+    ``type`` field, so several tables can share one stream.
+    """
+
+    def __init__(self, format: ExportFormat, gzip: bool = False, tagged: bool = False):
+        self.format = format
+        self.tagged = tagged
+        self._compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if gzip else None
+
+    def _out(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) if self._compressor else data
+
+    def start(self, table: ExportTable, columns) -> bytes:
+        if self.format is ExportFormat.csv:
+            return self.rows(table, columns, [columns])
+        return b""
+
+    def rows(self, table: ExportTable, columns, rows) -> bytes:
+        if self.format is ExportFormat.csv:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            return self._out(buffer.getvalue().encode())
+        prefix = {"type": table.value} if self.tagged else {}
+        lines = [to_json({**prefix, **dict(zip(columns, row))}) for row in rows]
+        return self._out(b"\n".join(lines) + b"\n")
+
+    def close(self) -> bytes:
+        return self._compressor.flush() if self._compressor else b""
+
+def stream(tables, writer: ExportWriter, lease: Lease):
+    """An async iterator of encoded chunks, read on the asyncpg engine or in
+    the threadpool, that releases ``lease`` when it ends or is closed."""
+    if AsyncSessionLocal is not None:
+        return _holding(lease, _stream_async(tables, writer))
+    chunks = _stream_sync(tables, writer)
+    return _holding(lease, iterate_in_threadpool(chunks), close=chunks.close)
+
+async def _holding(lease: Lease, chunks, close=None):
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        try:
+            await chunks.aclose()
+            # iterate_in_threadpool does not close the generator it wraps,
+            # which would leave its session open until garbage collection
+            # and then close it on the event loop thread.
+            if close is not None:
+                await run_in_threadpool(close)
+        finally:
+            lease.release()
+
+# The export opens its own session: request-scoped dependencies are closed
+# once the handler returns, before the response body is streamed.
+
+def _stream_sync(tables, writer: ExportWriter):
+    with (ReadSessionLocal if use_replica() else SessionLocal)() as db:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        for table in tables:
+            result = db.execute(_statement(table), execution_options={"yield_per": EXPORT_BATCH_SIZE})
+            columns = list(result.keys())
+            yield writer.start(table, columns)
+            for partition in result.partitions():
+                yield writer.rows(table, columns, partition)
+        yield writer.close()
+
+async def _stream_async(tables, writer: ExportWriter):
+    async with (AsyncReadSessionLocal if await use_async_replica() else AsyncSessionLocal)() as db:
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        for table in tables:
+            result = await db.stream(_statement(table), execution_options={"yield_per": EXPORT_BATCH_SIZE})
+            columns = list(result.keys())
+            yield writer.start(table, columns)
+            async for partition in result.partitions():
+                yield writer.rows(table, columns, partition)
+        yield writer.close()
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import BigInteger, String, column, func, select, table, text
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import models, versions
+from .config import FACETS_REFRESH_INTERVAL
+from .database import SessionLocal, run_db
+from .pagination import paginate
+from .serialization import json_response
+
+logger = logging.getLogger(__name__)
+
+# Facet counts are read from materialized views (migration 0004), so they
+# cost the same however large the taxonomy is. Each worker checks every
+# FACETS_REFRESH_INTERVAL seconds whether a view's source tables changed
+# since its last refresh, comparing the sum of their versions (versions
+# only grow) with the one recorded in facet_refresh. The refresh runs under
+# a transaction-level advisory lock and re-checks after taking it, so one
+# worker refreshes and the others find nothing left to do. A refresh bumps
+# the "facets" version, which the ETags of facet responses include. The
+# first check runs as soon as the app starts, since the data may have been
+# loaded after the views were created; it runs in the background, so
+# startup does not wait on the database.
+#
+# The counts are global: include_facets=true on a list endpoint sends the
+# same counts over the whole taxonomy whatever the list's filters, not
+# counts over the filtered rows.
+
+VIEWS = {
+    "facet_skill_type": ("skill",),
+    "facet_domain": ("domain", "subdomain", "skill_subdomain", "job_title_subdomain"),
+    "facet_subdomain": ("subdomain", "skill_subdomain", "job_title_subdomain"),
+    "facet_job_title": ("job_title", "job_title_core_skill"),
+}
+VERSION_TABLE = "facets"
+# For conditional(): list responses only read the views with include_facets=true.
+INCLUDE_TABLES = {"include_facets": (VERSION_TABLE,)}
+LOCK_ID = 0x66616365747300  # b"facets"
+
+skill_type_view = table("facet_skill_type", column("skill_type", String), column("skills", BigInteger))
+domain_view = table(
+    "facet_domain",
+    column("id", UUID(as_uuid=True)), column("domain", String),
+    column("subdomains", BigInteger), column("skills", BigInteger), column("job_titles", BigInteger),
+)
+subdomain_view = table(
+    "facet_subdomain",
+    column("id", UUID(as_uuid=True)), column("subdomain", String), column("domain_id", UUID(as_uuid=True)),
+    column("skills", BigInteger), column("job_titles", BigInteger),
+)
+job_title_view = table(
+    "facet_job_title",
+    column("id", UUID(as_uuid=True)), column("job_title", String), column("core_skills", BigInteger),
+)
+
+def _behind(db: Session) -> dict:
+    """The views whose source tables changed since their last refresh, with
+    the source version each would be refreshed to."""
+    current = versions.read(db, sorted({name for tables in VIEWS.values() for name in tables}))
+    refreshed = dict(db.execute(select(models.FacetRefresh.view_name, models.FacetRefresh.source_version)).all())
+    behind = {}
+    for view, tables in VIEWS.items():
+        source = sum(current[name] for name in tables)
+        if refreshed.get(view, -1) < source:
+            behind[view] = source
+    return behind
+
+def refresh(db: Session) -> list:
+    """Refresh the stale views; returns their names. Returns [] without
+    waiting if another worker is refreshing."""
+    if not _behind(db):
+        db.rollback()
+        return []
+    if not db.execute(select(func.pg_try_advisory_xact_lock(LOCK_ID))).scalar():
+        db.rollback()
+        return []
+    behind = _behind(db)
+    for view, source in behind.items():
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+        stmt = insert(models.FacetRefresh).values(view_name=view, source_version=source, refreshed_at=func.now())
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[models.FacetRefresh.view_name],
+            set_={"source_version": stmt.excluded.source_version, "refreshed_at": stmt.excluded.refreshed_at},
+        ))
+    if behind:
+        versions.bump(db, VERSION_TABLE)
+    db.commit()
+    return list(behind)
+
+def _refresh_once():
+    with SessionLocal() as db:
+        refreshed = refresh(db)
+    if refreshed:
+        logger.info("refreshed %s", ", ".join(refreshed))
+
+@asynccontextmanager
+async def refresher(interval: float = FACETS_REFRESH_INTERVAL):
+    """Keep the views fresh in the background while the app runs, starting
+    with a refresh right away."""
+
+    async def loop():
+        while True:
+            try:
+                await run_in_threadpool(_refresh_once)
+            except Exception:
+                logger.exception("facet refresh failed")
+            await asyncio.sleep(interval)
+
+    task = asyncio.create_task(loop())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+def skill_types(db: Session):
+    return [row._asdict() for row in db.execute(select(skill_type_view).order_by(skill_type_view.c.skill_type))]
+
+def domains(db: Session):
+    return [row._asdict() for row in db.execute(select(domain_view).order_by(domain_view.c.domain, domain_view.c.id))]
+
+def subdomains(db: Session, domain_id=None, after=None, skip: int = 0, limit: int = 100):
+    query = db.query(subdomain_view)
+    if domain_id is not None:
+        query = query.filter(subdomain_view.c.domain_id == domain_id)
+    rows = paginate(query, subdomain_view.c.subdomain, subdomain_view.c.id, after=after, skip=skip, limit=limit)
+    return [row._asdict() for row in rows]
+
+def job_titles(db: Session, after=None, skip: int = 0, limit: int = 100):
+    rows = paginate(db.query(job_title_view), job_title_view.c.job_title, job_title_view.c.id, after=after, skip=skip, limit=limit)
+    return [row._asdict() for row in rows]
+
+# The facets a list endpoint can send along with its page.
+LIST_FACETS = {"skill_type": skill_types, "domain": domains}
+INCLUDE_DESCRIPTION = (
+    'Return {"items": [...], "facets": {...}}: the page, plus counts over the whole taxonomy '
+    "as served by /facets. The counts ignore this request's filters: they are not counts of "
+    "the filtered list."
+)
+
+def for_list(db: Session, names) -> dict:
+    return {name: LIST_FACETS[name](db) for name in names}
+
+def envelope(result, facets: dict, adapter: TypeAdapter, response=None):
+    """``{"items": ..., "facets": ...}`` around a list endpoint's result:
+    a list of rows, or a Response already holding their JSON."""
+    if hasattr(result, "body"):
+        items = result.body
+    else:
+        items = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+    return json_response(b'{"items":' + items + b',"facets":' + to_json(facets) + b"}", response)
+
+async def include(db, names, result, adapter: TypeAdapter, response=None):
+    return envelope(result, await run_db(db, for_list, names), adapter, response)
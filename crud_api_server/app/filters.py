@@ -0,0 +1,124 @@
+from sqlalchemy import select
+
+from . import models
+
+# List filters are compiled into at most one EXISTS per related table
+# instead of one JOIN per filter. Every filter that goes through the same
+# relation lands in the same semi-join, so combining e.g. skill_name_en and
+# skill_type means "has a core skill matching both", the outer query never
+# multiplies rows, and LIMIT counts distinct entities.
+
+class Relation:
+    """A semi-join path from the listed entity: a link table correlated to
+    the outer row, followed by the tables that can be joined from it."""
+
+    def __init__(self, link, correlate, joins=()):
+        self.link = link
+        self.correlate = correlate
+        self.joins = tuple(joins)
+
+class Filter:
+    """``condition(value)`` applied directly to the listed entity, or inside
+    ``relation`` once its first ``depth`` joins are in place."""
+
+    def __init__(self, condition, relation=None, depth=0):
+        self.condition = condition
+        self.relation = relation
+        self.depth = depth
+
+class FilterSet:
+    def __init__(self, relations, filters):
+        self.relations = relations
+        self.filters = filters
+
+    def apply(self, query, **values):
+        direct = []
+        grouped = {}
+        for name, value in values.items():
+            if not value:
+                continue
+            f = self.filters[name]
+            if f.relation is None:
+                direct.append(f.condition(value))
+                continue
+            depth, conditions = grouped.get(f.relation, (0, []))
+            grouped[f.relation] = (max(depth, f.depth), conditions + [f.condition(value)])
+
+        for relation_name, (depth, conditions) in grouped.items():
+            relation = self.relations[relation_name]
+            semi_join = select(1).select_from(relation.link)
+            for target in relation.joins[:depth]:
+                semi_join = semi_join.join(target)
+            query = query.filter(semi_join.where(relation.correlate, *conditions).exists())
+        if direct:
+            query = query.filter(*direct)
+        return query
+
+def _ilike(column):
+    # The value is matched literally: % and _ in it are not wildcards, as in
+    # the graph snapshot (app/graph.py), which answers the same filters.
+    def condition(value):
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return column.ilike(f"%{escaped}%", escape="\\")
+    return condition
+
+DOMAIN_FILTERS = FilterSet(
+    relations={
+        "subdomain": Relation(models.Subdomain, models.Subdomain.domain_id == models.Domain.id),
+    },
+    filters={
+        "subdomain_name": Filter(_ilike(models.Subdomain.subdomain), "subdomain"),
+    },
+)
+
+SUBDOMAIN_FILTERS = FilterSet(
+    relations={
+        "domain": Relation(models.Domain, models.Domain.id == models.Subdomain.domain_id),
+        "skill": Relation(models.SkillSubdomain, models.SkillSubdomain.subdomain_id == models.Subdomain.id, joins=[models.Skill]),
+    },
+    filters={
+        "domain_id": Filter(lambda value: models.Subdomain.domain_id == value),
+        "domain_name": Filter(_ilike(models.Domain.domain), "domain"),
+        "skill_name_en": Filter(_ilike(models.Skill.skill_name_en), "skill", depth=1),
+    },
+)
+
+SKILL_FILTERS = FilterSet(
+    relations={
+        "subdomain": Relation(
+            models.SkillSubdomain, models.SkillSubdomain.skill_id == models.Skill.id,
+            joins=[models.Subdomain, models.Domain],
+        ),
+        "job_title": Relation(models.JobTitleCoreSkill, models.JobTitleCoreSkill.skill_id == models.Skill.id, joins=[models.JobTitle]),
+    },
+    filters={
+        "skill_type": Filter(lambda value: models.Skill.skill_type == value),
+        "synonym_en": Filter(lambda value: models.Skill.synonyms_en.contains([value])),
+        "subdomain_id": Filter(lambda value: models.SkillSubdomain.subdomain_id == value, "subdomain"),
+        "subdomain_name": Filter(_ilike(models.Subdomain.subdomain), "subdomain", depth=1),
+        "domain_id": Filter(lambda value: models.Subdomain.domain_id == value, "subdomain", depth=1),
+        "domain_name": Filter(_ilike(models.Domain.domain), "subdomain", depth=2),
+        "job_title_id": Filter(lambda value: models.JobTitleCoreSkill.job_title_id == value, "job_title"),
+        "job_title_name": Filter(_ilike(models.JobTitle.job_title), "job_title", depth=1),
+    },
+)
+
+JOB_TITLE_FILTERS = FilterSet(
+    relations={
+        "skill": Relation(models.JobTitleCoreSkill, models.JobTitleCoreSkill.job_title_id == models.JobTitle.id, joins=[models.Skill]),
+        "subdomain": Relation(
+            models.JobTitleSubdomain, models.JobTitleSubdomain.job_title_id == models.JobTitle.id,
+            joins=[models.Subdomain, models.Domain],
+        ),
+    },
+    filters={
+        "synonym_en": Filter(lambda value: models.JobTitle.synonyms_en.contains([value])),
+        "skill_id": Filter(lambda value: models.JobTitleCoreSkill.skill_id == value, "skill"),
+        "skill_name_en": Filter(_ilike(models.Skill.skill_name_en), "skill", depth=1),
+        "skill_type": Filter(lambda value: models.Skill.skill_type == value, "skill", depth=1),
+        "subdomain_id": Filter(lambda value: models.JobTitleSubdomain.subdomain_id == value, "subdomain"),
+        "subdomain_name": Filter(_ilike(models.Subdomain.subdomain), "subdomain", depth=1),
+        "domain_id": Filter(lambda value: models.Subdomain.domain_id == value, "subdomain", depth=1),
+        "domain_name": Filter(_ilike(models.Domain.domain), "subdomain", depth=2),
+    },
+)
@@ -0,0 +1,208 @@
+from itertools import islice
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import TAXONOMY_CACHE
+from .versions import VersionedCache
+
+# An in-process snapshot of the whole domain -> subdomain -> skill/job title
+# graph. Rows are kept as tuples in list order ((name, id), as the database
+# sorts them) and addressed by position; relationships are adjacency lists
+# of positions. List filters are answered here with the same semantics as
+# app/filters.py: conditions on the same relation must hold for one related
+# row. A cursor whose row is not in the snapshot as it was (deleted or
+# renamed since) cannot be placed without the database's collation, so the
+# list methods return None for it and the caller runs the query instead.
+
+class Entity:
+    def __init__(self, fields, rows):
+        self.fields = fields
+        self.rows = rows
+        self.index = {row[-1]: pos for pos, row in enumerate(rows)}
+        self.folded = [row[0].lower() for row in rows]
+
+    def render(self, pos) -> dict:
+        return dict(zip(self.fields, self.rows[pos]))
+
+    def where(self, id=None, predicates=()):
+        if id is not None:
+            pos = self.index.get(id)
+            candidates = () if pos is None else (pos,)
+        else:
+            candidates = range(len(self.rows))
+        return {pos for pos in candidates if all(predicate(pos) for predicate in predicates)}
+
+    def contains(self, value):
+        value = value.lower()
+        return lambda pos: value in self.folded[pos]
+
+def _adjacency(pairs, left: Entity, right: Entity):
+    forward = [[] for _ in left.rows]
+    backward = [[] for _ in right.rows]
+    for left_id, right_id in pairs:
+        i = left.index.get(left_id)
+        j = right.index.get(right_id)
+        if i is not None and j is not None:
+            forward[i].append(j)
+            backward[j].append(i)
+    return forward, backward
+
+def _expand(positions, adjacency):
+    return {other for pos in positions for other in adjacency[pos]}
+
+def _intersect(result, positions):
+    return positions if result is None else result & positions
+
+class Snapshot:
+    def __init__(self, db: Session):
+        def load(*columns):
+            return [tuple(row) for row in db.execute(select(*columns).order_by(columns[0], columns[-1]))]
+
+        self.domains = Entity(("domain", "id"), load(models.Domain.domain, models.Domain.id))
+        self.subdomains = Entity(
+            ("subdomain", "domain_id", "id"),
+            load(models.Subdomain.subdomain, models.Subdomain.domain_id, models.Subdomain.id),
+        )
+        self.skills = Entity(
+            ("skill_name_en", "skill_name_jp", "skill_type", "synonyms_en", "synonyms_jp", "id"),
+            [
+                (name_en, name_jp, skill_type, synonyms_en or [], synonyms_jp or [], id)
+                for name_en, name_jp, skill_type, synonyms_en, synonyms_jp, id in load(
+                    models.Skill.skill_name_en, models.Skill.skill_name_jp, models.Skill.skill_type,
+                    models.Skill.synonyms_en, models.Skill.synonyms_jp, models.Skill.id,
+                )
+            ],
+        )
+        self.job_titles = Entity(
+            ("job_title", "synonyms_en", "synonyms_jp", "id"),
+            [
+                (name, synonyms_en or [], synonyms_jp or [], id)
+                for name, synonyms_en, synonyms_jp, id in load(
+                    models.JobTitle.job_title, models.JobTitle.synonyms_en, models.JobTitle.synonyms_jp, models.JobTitle.id,
+                )
+            ],
+        )
+
+        self.subdomain_domain = [self.domains.index.get(row[1]) for row in self.subdomains.rows]
+        self.domain_subdomains = [[] for _ in self.domains.rows]
+        for pos, domain_pos in enumerate(self.subdomain_domain):
+            if domain_pos is not None:
+                self.domain_subdomains[domain_pos].append(pos)
+        self.skill_subdomains, self.subdomain_skills = _adjacency(
+            db.execute(select(models.SkillSubdomain.skill_id, models.SkillSubdomain.subdomain_id)),
+            self.skills, self.subdomains,
+        )
+        self.job_title_skills, self.skill_job_titles = _adjacency(
+            db.execute(select(models.JobTitleCoreSkill.job_title_id, models.JobTitleCoreSkill.skill_id)),
+            self.job_titles, self.skills,
+        )
+        self.job_title_subdomains, self.subdomain_job_titles = _adjacency(
+            db.execute(select(models.JobTitleSubdomain.job_title_id, models.JobTitleSubdomain.subdomain_id)),
+            self.job_titles, self.subdomains,
+        )
+
+    def render_subdomain(self, pos) -> dict:
+        row = self.subdomains.render(pos)
+        domain_pos = self.subdomain_domain[pos]
+        row["domain"] = self.domains.render(domain_pos) if domain_pos is not None else None
+        return row
+
+    def _subdomains_where(self, subdomain_id=None, subdomain_name=None, domain_id=None, domain_name=None):
+        predicates = []
+        if subdomain_name:
+            predicates.append(self.subdomains.contains(subdomain_name))
+        if domain_id:
+            predicates.append(lambda pos: self.subdomains.rows[pos][1] == domain_id)
+        if domain_name:
+            domain_matches = self.domains.contains(domain_name)
+            predicates.append(lambda pos: self.subdomain_domain[pos] is not None and domain_matches(self.subdomain_domain[pos]))
+        return self.subdomains.where(subdomain_id, predicates)
+
+    def _page(self, entity: Entity, result, predicates, after, skip, limit, render):
+        positions = sorted(result) if result is not None else range(len(entity.rows))
+        positions = (pos for pos in positions if all(predicate(pos) for predicate in predicates))
+        if after is not None:
+            start = entity.index.get(after[1])
+            if start is None or entity.rows[start][0] != after[0]:
+                return None
+            positions = (pos for pos in positions if pos > start)
+        elif skip:
+            positions = islice(positions, skip, None)
+        return [render(pos) for pos in islice(positions, limit)]
+
+    def list_domains(self, subdomain_name=None, after=None, skip=0, limit=100):
+        result = None
+        if subdomain_name:
+            subdomains = self.subdomains.where(predicates=[self.subdomains.contains(subdomain_name)])
+            result = {self.subdomain_domain[pos] for pos in subdomains} - {None}
+        return self._page(self.domains, result, (), after, skip, limit, self.domains.render)
+
+    def list_subdomains(self, domain_id=None, domain_name=None, skill_name_en=None, after=None, skip=0, limit=100):
+        result = None
+        if domain_id or domain_name:
+            result = self._subdomains_where(domain_id=domain_id, domain_name=domain_name)
+        if skill_name_en:
+            skills = self.skills.where(predicates=[self.skills.contains(skill_name_en)])
+            result = _intersect(result, _expand(skills, self.skill_subdomains))
+        return self._page(self.subdomains, result, (), after, skip, limit, self.render_subdomain)
+
+    def list_skills(
+        self, skill_type=None, subdomain_id=None, subdomain_name=None, domain_id=None, domain_name=None,
+        synonym_en=None, job_title_id=None, job_title_name=None, after=None, skip=0, limit=100,
+    ):
+        rows = self.skills.rows
+        result = None
+        if subdomain_id or subdomain_name or domain_id or domain_name:
+            subdomains = self._subdomains_where(subdomain_id, subdomain_name, domain_id, domain_name)
+            result = _expand(subdomains, self.subdomain_skills)
+        if job_title_id or job_title_name:
+            predicates = [self.job_titles.contains(job_title_name)] if job_title_name else []
+            job_titles = self.job_titles.where(job_title_id, predicates)
+            result = _intersect(result, _expand(job_titles, self.job_title_skills))
+        predicates = []
+        if skill_type:
+            predicates.append(lambda pos: rows[pos][2] == skill_type)
+        if synonym_en:
+            predicates.append(lambda pos: synonym_en in rows[pos][3])
+        return self._page(self.skills, result, predicates, after, skip, limit, self.skills.render)
+
+    def list_job_titles(
+        self, skill_id=None, skill_name_en=None, skill_type=None, subdomain_id=None, subdomain_name=None,
+        domain_id=None, domain_name=None, synonym_en=None, after=None, skip=0, limit=100,
+    ):
+        rows = self.job_titles.rows
+        result = None
+        if skill_id or skill_name_en or skill_type:
+            predicates = []
+            if skill_name_en:
+                predicates.append(self.skills.contains(skill_name_en))
+            if skill_type:
+                predicates.append(lambda pos: self.skills.rows[pos][2] == skill_type)
+            skills = self.skills.where(skill_id, predicates)
+            result = _expand(skills, self.skill_job_titles)
+        if subdomain_id or subdomain_name or domain_id or domain_name:
+            subdomains = self._subdomains_where(subdomain_id, subdomain_name, domain_id, domain_name)
+            result = _intersect(result, _expand(subdomains, self.subdomain_job_titles))
+        predicates = []
+        if synonym_en:
+            predicates.append(lambda pos: synonym_en in rows[pos][1])
+        return self._page(self.job_titles, result, predicates, after, skip, limit, self.job_titles.render)
+
+class TaxonomyGraph(VersionedCache):
+    tables = (
+        "domain", "subdomain", "skill", "job_title",
+        "skill_subdomain", "job_title_core_skill", "job_title_subdomain",
+    )
+
+    def build(self, db: Session):
+        return Snapshot(db)
+
+_graph = TaxonomyGraph()
+
+def snapshot(db: Session):
+    """The current graph snapshot, or None when TAXONOMY_CACHE is off."""
+    if not TAXONOMY_CACHE:
+        return None
+    return _graph.get(db)
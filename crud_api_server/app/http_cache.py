@@ -0,0 +1,62 @@
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from . import versions
+from .config import CACHE_CONTROL
+from .database import get_read_session, run_db
+
+# GETs carry a strong ETag derived from the versions of every table the
+# endpoint can read (see app/versions.py), so a matching If-None-Match is
+# answered with 304 after one primary-key lookup and before the handler
+# runs its own query. Versions are read first: a write landing in between
+# can only make the ETag older than the body, which costs the client one
+# extra refetch, never a stale 304. The versions are kept on request.state
+# for app/coalesce.py, and the read transaction is ended right away so the
+# connection goes back to the pool while the handler waits its turn.
+
+def etag_for(request: Request, table_versions: dict) -> str:
+    digest = hashlib.sha256(request.url.path.encode())
+    digest.update(b"?" + request.url.query.encode())
+    for name in sorted(table_versions):
+        digest.update(f"\0{name}={table_versions[name]}".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+def _read_versions(db, tables) -> dict:
+    table_versions = versions.read(db, tables)
+    db.rollback()
+    return table_versions
+
+# How FastAPI spells a true bool query parameter.
+_TRUE = {"1", "true", "t", "on", "yes", "y"}
+
+def conditional(*tables: str, when: dict = None):
+    """A dependency that sets ETag/Cache-Control and short-circuits with 304.
+
+    ``when`` maps a bool query parameter to the tables a response also reads
+    when it is true, so that their versions only move those responses' ETags.
+    """
+
+    async def check(request: Request, response: Response, db=Depends(get_read_session)):
+        read = tables + tuple(
+            name
+            for param, extra in (when or {}).items()
+            if request.query_params.get(param, "").lower() in _TRUE
+            for name in extra
+        )
+        table_versions = await run_db(db, _read_versions, read)
+        request.state.table_versions = table_versions
+        etag = etag_for(request, table_versions)
+        headers = {"ETag": etag}
+        if CACHE_CONTROL:
+            headers["Cache-Control"] = CACHE_CONTROL
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return check
@@ -1,42 +1,69 @@
-from fastapi import FastAPI
-from .database import Base, engine
-from .routers import domains, subdomains, skills, job_titles
-from fastmcp import FastMCP
-
-
-
-Base.metadata.create_all(bind=engine)
-
-
-
-app = FastAPI(
-    title="CRUD API Server",
-    description="API server for managing domains, subdomains, skills, and job titles.",
-    version="1.0.0",
-
-)
-
-app.include_router(domains.router)
-app.include_router(subdomains.router)
-app.include_router(skills.router)
-app.include_router(job_titles.router)
+from contextlib import AsyncExitStack, asynccontextmanager
 
-
-@app.get("/")
-def read_root():
-    return {"message": "Hello from root"}
-
-
-# Create your FastMCP server as well as any tools, resources, etc.
-mcp = FastMCP.from_fastapi(app)
-
-# Create the ASGI app
-mcp_app = mcp.http_app(path='/mcp')
-
-# Set the lifespan context for the FastAPI app to use the MCP app's lifespan
-app.router.lifespan_context = mcp_app.router.lifespan_context
-
-# mount the MCP server
-app.mount("/mcp-server", mcp_app)
-
-print(app.routes)
\ No newline at end of file
+from fastapi import FastAPI
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from .admission import pool_timeout
+from .config import FACETS_REFRESH_INTERVAL, MOUNT_MCP, READ_DATABASE_URL
+from .facets import refresher
+from .metrics import MetricsMiddleware
+from .replica import ReadYourWritesMiddleware
+from .routers import domains, subdomains, skills, job_titles, links, export, search, metrics, facets
+
+# Importing this module has no side effects beyond building the app: no
+# database connection (the schema is migrated by python -m app.migrate) and
+# no MCP server, which is built at startup, only if MOUNT_MCP is on. The
+# facet view refresher also starts with the app, in the background.
+
+@asynccontextmanager
+async def _mount_mcp(app: FastAPI):
+    from .mcp_server import create_mcp_app
+
+    # Built from the routes registered so far, so it does not see itself.
+    mcp_app = create_mcp_app(app)
+    app.mount("/mcp-server", mcp_app)
+    async with mcp_app.router.lifespan_context(mcp_app):
+        yield
+
+def _lifespan(mount_mcp: bool):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with AsyncExitStack() as stack:
+            if FACETS_REFRESH_INTERVAL:
+                await stack.enter_async_context(refresher())
+            if mount_mcp:
+                await stack.enter_async_context(_mount_mcp(app))
+            yield
+
+    return lifespan
+
+def create_app(mount_mcp: bool = MOUNT_MCP) -> FastAPI:
+    app = FastAPI(
+        title="CRUD API Server",
+        description="API server for managing domains, subdomains, skills, and job titles.",
+        version="1.0.0",
+        lifespan=_lifespan(mount_mcp),
+    )
+
+    app.include_router(domains.router)
+    app.include_router(subdomains.router)
+    app.include_router(skills.router)
+    app.include_router(job_titles.router)
+    app.include_router(links.router)
+    app.include_router(export.router)
+    app.include_router(search.router)
+    app.include_router(facets.router)
+    app.include_router(metrics.router)
+
+    app.add_exception_handler(PoolTimeoutError, pool_timeout)
+
+    if READ_DATABASE_URL:
+        app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Hello from root"}
+
+    return app
+
+app = create_app()
@@ -0,0 +1,38 @@
+"""The MCP server: the API routes as MCP tools and/or the native batched
+lookup tool (MCP_TOOLSET).
+
+``app.main`` mounts it at /mcp-server when MOUNT_MCP is on. Otherwise it
+runs as its own process, calling the API in-process:
+
+    python -m app.mcp_server --port 8001
+"""
+import argparse
+
+from fastapi import FastAPI
+from fastmcp import FastMCP
+
+from . import mcp_tools
+from .config import MCP_TOOLSET
+
+PATH = "/mcp"
+
+def create_mcp(app: FastAPI, toolset: str = MCP_TOOLSET) -> FastMCP:
+    mcp = FastMCP(app.title) if toolset == "native" else FastMCP.from_fastapi(app)
+    if toolset != "openapi":
+        mcp.tool(annotations={"readOnlyHint": True})(mcp_tools.query_taxonomy)
+    return mcp
+
+def create_mcp_app(app: FastAPI):
+    return create_mcp(app).http_app(path=PATH)
+
+def main():
+    from .main import create_app
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    create_mcp(create_app(mount_mcp=False)).run(transport="streamable-http", host=args.host, port=args.port, path=PATH)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import uuid
+from typing import Annotated, Callable, ClassVar, List, Literal, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from pydantic import BaseModel, Field
+from pydantic_core import to_json
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from . import crud, models, related, suggest
+from .admission import BUSY_DETAIL
+from .crud.domains import DOMAIN_COLUMNS
+from .crud.job_titles import JOB_TITLE_COLUMNS
+from .crud.skills import SKILL_COLUMNS
+from .database import run_read
+from .pagination import decode_cursor, encode_cursor
+
+# Native MCP tools. The auto-generated tools map one REST call to one tool
+# call through the whole HTTP stack and return full response bodies; here
+# one call carries a batch of sub-queries that run concurrently, each on
+# its own read session, straight against the query code, and every result
+# is a table: the field names once, then one array of values per row.
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 20
+MAX_LIMIT = 200
+
+def _keys(columns) -> tuple:
+    return tuple(column.key for column in columns)
+
+class _Query(BaseModel):
+    FIELDS: ClassVar[Tuple[str, ...]]
+
+    limit: int = Field(20, ge=1, le=MAX_LIMIT)
+
+    def fields(self) -> List[str]:
+        return list(self.select or self.FIELDS)
+
+    def filters(self) -> dict:
+        return self.model_dump(exclude={"resource", "limit", "cursor", "select"}, exclude_none=True)
+
+class _ListQuery(_Query):
+    NAME: ClassVar[str]
+    LIST: ClassVar[Callable]
+
+    cursor: Optional[str] = Field(None, description="The `next` value of a previous result, for the following page.")
+
+    def execute(self, db):
+        rows = self.LIST(db, after=decode_cursor(self.cursor), limit=self.limit, as_dicts=True, **self.filters())
+        result = _table(self.fields(), [self.flatten(row) for row in rows])
+        if len(rows) == self.limit:
+            result["next"] = encode_cursor(rows[-1][self.NAME], rows[-1]["id"])
+        return result
+
+    def flatten(self, row: dict) -> dict:
+        return row
+
+class DomainsQuery(_ListQuery):
+    resource: Literal["domains"]
+    subdomain_name: Optional[str] = None
+    select: Optional[List[Literal[_keys(DOMAIN_COLUMNS)]]] = None
+
+    FIELDS = _keys(DOMAIN_COLUMNS)
+    NAME = "domain"
+    LIST = staticmethod(crud.domains.list_domains)
+
+class SubdomainsQuery(_ListQuery):
+    resource: Literal["subdomains"]
+    domain_id: Optional[uuid.UUID] = None
+    domain_name: Optional[str] = None
+    skill_name_en: Optional[str] = None
+    select: Optional[List[Literal["subdomain", "domain_id", "domain", "id"]]] = None
+
+    FIELDS = ("subdomain", "domain_id", "domain", "id")
+    NAME = "subdomain"
+    LIST = staticmethod(crud.subdomains.list_subdomains)
+
+    def flatten(self, row: dict) -> dict:
+        # The parent's name instead of the nested object.
+        return {**row, "domain": row["domain"]["domain"] if row["domain"] else None}
+
+class SkillsQuery(_ListQuery):
+    resource: Literal["skills"]
+    skill_type: Optional[models.SkillType] = None
+    subdomain_id: Optional[uuid.UUID] = None
+    subdomain_name: Optional[str] = None
+    domain_id: Optional[uuid.UUID] = None
+    domain_name: Optional[str] = None
+    synonym_en: Optional[str] = None
+    job_title_id: Optional[uuid.UUID] = None
+    job_title_name: Optional[str] = None
+    select: Optional[List[Literal[_keys(SKILL_COLUMNS)]]] = None
+
+    FIELDS = _keys(SKILL_COLUMNS)
+    NAME = "skill_name_en"
+    LIST = staticmethod(crud.skills.list_skills)
+
+class JobTitlesQuery(_ListQuery):
+    resource: Literal["job_titles"]
+    skill_id: Optional[uuid.UUID] = None
+    skill_name_en: Optional[str] = None
+    skill_type: Optional[models.SkillType] = None
+    subdomain_id: Optional[uuid.UUID] = None
+    subdomain_name: Optional[str] = None
+    domain_id: Optional[uuid.UUID] = None
+    domain_name: Optional[str] = None
+    synonym_en: Optional[str] = None
+    select: Optional[List[Literal[_keys(JOB_TITLE_COLUMNS)]]] = None
+
+    FIELDS = _keys(JOB_TITLE_COLUMNS)
+    NAME = "job_title"
+    LIST = staticmethod(crud.job_titles.list_job_titles)
+
+class SuggestQuery(_Query):
+    """Entities whose names or synonyms have a word starting with ``q``."""
+
+    resource: Literal["suggest"]
+    q: str = Field(..., min_length=1, max_length=200)
+    types: Optional[List[Literal[suggest.SUGGEST_TYPES]]] = None
+    select: Optional[List[Literal["type", "id", "label", "matched"]]] = None
+
+    FIELDS = ("type", "id", "label", "matched")
+
+    def execute(self, db):
+        return _table(self.fields(), suggest.suggest(db, self.q, self.limit, frozenset(self.types or ())))
+
+class RelatedSkillsQuery(_Query):
+    """The skills sharing most job titles and subdomains with ``skill_id``."""
+
+    resource: Literal["related_skills"]
+    skill_id: uuid.UUID
+    limit: int = Field(10, ge=1, le=related.MAX_TOP_K)
+    select: Optional[List[Literal["id", "skill_name_en", "score", "shared_job_titles", "shared_subdomains"]]] = None
+
+    FIELDS = ("id", "skill_name_en", "score", "shared_job_titles", "shared_subdomains")
+
+    def execute(self, db):
+        rows = related.related_skills(db, self.skill_id, self.limit)
+        if rows is None:
+            return {"error": "Skill not found"}
+        return _table(self.fields(), rows)
+
+SubQuery = Annotated[
+    Union[DomainsQuery, SubdomainsQuery, SkillsQuery, JobTitlesQuery, SuggestQuery, RelatedSkillsQuery],
+    Field(discriminator="resource"),
+]
+
+def _table(fields: List[str], rows) -> dict:
+    if rows and not isinstance(rows[0], dict):
+        rows = [row.model_dump() for row in rows]
+    return {"fields": fields, "rows": [[row[field] for field in fields] for row in rows]}
+
+async def _execute(query) -> dict:
+    # A failing sub-query becomes its own error result; the rest of the
+    # batch still comes back.
+    try:
+        return await run_read(query.execute)
+    except HTTPException as exc:
+        return {"error": exc.detail}
+    except PoolTimeoutError:
+        return {"error": BUSY_DETAIL}
+    except Exception:
+        logger.exception("%s sub-query failed", query.resource)
+        return {"error": f"The {query.resource} query failed"}
+
+async def query_taxonomy(queries: Annotated[List[SubQuery], Field(min_length=1, max_length=MAX_BATCH)]) -> str:
+    """Look up domains, subdomains, skills and job titles, several lookups per call.
+
+    Each entry of ``queries`` names a ``resource`` and its filters; they run
+    concurrently and the results come back in the same order. A result is
+    ``{"fields": [...], "rows": [[...], ...]}``, plus ``next`` (pass it as
+    ``cursor`` to get the following page) when the page is full, or
+    ``{"error": ...}``. ``select`` picks the fields; name filters match
+    any part of the name, ignoring case.
+    """
+    results = await asyncio.gather(*(_execute(query) for query in queries))
+    return to_json(results).decode()
@@ -0,0 +1,186 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import SLOW_QUERY_MS
+
+# Per-request database accounting. The middleware puts a RequestStats in a
+# context variable; the engine events and the pool add to whichever one is
+# current. Handlers reach the database through run_db, which keeps the
+# context both in the threadpool and inside AsyncSession.run_sync, so the
+# statements of a request are always attributed to it. Everything is a few
+# counter additions per statement and five histogram observations per
+# request, cheap enough to leave on.
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("method", "route")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.",
+    LABELS + ("status",),
+)
+STATEMENTS = Histogram(
+    "db_statements_per_request", "SQL statements executed while serving a request.",
+    LABELS, buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250),
+)
+DB_TIME = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL statements while serving a request.",
+    LABELS, buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+ROWS = Histogram(
+    "db_rows_per_request", "Rows returned or affected by the SQL statements of a request.",
+    LABELS, buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds_per_request", "Time spent waiting for pooled connections while serving a request.",
+    LABELS, buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+SLOW_QUERIES = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS.")
+ADMISSION_WAIT = Histogram(
+    "db_admission_wait_seconds", "Time database calls queued for an admission slot.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10),
+)
+ADMISSION_REJECTED = Counter("db_admission_rejected_total", "Database calls answered with 503.", ("reason",))
+COALESCED_READS = Counter(
+    "coalesced_reads_total", "List reads by how they were served: executed, shared (in flight) or recent.", ("outcome",),
+)
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "rows", "pool_wait")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.pool_wait = 0.0
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _route(scope) -> str:
+    # Templated paths only, so the label set stays bounded.
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    return scope.get("root_path") or "<unmatched>"
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            labels = (scope["method"], _route(scope))
+            REQUEST_LATENCY.labels(*labels, str(status)).observe(elapsed)
+            STATEMENTS.labels(*labels).observe(stats.statements)
+            DB_TIME.labels(*labels).observe(stats.db_time)
+            ROWS.labels(*labels).observe(stats.rows)
+            POOL_WAIT.labels(*labels).observe(stats.pool_wait)
+
+class _TimedCheckout:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.pool_wait += time.perf_counter() - started
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that charges the time spent waiting for a connection to the current request."""
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that charges the time spent waiting for a connection to the current request."""
+
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"]
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+        stats.rows += max(cursor.rowcount, 0)
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        logger.warning(
+            "slow query (%.1f ms): %s\nparameters: %.1000r\n%s",
+            elapsed * 1000, statement, parameters, _explain(conn, statement, parameters, executemany),
+        )
+
+def _explain(conn, statement, parameters, executemany) -> str:
+    """The plan of a statement that just ran, from a second cursor on its connection.
+
+    Plain EXPLAIN, so nothing is executed again, inside a savepoint so that
+    a failing EXPLAIN does not abort the request's transaction. Text holding
+    several statements is skipped: EXPLAIN covers only the first one and
+    the driver would run the others for real.
+    """
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return "(no plan for this statement)"
+    if ";" in statement.strip().rstrip(";"):
+        return "(no plan for several statements)"
+    if executemany:
+        parameters = parameters[0] if parameters else None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception as exc:
+        return f"(EXPLAIN failed: {exc})"
+    finally:
+        cursor.close()
+
+def instrument(engine):
+    """Attach the statement hooks to a (sync) Engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def render():
+    """The exposition body and content type for /metrics.
+
+    With several uvicorn workers, point PROMETHEUS_MULTIPROC_DIR at an empty
+    directory and the workers' values are merged here.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,22 @@
+"""Bring the database schema up to date (alembic upgrade head).
+
+The app never creates or alters tables itself; run this once per deploy,
+before starting the workers:
+
+    python -m app.migrate
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def main():
+    config = Config(str(ROOT / "alembic.ini"))
+    # alembic.ini's script_location is relative to crud_api_server/.
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    command.upgrade(config, "head")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Enum, ARRAY
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, DateTime, String, ForeignKey, Enum, Index
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 from .database import Base
 import enum
@@ -12,12 +12,21 @@ class SkillType(enum.Enum):
 
 class Domain(Base):
     __tablename__ = "domain"
+    __table_args__ = (
+        Index("ix_domain_domain_keyset", "domain", "id"),
+        Index("ix_domain_domain_trgm", "domain", postgresql_using="gin", postgresql_ops={"domain": "gin_trgm_ops"}),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     domain = Column(String, nullable=False)
     subdomains = relationship("Subdomain", back_populates="domain")
 
 class Subdomain(Base):
     __tablename__ = "subdomain"
+    __table_args__ = (
+        Index("ix_subdomain_subdomain_keyset", "subdomain", "id"),
+        Index("ix_subdomain_subdomain_trgm", "subdomain", postgresql_using="gin", postgresql_ops={"subdomain": "gin_trgm_ops"}),
+        Index("ix_subdomain_domain_id", "domain_id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     subdomain = Column(String, nullable=False)
     domain_id = Column(UUID(as_uuid=True), ForeignKey("domain.id", ondelete="CASCADE"), nullable=False)
@@ -27,6 +36,12 @@ class Subdomain(Base):
 
 class Skill(Base):
     __tablename__ = "skill"
+    __table_args__ = (
+        Index("ix_skill_skill_name_en_keyset", "skill_name_en", "id"),
+        Index("ix_skill_skill_name_en_trgm", "skill_name_en", postgresql_using="gin", postgresql_ops={"skill_name_en": "gin_trgm_ops"}),
+        Index("ix_skill_synonyms_en", "synonyms_en", postgresql_using="gin"),
+        Index("ix_skill_synonyms_jp", "synonyms_jp", postgresql_using="gin"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     skill_name_en = Column(String, nullable=False)
     skill_name_jp = Column(String)
@@ -38,6 +53,12 @@ class Skill(Base):
 
 class JobTitle(Base):
     __tablename__ = "job_title"
+    __table_args__ = (
+        Index("ix_job_title_job_title_keyset", "job_title", "id"),
+        Index("ix_job_title_job_title_trgm", "job_title", postgresql_using="gin", postgresql_ops={"job_title": "gin_trgm_ops"}),
+        Index("ix_job_title_synonyms_en", "synonyms_en", postgresql_using="gin"),
+        Index("ix_job_title_synonyms_jp", "synonyms_jp", postgresql_using="gin"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_title = Column(String, nullable=False)
     synonyms_en = Column(ARRAY(String))
@@ -47,6 +68,9 @@ class JobTitle(Base):
 
 class SkillSubdomain(Base):
     __tablename__ = "skill_subdomain"
+    __table_args__ = (
+        Index("ix_skill_subdomain_subdomain_id", "subdomain_id"),
+    )
     skill_id = Column(UUID(as_uuid=True), ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True)
     subdomain_id = Column(UUID(as_uuid=True), ForeignKey("subdomain.id", ondelete="CASCADE"), primary_key=True)
     skill = relationship("Skill", back_populates="subdomains")
@@ -54,6 +78,9 @@ class SkillSubdomain(Base):
 
 class JobTitleCoreSkill(Base):
     __tablename__ = "job_title_core_skill"
+    __table_args__ = (
+        Index("ix_job_title_core_skill_skill_id", "skill_id"),
+    )
     job_title_id = Column(UUID(as_uuid=True), ForeignKey("job_title.id", ondelete="CASCADE"), primary_key=True)
     skill_id = Column(UUID(as_uuid=True), ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True)
     job_title = relationship("JobTitle", back_populates="core_skills")
@@ -61,7 +88,23 @@ class JobTitleCoreSkill(Base):
 
 class JobTitleSubdomain(Base):
     __tablename__ = "job_title_subdomain"
+    __table_args__ = (
+        Index("ix_job_title_subdomain_subdomain_id", "subdomain_id"),
+    )
     job_title_id = Column(UUID(as_uuid=True), ForeignKey("job_title.id", ondelete="CASCADE"), primary_key=True)
     subdomain_id = Column(UUID(as_uuid=True), ForeignKey("subdomain.id", ondelete="CASCADE"), primary_key=True)
     job_title = relationship("JobTitle", back_populates="subdomains")
-    subdomain = relationship("Subdomain", back_populates="job_titles")
\ No newline at end of file
+    subdomain = relationship("Subdomain", back_populates="job_titles")
+
+class TableVersion(Base):
+    __tablename__ = "table_version"
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class FacetRefresh(Base):
+    """When each facet materialized view was last refreshed, and the sum of
+    its source tables' versions at that point (see app/facets.py)."""
+    __tablename__ = "facet_refresh"
+    view_name = Column(String, primary_key=True)
+    source_version = Column(BigInteger, nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
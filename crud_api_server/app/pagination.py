@@ -0,0 +1,47 @@
+import base64
+import json
+import uuid
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import tuple_
+
+# List endpoints are ordered by (name, id). A cursor is the opaque encoding
+# of the last row's sort key; the next page starts strictly after it, so
+# deep pages cost the same as the first one and do not shift under writes.
+
+def encode_cursor(name: str, id: uuid.UUID) -> str:
+    raw = json.dumps([name, str(id)], ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, uuid.UUID]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, id = json.loads(raw)
+        if not isinstance(name, str) or not isinstance(id, str):
+            raise ValueError("cursor items must be strings")
+        return name, uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def paginate(query, name_column, id_column, after=None, skip: int = 0, limit: int = 100):
+    query = query.order_by(name_column, id_column)
+    if after is not None:
+        query = query.filter(tuple_(name_column, id_column) > tuple_(*after))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def set_next_link(request: Request, response: Response, items, name_attr: str, limit: int):
+    """Advertise the next page in a ``Link`` header when this page is full."""
+    if not items or len(items) < limit:
+        return
+    last = items[-1]
+    if isinstance(last, dict):
+        cursor = encode_cursor(last[name_attr], last["id"])
+    else:
+        cursor = encode_cursor(getattr(last, name_attr), last.id)
+    url = request.url.remove_query_params("skip").include_query_params(cursor=cursor)
+    response.headers["Link"] = f'<{url}>; rel="next"'
@@ -0,0 +1,99 @@
+import numpy as np
+from sqlalchemy import String, cast, select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .sparse import Incidence, top
+from .versions import VersionedCache
+
+# "Given these skills, which job titles fit best?" is answered from an
+# in-memory job title x skill incidence matrix built from
+# job_title_core_skill. A request selects a set of skill columns; one
+# bincount over their non-zeros gives every job title's overlap at once.
+#
+#   jaccard            |S & J| / |S | J|
+#   coverage           |S & J| / |J|, the share of the job's core skills covered
+#   weighted_coverage  coverage with each skill weighted by its idf, so
+#                      skills few job titles require count for more
+
+class RankingIndex:
+    def __init__(self, db: Session):
+        # Plain Core rows with ids as text: ORM row loading and hundreds of
+        # thousands of UUID objects would dominate the rebuild.
+        connection = db.connection()
+        jobs = connection.execute(
+            select(cast(models.JobTitle.id, String), models.JobTitle.job_title)
+            .order_by(models.JobTitle.job_title, models.JobTitle.id)
+        ).all()
+        skills = connection.execute(select(cast(models.Skill.id, String), models.Skill.skill_name_en, models.Skill.skill_name_jp)).all()
+        self.job_ids = [id for id, _ in jobs]
+        self.job_names = [name for _, name in jobs]
+        job_index = {id: pos for pos, id in enumerate(self.job_ids)}
+        self.skill_index = {id: pos for pos, (id, _, _) in enumerate(skills)}
+        self.skill_names = {}
+        for pos, (_, name_en, name_jp) in enumerate(skills):
+            for name in {name_en, name_jp} - {None}:
+                self.skill_names.setdefault(name.casefold(), []).append(pos)
+
+        links = connection.execute(
+            select(cast(models.JobTitleCoreSkill.job_title_id, String), cast(models.JobTitleCoreSkill.skill_id, String))
+        ).all()
+        pairs = [
+            (job_index[job_id], self.skill_index[skill_id])
+            for job_id, skill_id in links
+            if job_id in job_index and skill_id in self.skill_index
+        ]
+        self.matrix = Incidence(pairs, (len(jobs), len(skills)))
+        self.idf = np.log((1 + len(jobs)) / (1 + self.matrix.col_degree)) + 1
+        self.weight_totals = self.matrix.row_sums(self.idf)
+
+    def resolve(self, skill_ids, skill_names):
+        """Skill positions for the given ids and names, and whatever did not match."""
+        positions = set()
+        unknown = []
+        for id in skill_ids:
+            pos = self.skill_index.get(str(id))
+            if pos is None:
+                unknown.append(str(id))
+            else:
+                positions.add(pos)
+        for name in skill_names:
+            matches = self.skill_names.get(name.strip().casefold())
+            if matches is None:
+                unknown.append(name)
+            else:
+                positions.update(matches)
+        return np.fromiter(positions, dtype=np.int64, count=len(positions)), unknown
+
+    def rank(self, skills, metric: str, top_k: int, min_matched: int = 1):
+        matched = self.matrix.row_hits(skills)
+        degree = self.matrix.row_degree
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if metric == "jaccard":
+                scores = matched / (len(skills) + degree - matched)
+            elif metric == "coverage":
+                scores = matched / degree
+            else:
+                scores = self.matrix.row_hits(skills, weights=self.idf) / self.weight_totals
+        eligible = matched >= min_matched
+        return [
+            schemas.RankedJobTitle(
+                id=self.job_ids[pos], job_title=self.job_names[pos], score=float(scores[pos]),
+                matched=int(matched[pos]), core_skills=int(degree[pos]),
+            )
+            for pos in top(scores, top_k, eligible, tiebreak=matched)
+        ]
+
+class JobTitleRanking(VersionedCache):
+    tables = ("job_title", "skill", "job_title_core_skill")
+
+    def build(self, db: Session):
+        return RankingIndex(db)
+
+_ranking = JobTitleRanking()
+
+def rank_job_titles(db: Session, request: schemas.JobTitleRankRequest) -> schemas.JobTitleRankResult:
+    index = _ranking.get(db)
+    skills, unknown = index.resolve(request.skill_ids, request.skill_names)
+    results = index.rank(skills, request.metric, request.top_k, request.min_matched) if len(skills) else []
+    return schemas.JobTitleRankResult(results=results, unknown_skills=unknown)
@@ -0,0 +1,80 @@
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import String, cast, select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .sparse import Incidence, gather, top
+from .versions import VersionedCache
+
+# Two skills are related when job titles require both or they sit in the
+# same subdomain. With J the job title x skill and S the skill x subdomain
+# incidence matrices, the co-occurrence matrix is
+#
+#   C = J^T J + 0.5 * S S^T
+#
+# Only the rows that get asked for are computed, each with two sparse
+# gathers, and their top MAX_TOP_K entries are memoized. A write to any of
+# the tables drops the index, so afterwards only the skills requested
+# again are recomputed.
+
+MAX_TOP_K = 100
+SUBDOMAIN_WEIGHT = 0.5
+MEMO_SIZE = 10_000
+
+class RelatedSkillsIndex:
+    def __init__(self, db: Session):
+        connection = db.connection()
+        skills = connection.execute(select(cast(models.Skill.id, String), models.Skill.skill_name_en)).all()
+        job_ids = connection.execute(select(cast(models.JobTitle.id, String))).scalars().all()
+        subdomain_ids = connection.execute(select(cast(models.Subdomain.id, String))).scalars().all()
+        self.skill_ids = [id for id, _ in skills]
+        self.skill_names = [name for _, name in skills]
+        self.skill_index = {id: pos for pos, id in enumerate(self.skill_ids)}
+        job_index = {id: pos for pos, id in enumerate(job_ids)}
+        subdomain_index = {id: pos for pos, id in enumerate(subdomain_ids)}
+
+        def pairs(row_column, row_index, col_column, col_index):
+            links = connection.execute(select(cast(row_column, String), cast(col_column, String))).all()
+            return [(row_index[row], col_index[col]) for row, col in links if row in row_index and col in col_index]
+
+        jobs = pairs(models.JobTitleCoreSkill.job_title_id, job_index, models.JobTitleCoreSkill.skill_id, self.skill_index)
+        self.jobs = Incidence(jobs, (len(job_ids), len(skills)))
+        subdomains = pairs(models.SkillSubdomain.skill_id, self.skill_index, models.SkillSubdomain.subdomain_id, subdomain_index)
+        self.subdomains = Incidence(subdomains, (len(skills), len(subdomain_ids)))
+        self.top = lru_cache(maxsize=MEMO_SIZE)(self._top)
+
+    def _top(self, pos: int):
+        jobs = gather(self.jobs.col_ptr, self.jobs.col_indices, np.array([pos]))
+        subdomains = gather(self.subdomains.row_ptr, self.subdomains.row_indices, np.array([pos]))
+        shared_jobs = self.jobs.col_hits(jobs)
+        shared_subdomains = self.subdomains.row_hits(subdomains)
+        scores = shared_jobs + SUBDOMAIN_WEIGHT * shared_subdomains
+        scores[pos] = 0
+        best = top(scores, MAX_TOP_K, scores > 0, tiebreak=shared_jobs)
+        return [(int(other), float(scores[other]), int(shared_jobs[other]), int(shared_subdomains[other])) for other in best]
+
+    def related(self, skill_id, top_k: int):
+        pos = self.skill_index.get(str(skill_id))
+        if pos is None:
+            return None
+        return [
+            schemas.RelatedSkill(
+                id=self.skill_ids[other], skill_name_en=self.skill_names[other], score=score,
+                shared_job_titles=jobs, shared_subdomains=subdomains,
+            )
+            for other, score, jobs, subdomains in self.top(pos)[:top_k]
+        ]
+
+class RelatedSkills(VersionedCache):
+    tables = ("skill", "job_title", "subdomain", "job_title_core_skill", "skill_subdomain")
+
+    def build(self, db: Session):
+        return RelatedSkillsIndex(db)
+
+_related = RelatedSkills()
+
+def related_skills(db: Session, skill_id, top_k: int = 10):
+    """The ``top_k`` skills most related to ``skill_id``, or None if it does not exist."""
+    return _related.get(db).related(skill_id, top_k)
@@ -0,0 +1,107 @@
+import threading
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import Optional
+
+from sqlalchemy import text
+
+from .config import REPLICA_CHECK_INTERVAL, REPLICA_MAX_LAG, STICKY_PRIMARY_SECONDS
+
+# Reads go to the replica unless it is lagging (or down), or the client
+# wrote something within the last STICKY_PRIMARY_SECONDS. The latter is
+# tracked with a primary_until cookie that the middleware sets on the
+# response to any request that committed a write; the commit is noticed
+# through the same table version bump that expires the in-process caches.
+
+COOKIE = "primary_until"
+
+# Zero when the replica has replayed everything it received (an idle
+# primary sends nothing, so the replay timestamp alone would look stale),
+# and also on a database that is not a standby at all.
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class RequestRouting:
+    __slots__ = ("sticky", "wrote")
+
+    def __init__(self, sticky: bool):
+        self.sticky = sticky
+        self.wrote = False
+
+_routing: ContextVar[Optional[RequestRouting]] = ContextVar("request_routing", default=None)
+
+def note_write():
+    routing = _routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+def sticky() -> bool:
+    routing = _routing.get()
+    return routing is not None and routing.sticky
+
+class ReplicaMonitor:
+    """Whether the replica is healthy enough to read from, re-checked at
+    most every REPLICA_CHECK_INTERVAL seconds. One caller checks at a time
+    (the one due() returned True to, which must call done() however the
+    check ends); the others use the last answer instead of waiting."""
+
+    def __init__(self):
+        self.healthy = True
+        self.lag = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        if time.monotonic() - self._checked_at < REPLICA_CHECK_INTERVAL:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False
+        self._checked_at = time.monotonic()
+        return True
+
+    def record(self, lag: Optional[float]):
+        """Store a check result: the lag in seconds, or None if the replica could not be reached."""
+        self.lag = lag
+        self.healthy = lag is not None and lag <= REPLICA_MAX_LAG
+
+    def done(self):
+        self._lock.release()
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        routing = RequestRouting(sticky=_primary_until(scope) > time.time())
+        token = _routing.set(routing)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and routing.wrote:
+                until = time.time() + STICKY_PRIMARY_SECONDS
+                cookie = f"{COOKIE}={until:.3f}; Max-Age={int(STICKY_PRIMARY_SECONDS) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _routing.reset(token)
+
+def _primary_until(scope) -> float:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(COOKIE)
+            if morsel is not None:
+                try:
+                    return float(morsel.value)
+                except ValueError:
+                    return 0.0
+    return 0.0
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from typing import List, Optional, Union
 import uuid
 
-from .. import models, schemas
-from ..database import get_db
+from .. import bulk, coalesce, crud, facets, schemas
+from ..config import FAST_SERIALIZATION
+from ..database import get_read_session, get_session, run_db
+from ..http_cache import conditional
+from ..pagination import decode_cursor, set_next_link
+from ..serialization import rows_response
+
+# Every table a read from this router can touch, through its filters. The
+# lists add the facet views when include_facets=true.
+CACHE_TABLES = ("domain", "subdomain")
+
+LIST_ADAPTER = TypeAdapter(List[schemas.DomainResponse])
+LIST_FACETS = ("domain",)
 
 router = APIRouter(
     prefix="/domains",
@@ -12,53 +23,57 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.DomainResponse, status_code=status.HTTP_201_CREATED)
-def create_domain(domain: schemas.DomainCreate, db: Session = Depends(get_db)):
-    db_domain = models.Domain(domain=domain.domain)
-    db.add(db_domain)
-    db.commit()
-    db.refresh(db_domain)
-    return db_domain
+async def create_domain(domain: schemas.DomainCreate, db=Depends(get_session)):
+    return await run_db(db, crud.domains.create_domain, domain)
 
-@router.get("/", response_model=List[schemas.DomainResponse])
-def read_domains(
+@router.post("/bulk", response_model=schemas.BulkResult, openapi_extra=bulk.request_body(schemas.DomainBulkItem))
+async def bulk_upsert_domains(request: Request, db=Depends(get_session)):
+    """Create or update many domains from a JSON array or an NDJSON stream.
+
+    Rows whose ``id`` already exists are updated; invalid rows are skipped
+    and reported in ``errors``.
+    """
+    return await bulk.ingest(request, db, schemas.DomainBulkItem, crud.domains.bulk_upsert_domains, ["domain"])
+
+@router.get("/", response_model=Union[List[schemas.DomainResponse], schemas.DomainListWithFacets], dependencies=[Depends(conditional(*CACHE_TABLES, when=facets.INCLUDE_TABLES))])
+async def read_domains(
+    request: Request,
+    response: Response,
     subdomain_name: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    include_facets: bool = Query(False, description=facets.INCLUDE_DESCRIPTION),
+    db=Depends(get_read_session)
 ):
-    query = db.query(models.Domain)
-    if subdomain_name:
-        query = query.join(models.Subdomain).filter(models.Subdomain.subdomain.ilike(f"%{subdomain_name}%"))
-    domains = query.offset(skip).limit(limit).all()
-    return domains
+    items = await coalesce.read(
+        request, db, crud.domains.list_domains, subdomain_name=subdomain_name,
+        after=decode_cursor(cursor), skip=skip, limit=limit, as_dicts=FAST_SERIALIZATION,
+    )
+    set_next_link(request, response, items, "domain", limit)
+    result = rows_response(items, response) if FAST_SERIALIZATION else items
+    if include_facets:
+        return await facets.include(db, LIST_FACETS, result, LIST_ADAPTER, response)
+    return result
 
-@router.get("/{domain_id}", response_model=schemas.DomainResponse)
-def read_domain(domain_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_domain = db.query(models.Domain).filter(models.Domain.id == domain_id).first()
+@router.get("/{domain_id}", response_model=schemas.DomainResponse, dependencies=[Depends(conditional(*CACHE_TABLES))])
+async def read_domain(domain_id: uuid.UUID, db=Depends(get_read_session)):
+    db_domain = await run_db(db, crud.domains.get_domain, domain_id)
     if db_domain is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Domain not found")
     return db_domain
 
 @router.put("/{domain_id}", response_model=schemas.DomainResponse)
-def update_domain(domain_id: uuid.UUID, domain: schemas.DomainUpdate, db: Session = Depends(get_db)):
-    db_domain = db.query(models.Domain).filter(models.Domain.id == domain_id).first()
+@router.patch("/{domain_id}", response_model=schemas.DomainResponse)
+async def update_domain(domain_id: uuid.UUID, domain: schemas.DomainUpdate, db=Depends(get_session)):
+    """Change the fields given in the body; omitted fields keep their values."""
+    db_domain = await run_db(db, crud.domains.update_domain, domain_id, domain)
     if db_domain is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Domain not found")
-    
-    update_data = domain.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_domain, key, value)
-    
-    db.add(db_domain)
-    db.commit()
-    db.refresh(db_domain)
     return db_domain
 
 @router.delete("/{domain_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_domain(domain_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_domain = db.query(models.Domain).filter(models.Domain.id == domain_id).first()
-    if db_domain is None:
+async def delete_domain(domain_id: uuid.UUID, db=Depends(get_session)):
+    if not await run_db(db, crud.domains.delete_domain, domain_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Domain not found")
-    db.delete(db_domain)
-    db.commit()
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
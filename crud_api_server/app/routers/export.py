@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..admission import limiter
+from ..export import ALL_TABLES, MEDIA_TYPES, ExportFormat, ExportTable, ExportWriter, stream
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Export"]
+)
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        if name.lower() != "gzip":
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+async def _export(request: Request, tables, format: ExportFormat, filename: str, tagged: bool = False):
+    gzip = _accepts_gzip(request)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{format.value}"', "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    writer = ExportWriter(format, gzip=gzip, tagged=tagged)
+    # The slot is released when the stream ends, or, if the client goes
+    # away mid-stream, by the background task or when the stream is closed.
+    lease = await limiter.lease()
+    return StreamingResponse(
+        stream(tables, writer, lease), media_type=MEDIA_TYPES[format], headers=headers,
+        background=BackgroundTask(lease.arelease),
+    )
+
+@router.get("/")
+async def export_taxonomy(request: Request, format: ExportFormat = ExportFormat.ndjson):
+    """Stream every table, entities first and then the join-table edges.
+
+    Each NDJSON line has a ``type`` field naming its table. Sent gzipped
+    when the client accepts it.
+    """
+    if format is not ExportFormat.ndjson:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The full export is only available as NDJSON")
+    return await _export(request, ALL_TABLES, format, "taxonomy", tagged=True)
+
+@router.get("/{table}")
+async def export_table(table: ExportTable, request: Request, format: ExportFormat = ExportFormat.ndjson):
+    """Stream one table, or one join table's edges, as NDJSON or CSV.
+
+    Sent gzipped when the client accepts it.
+    """
+    return await _export(request, (table,), format, table.value)
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import List, Optional
+import uuid
+
+from .. import facets, schemas
+from ..database import get_read_session, run_db
+from ..http_cache import conditional
+from ..pagination import decode_cursor, set_next_link
+
+router = APIRouter(
+    prefix="/facets",
+    tags=["Facets"],
+    # The counts change only when the views are refreshed.
+    dependencies=[Depends(conditional(facets.VERSION_TABLE))],
+)
+
+@router.get("/skill_types", response_model=List[schemas.SkillTypeFacet])
+async def read_skill_type_facets(db=Depends(get_read_session)):
+    """Skills per skill type."""
+    return await run_db(db, facets.skill_types)
+
+@router.get("/domains", response_model=List[schemas.DomainFacet])
+async def read_domain_facets(db=Depends(get_read_session)):
+    """Subdomains, skills and job titles per domain."""
+    return await run_db(db, facets.domains)
+
+@router.get("/subdomains", response_model=List[schemas.SubdomainFacet])
+async def read_subdomain_facets(
+    request: Request,
+    response: Response,
+    domain_id: Optional[uuid.UUID] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db=Depends(get_read_session)
+):
+    """Skills and job titles per subdomain."""
+    items = await run_db(db, facets.subdomains, domain_id=domain_id, after=decode_cursor(cursor), skip=skip, limit=limit)
+    set_next_link(request, response, items, "subdomain", limit)
+    return items
+
+@router.get("/job_titles", response_model=List[schemas.JobTitleFacet])
+async def read_job_title_facets(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db=Depends(get_read_session)
+):
+    """Core skills per job title."""
+    items = await run_db(db, facets.job_titles, after=decode_cursor(cursor), skip=skip, limit=limit)
+    set_next_link(request, response, items, "job_title", limit)
+    return items
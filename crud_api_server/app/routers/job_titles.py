@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from typing import List, Optional, Union
 import uuid
 
-from .. import models, schemas
-from ..database import get_db
+from .. import bulk, coalesce, crud, facets, models, ranking, schemas
+from ..config import FAST_SERIALIZATION
+from ..database import get_read_session, get_session, run_db
+from ..expand import JOB_TITLE_EXPAND, expand_query
+from ..http_cache import conditional
+from ..pagination import decode_cursor, set_next_link
+from ..serialization import rows_response
+from .links import run_batch
+
+# Every table a read from this router can touch, through filters or expand=.
+# The lists add the facet views when include_facets=true.
+CACHE_TABLES = ("job_title", "job_title_core_skill", "skill", "job_title_subdomain", "subdomain", "domain")
+
+LIST_ADAPTER = TypeAdapter(List[schemas.JobTitleResponse])
+LIST_FACETS = ("domain",)
 
 router = APIRouter(
     prefix="/job_titles",
@@ -13,15 +25,33 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.JobTitleResponse, status_code=status.HTTP_201_CREATED)
-def create_job_title(job_title: schemas.JobTitleCreate, db: Session = Depends(get_db)):
-    db_job_title = models.JobTitle(**job_title.model_dump())
-    db.add(db_job_title)
-    db.commit()
-    db.refresh(db_job_title)
-    return db_job_title
+async def create_job_title(job_title: schemas.JobTitleCreate, db=Depends(get_session)):
+    return await run_db(db, crud.job_titles.create_job_title, job_title)
+
+@router.post("/bulk", response_model=schemas.BulkResult, openapi_extra=bulk.request_body(schemas.JobTitleBulkItem))
+async def bulk_upsert_job_titles(request: Request, db=Depends(get_session)):
+    """Create or update many job titles from a JSON array or an NDJSON stream.
 
-@router.get("/", response_model=List[schemas.JobTitleResponse])
-def read_job_titles(
+    Rows whose ``id`` already exists are updated; invalid rows are skipped
+    and reported in ``errors``.
+    """
+    return await bulk.ingest(request, db, schemas.JobTitleBulkItem, crud.job_titles.bulk_upsert_job_titles, ["job_title"])
+
+@router.post("/rank", response_model=schemas.JobTitleRankResult, operation_id="rank_job_titles")
+async def rank_job_titles(request: schemas.JobTitleRankRequest, db=Depends(get_read_session)):
+    """Rank job titles by how well a set of skills (ids and/or names) fits their core skills.
+
+    ``metric`` is ``jaccard`` (overlap over union), ``coverage`` (share of the
+    job title's core skills present) or ``weighted_coverage`` (coverage with
+    rarer skills weighted higher). Skills that match nothing are listed in
+    ``unknown_skills``.
+    """
+    return await run_db(db, ranking.rank_job_titles, request)
+
+@router.get("/", response_model=Union[List[schemas.JobTitleResponse], schemas.JobTitleListWithFacets], dependencies=[Depends(conditional(*CACHE_TABLES, when=facets.INCLUDE_TABLES))])
+async def read_job_titles(
+    request: Request,
+    response: Response,
     skill_id: Optional[uuid.UUID] = None,
     skill_name_en: Optional[str] = None,
     skill_type: Optional[models.SkillType] = None,
@@ -30,59 +60,75 @@ def read_job_titles(
     domain_id: Optional[uuid.UUID] = None,
     domain_name: Optional[str] = None,
     synonym_en: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    expand: List[str] = expand_query(JOB_TITLE_EXPAND.choices),
+    include_facets: bool = Query(False, description=facets.INCLUDE_DESCRIPTION),
+    db=Depends(get_read_session)
 ):
-    query = db.query(models.JobTitle)
-
-    if skill_id:
-        query = query.join(models.JobTitleCoreSkill).filter(models.JobTitleCoreSkill.skill_id == skill_id)
-    if skill_name_en:
-        query = query.join(models.JobTitleCoreSkill).join(models.Skill).filter(models.Skill.skill_name_en.ilike(f"%{skill_name_en}%"))
-    if skill_type:
-        query = query.join(models.JobTitleCoreSkill).join(models.Skill).filter(models.Skill.skill_type == skill_type)
-    if subdomain_id:
-        query = query.join(models.JobTitleSubdomain).filter(models.JobTitleSubdomain.subdomain_id == subdomain_id)
-    if subdomain_name:
-        query = query.join(models.JobTitleSubdomain).join(models.Subdomain).filter(models.Subdomain.subdomain.ilike(f"%{subdomain_name}%"))
-    if domain_id:
-        query = query.join(models.JobTitleSubdomain).join(models.Subdomain).filter(models.Subdomain.domain_id == domain_id)
-    if domain_name:
-        query = query.join(models.JobTitleSubdomain).join(models.Subdomain).join(models.Domain).filter(models.Domain.domain.ilike(f"%{domain_name}%"))
-    if synonym_en:
-        query = query.filter(models.JobTitle.synonyms_en.contains([synonym_en]))
+    names = JOB_TITLE_EXPAND.parse(expand)
+    fast = FAST_SERIALIZATION and not names
+    items = await coalesce.read(
+        request, db, crud.job_titles.list_job_titles,
+        skill_id=skill_id, skill_name_en=skill_name_en, skill_type=skill_type,
+        subdomain_id=subdomain_id, subdomain_name=subdomain_name,
+        domain_id=domain_id, domain_name=domain_name, synonym_en=synonym_en,
+        after=decode_cursor(cursor), skip=skip, limit=limit, options=JOB_TITLE_EXPAND.options(names), as_dicts=fast,
+    )
+    set_next_link(request, response, items, "job_title", limit)
+    if names:
+        result = JOB_TITLE_EXPAND.response(names, items, response)
+    elif fast:
+        result = rows_response(items, response)
+    else:
+        result = items
+    if include_facets:
+        return await facets.include(db, LIST_FACETS, result, LIST_ADAPTER, response)
+    return result
 
-    job_titles = query.offset(skip).limit(limit).all()
-    return job_titles
-
-@router.get("/{job_title_id}", response_model=schemas.JobTitleResponse)
-def read_job_title(job_title_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_job_title = db.query(models.JobTitle).filter(models.JobTitle.id == job_title_id).first()
+@router.get("/{job_title_id}", response_model=schemas.JobTitleResponse, dependencies=[Depends(conditional(*CACHE_TABLES))])
+async def read_job_title(
+    job_title_id: uuid.UUID,
+    response: Response,
+    expand: List[str] = expand_query(JOB_TITLE_EXPAND.choices),
+    db=Depends(get_read_session)
+):
+    names = JOB_TITLE_EXPAND.parse(expand)
+    db_job_title = await run_db(db, crud.job_titles.get_job_title, job_title_id, options=JOB_TITLE_EXPAND.options(names))
     if db_job_title is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job Title not found")
+    if names:
+        return JOB_TITLE_EXPAND.response(names, db_job_title, response)
     return db_job_title
 
 @router.put("/{job_title_id}", response_model=schemas.JobTitleResponse)
-def update_job_title(job_title_id: uuid.UUID, job_title: schemas.JobTitleUpdate, db: Session = Depends(get_db)):
-    db_job_title = db.query(models.JobTitle).filter(models.JobTitle.id == job_title_id).first()
+@router.patch("/{job_title_id}", response_model=schemas.JobTitleResponse)
+async def update_job_title(job_title_id: uuid.UUID, job_title: schemas.JobTitleUpdate, db=Depends(get_session)):
+    """Change the fields given in the body; omitted fields keep their values."""
+    db_job_title = await run_db(db, crud.job_titles.update_job_title, job_title_id, job_title)
     if db_job_title is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job Title not found")
-    
-    update_data = job_title.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_job_title, key, value)
-    
-    db.add(db_job_title)
-    db.commit()
-    db.refresh(db_job_title)
     return db_job_title
 
 @router.delete("/{job_title_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_job_title(job_title_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_job_title = db.query(models.JobTitle).filter(models.JobTitle.id == job_title_id).first()
-    if db_job_title is None:
+async def delete_job_title(job_title_id: uuid.UUID, db=Depends(get_session)):
+    if not await run_db(db, crud.job_titles.delete_job_title, job_title_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job Title not found")
+    return {"ok": True}
+
+@router.put("/{job_title_id}/core_skills", response_model=schemas.LinkBatchResult)
+async def replace_job_title_core_skills(job_title_id: uuid.UUID, skill_ids: List[uuid.UUID] = Body(...), db=Depends(get_session)):
+    result = await run_batch(db, crud.links.replace_job_title_core_skills, job_title_id, skill_ids)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job Title not found")
+    added, removed = result
+    return schemas.LinkBatchResult(linked=added, unlinked=removed)
+
+@router.put("/{job_title_id}/subdomains", response_model=schemas.LinkBatchResult)
+async def replace_job_title_subdomains(job_title_id: uuid.UUID, subdomain_ids: List[uuid.UUID] = Body(...), db=Depends(get_session)):
+    result = await run_batch(db, crud.links.replace_job_title_subdomains, job_title_id, subdomain_ids)
+    if result is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job Title not found")
-    db.delete(db_job_title)
-    db.commit()
-    return {"ok": True}
\ No newline at end of file
+    added, removed = result
+    return schemas.LinkBatchResult(linked=added, unlinked=removed)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from typing import List
+
+from .. import crud, models, schemas
+from ..database import get_session, run_db
+
+router = APIRouter(
+    prefix="/links",
+    tags=["Links"]
+)
+
+async def run_batch(db, fn, *args):
+    """Run a link write, turning a foreign-key violation into a 404."""
+    try:
+        return await run_db(db, fn, *args)
+    except IntegrityError:
+        await run_db(db, lambda session: session.rollback())
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or more referenced rows do not exist")
+
+@router.post("/skill_subdomain", response_model=schemas.LinkBatchResult)
+async def link_skill_subdomains(links: List[schemas.SkillSubdomainLink], db=Depends(get_session)):
+    pairs = [(link.skill_id, link.subdomain_id) for link in links]
+    return schemas.LinkBatchResult(linked=await run_batch(db, crud.links.link, models.SkillSubdomain, pairs))
+
+@router.post("/skill_subdomain/unlink", response_model=schemas.LinkBatchResult)
+async def unlink_skill_subdomains(links: List[schemas.SkillSubdomainLink], db=Depends(get_session)):
+    pairs = [(link.skill_id, link.subdomain_id) for link in links]
+    return schemas.LinkBatchResult(unlinked=await run_db(db, crud.links.unlink, models.SkillSubdomain, pairs))
+
+@router.post("/job_title_core_skill", response_model=schemas.LinkBatchResult)
+async def link_job_title_core_skills(links: List[schemas.JobTitleCoreSkillLink], db=Depends(get_session)):
+    pairs = [(link.job_title_id, link.skill_id) for link in links]
+    return schemas.LinkBatchResult(linked=await run_batch(db, crud.links.link, models.JobTitleCoreSkill, pairs))
+
+@router.post("/job_title_core_skill/unlink", response_model=schemas.LinkBatchResult)
+async def unlink_job_title_core_skills(links: List[schemas.JobTitleCoreSkillLink], db=Depends(get_session)):
+    pairs = [(link.job_title_id, link.skill_id) for link in links]
+    return schemas.LinkBatchResult(unlinked=await run_db(db, crud.links.unlink, models.JobTitleCoreSkill, pairs))
+
+@router.post("/job_title_subdomain", response_model=schemas.LinkBatchResult)
+async def link_job_title_subdomains(links: List[schemas.JobTitleSubdomainLink], db=Depends(get_session)):
+    pairs = [(link.job_title_id, link.subdomain_id) for link in links]
+    return schemas.LinkBatchResult(linked=await run_batch(db, crud.links.link, models.JobTitleSubdomain, pairs))
+
+@router.post("/job_title_subdomain/unlink", response_model=schemas.LinkBatchResult)
+async def unlink_job_title_subdomains(links: List[schemas.JobTitleSubdomainLink], db=Depends(get_session)):
+    pairs = [(link.job_title_id, link.subdomain_id) for link in links]
+    return schemas.LinkBatchResult(unlinked=await run_db(db, crud.links.unlink, models.JobTitleSubdomain, pairs))
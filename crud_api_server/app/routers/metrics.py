@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from .. import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus exposition of the request and database metrics."""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+
+from .. import schemas, suggest
+from ..database import get_read_session, run_db
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Search"]
+)
+
+def _types(values: List[str]):
+    types = {name.strip() for value in values for name in value.split(",") if name.strip()}
+    unknown = types.difference(suggest.SUGGEST_TYPES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown type(s): {', '.join(sorted(unknown))}; expected {', '.join(suggest.SUGGEST_TYPES)}",
+        )
+    return frozenset(types)
+
+@router.get("/suggest", response_model=List[schemas.Suggestion])
+async def suggest_entities(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    types: List[str] = Query([], description="Only return these entity types: skill, job_title, domain, subdomain."),
+    db=Depends(get_read_session)
+):
+    """Complete a name fragment to skills, job titles, domains and subdomains.
+
+    Matches the start of any word of English or Japanese names and synonyms,
+    ignoring case, full/half width and katakana vs hiragana.
+    """
+    return await run_db(db, suggest.suggest, q, limit, _types(types))
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from typing import List, Optional, Union
 import uuid
 
-from .. import models, schemas
-from ..database import get_db
+from .. import bulk, coalesce, crud, facets, models, related, schemas
+from ..config import FAST_SERIALIZATION
+from ..database import get_read_session, get_session, run_db
+from ..expand import SKILL_EXPAND, expand_query
+from ..http_cache import conditional
+from ..pagination import decode_cursor, set_next_link
+from ..serialization import rows_response
+from .links import run_batch
+
+# Every table a read from this router can touch, through filters or expand=.
+# The lists add the facet views when include_facets=true.
+CACHE_TABLES = ("skill", "skill_subdomain", "subdomain", "domain", "job_title_core_skill", "job_title")
+
+LIST_ADAPTER = TypeAdapter(List[schemas.SkillResponse])
+LIST_FACETS = ("skill_type", "domain")
 
 router = APIRouter(
     prefix="/skills",
@@ -13,15 +25,22 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.SkillResponse, status_code=status.HTTP_201_CREATED)
-def create_skill(skill: schemas.SkillCreate, db: Session = Depends(get_db)):
-    db_skill = models.Skill(**skill.model_dump())
-    db.add(db_skill)
-    db.commit()
-    db.refresh(db_skill)
-    return db_skill
+async def create_skill(skill: schemas.SkillCreate, db=Depends(get_session)):
+    return await run_db(db, crud.skills.create_skill, skill)
+
+@router.post("/bulk", response_model=schemas.BulkResult, openapi_extra=bulk.request_body(schemas.SkillBulkItem))
+async def bulk_upsert_skills(request: Request, db=Depends(get_session)):
+    """Create or update many skills from a JSON array or an NDJSON stream.
 
-@router.get("/", response_model=List[schemas.SkillResponse])
-def read_skills(
+    Rows whose ``id`` already exists are updated; invalid rows are skipped
+    and reported in ``errors``.
+    """
+    return await bulk.ingest(request, db, schemas.SkillBulkItem, crud.skills.bulk_upsert_skills, ["skill"])
+
+@router.get("/", response_model=Union[List[schemas.SkillResponse], schemas.SkillListWithFacets], dependencies=[Depends(conditional(*CACHE_TABLES, when=facets.INCLUDE_TABLES))])
+async def read_skills(
+    request: Request,
+    response: Response,
     skill_type: Optional[models.SkillType] = None,
     subdomain_id: Optional[uuid.UUID] = None,
     subdomain_name: Optional[str] = None,
@@ -30,59 +49,83 @@ def read_skills(
     synonym_en: Optional[str] = None,
     job_title_id: Optional[uuid.UUID] = None,
     job_title_name: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    expand: List[str] = expand_query(SKILL_EXPAND.choices),
+    include_facets: bool = Query(False, description=facets.INCLUDE_DESCRIPTION),
+    db=Depends(get_read_session)
 ):
-    query = db.query(models.Skill)
-    
-    if skill_type:
-        query = query.filter(models.Skill.skill_type == skill_type)
-    if subdomain_id:
-        query = query.join(models.SkillSubdomain).filter(models.SkillSubdomain.subdomain_id == subdomain_id)
-    if subdomain_name:
-        query = query.join(models.SkillSubdomain).join(models.Subdomain).filter(models.Subdomain.subdomain.ilike(f"%{subdomain_name}%"))
-    if domain_id:
-        query = query.join(models.SkillSubdomain).join(models.Subdomain).filter(models.Subdomain.domain_id == domain_id)
-    if domain_name:
-        query = query.join(models.SkillSubdomain).join(models.Subdomain).join(models.Domain).filter(models.Domain.domain.ilike(f"%{domain_name}%"))
-    if synonym_en:
-        query = query.filter(models.Skill.synonyms_en.contains([synonym_en]))
-    if job_title_id:
-        query = query.join(models.JobTitleCoreSkill).filter(models.JobTitleCoreSkill.job_title_id == job_title_id)
-    if job_title_name:
-        query = query.join(models.JobTitleCoreSkill).join(models.JobTitle).filter(models.JobTitle.job_title.ilike(f"%{job_title_name}%"))
-
-    skills = query.offset(skip).limit(limit).all()
-    return skills
+    names = SKILL_EXPAND.parse(expand)
+    fast = FAST_SERIALIZATION and not names
+    items = await coalesce.read(
+        request, db, crud.skills.list_skills,
+        skill_type=skill_type, subdomain_id=subdomain_id, subdomain_name=subdomain_name,
+        domain_id=domain_id, domain_name=domain_name, synonym_en=synonym_en,
+        job_title_id=job_title_id, job_title_name=job_title_name,
+        after=decode_cursor(cursor), skip=skip, limit=limit, options=SKILL_EXPAND.options(names), as_dicts=fast,
+    )
+    set_next_link(request, response, items, "skill_name_en", limit)
+    if names:
+        result = SKILL_EXPAND.response(names, items, response)
+    elif fast:
+        result = rows_response(items, response)
+    else:
+        result = items
+    if include_facets:
+        return await facets.include(db, LIST_FACETS, result, LIST_ADAPTER, response)
+    return result
 
-@router.get("/{skill_id}", response_model=schemas.SkillResponse)
-def read_skill(skill_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
+@router.get("/{skill_id}", response_model=schemas.SkillResponse, dependencies=[Depends(conditional(*CACHE_TABLES))])
+async def read_skill(
+    skill_id: uuid.UUID,
+    response: Response,
+    expand: List[str] = expand_query(SKILL_EXPAND.choices),
+    db=Depends(get_read_session)
+):
+    names = SKILL_EXPAND.parse(expand)
+    db_skill = await run_db(db, crud.skills.get_skill, skill_id, options=SKILL_EXPAND.options(names))
     if db_skill is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+    if names:
+        return SKILL_EXPAND.response(names, db_skill, response)
     return db_skill
 
 @router.put("/{skill_id}", response_model=schemas.SkillResponse)
-def update_skill(skill_id: uuid.UUID, skill: schemas.SkillUpdate, db: Session = Depends(get_db)):
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
+@router.patch("/{skill_id}", response_model=schemas.SkillResponse)
+async def update_skill(skill_id: uuid.UUID, skill: schemas.SkillUpdate, db=Depends(get_session)):
+    """Change the fields given in the body; omitted fields keep their values."""
+    db_skill = await run_db(db, crud.skills.update_skill, skill_id, skill)
     if db_skill is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
-    
-    update_data = skill.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_skill, key, value)
-    
-    db.add(db_skill)
-    db.commit()
-    db.refresh(db_skill)
     return db_skill
 
 @router.delete("/{skill_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_skill(skill_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_skill = db.query(models.Skill).filter(models.Skill.id == skill_id).first()
-    if db_skill is None:
+async def delete_skill(skill_id: uuid.UUID, db=Depends(get_session)):
+    if not await run_db(db, crud.skills.delete_skill, skill_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+    return {"ok": True}
+
+@router.put("/{skill_id}/subdomains", response_model=schemas.LinkBatchResult)
+async def replace_skill_subdomains(skill_id: uuid.UUID, subdomain_ids: List[uuid.UUID] = Body(...), db=Depends(get_session)):
+    result = await run_batch(db, crud.links.replace_skill_subdomains, skill_id, subdomain_ids)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+    added, removed = result
+    return schemas.LinkBatchResult(linked=added, unlinked=removed)
+
+@router.get(
+    "/{skill_id}/related",
+    response_model=List[schemas.RelatedSkill],
+    dependencies=[Depends(conditional(*CACHE_TABLES))],
+)
+async def read_related_skills(
+    skill_id: uuid.UUID,
+    top_k: int = Query(10, ge=1, le=related.MAX_TOP_K),
+    db=Depends(get_read_session)
+):
+    """Skills that share job titles (1 point each) or subdomains (0.5 each) with this one."""
+    result = await run_db(db, related.related_skills, skill_id, top_k)
+    if result is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
-    db.delete(db_skill)
-    db.commit()
-    return {"ok": True}
\ No newline at end of file
+    return result
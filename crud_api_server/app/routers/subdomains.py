@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from typing import List, Optional, Union
 import uuid
 
-from .. import models, schemas
-from ..database import get_db
+from .. import bulk, coalesce, crud, facets, schemas
+from ..config import FAST_SERIALIZATION
+from ..database import get_read_session, get_session, run_db
+from ..expand import SUBDOMAIN_EXPAND, expand_query
+from ..http_cache import conditional
+from ..pagination import decode_cursor, set_next_link
+from ..serialization import rows_response
+
+# Every table a read from this router can touch, through filters or expand=.
+# The lists add the facet views when include_facets=true.
+CACHE_TABLES = ("subdomain", "domain", "skill_subdomain", "skill")
+
+LIST_ADAPTER = TypeAdapter(List[schemas.SubdomainResponse])
+LIST_FACETS = ("domain",)
 
 router = APIRouter(
     prefix="/subdomains",
@@ -12,60 +24,76 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.SubdomainResponse, status_code=status.HTTP_201_CREATED)
-def create_subdomain(subdomain: schemas.SubdomainCreate, db: Session = Depends(get_db)):
-    db_subdomain = models.Subdomain(subdomain=subdomain.subdomain, domain_id=subdomain.domain_id)
-    db.add(db_subdomain)
-    db.commit()
-    
-    db.refresh(db_subdomain)
-    return db_subdomain
+async def create_subdomain(subdomain: schemas.SubdomainCreate, db=Depends(get_session)):
+    return await run_db(db, crud.subdomains.create_subdomain, subdomain)
+
+@router.post("/bulk", response_model=schemas.BulkResult, openapi_extra=bulk.request_body(schemas.SubdomainBulkItem))
+async def bulk_upsert_subdomains(request: Request, db=Depends(get_session)):
+    """Create or update many subdomains from a JSON array or an NDJSON stream.
 
-@router.get("/", response_model=List[schemas.SubdomainResponse])
-def read_subdomains(
+    Rows whose ``id`` already exists are updated; invalid rows are skipped
+    and reported in ``errors``.
+    """
+    return await bulk.ingest(request, db, schemas.SubdomainBulkItem, crud.subdomains.bulk_upsert_subdomains, ["subdomain"])
+
+@router.get("/", response_model=Union[List[schemas.SubdomainResponse], schemas.SubdomainListWithFacets], dependencies=[Depends(conditional(*CACHE_TABLES, when=facets.INCLUDE_TABLES))])
+async def read_subdomains(
+    request: Request,
+    response: Response,
     domain_id: Optional[uuid.UUID] = None,
     domain_name: Optional[str] = None,
     skill_name_en: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    expand: List[str] = expand_query(SUBDOMAIN_EXPAND.choices),
+    include_facets: bool = Query(False, description=facets.INCLUDE_DESCRIPTION),
+    db=Depends(get_read_session)
 ):
-    query = db.query(models.Subdomain).options(joinedload(models.Subdomain.domain))
-    if domain_id:
-        query = query.filter(models.Subdomain.domain_id == domain_id)
-    if domain_name:
-        query = query.join(models.Domain).filter(models.Domain.domain.ilike(f"%{domain_name}%"))
-    if skill_name_en:
-        query = query.join(models.SkillSubdomain).join(models.Skill).filter(models.Skill.skill_name_en.ilike(f"%{skill_name_en}%"))
-    subdomains = query.offset(skip).limit(limit).all()
-    return subdomains
+    names = SUBDOMAIN_EXPAND.parse(expand)
+    fast = FAST_SERIALIZATION and not names
+    items = await coalesce.read(
+        request, db, crud.subdomains.list_subdomains,
+        domain_id=domain_id, domain_name=domain_name, skill_name_en=skill_name_en,
+        after=decode_cursor(cursor), skip=skip, limit=limit, options=SUBDOMAIN_EXPAND.options(names), as_dicts=fast,
+    )
+    set_next_link(request, response, items, "subdomain", limit)
+    if names:
+        result = SUBDOMAIN_EXPAND.response(names, items, response)
+    elif fast:
+        result = rows_response(items, response)
+    else:
+        result = items
+    if include_facets:
+        return await facets.include(db, LIST_FACETS, result, LIST_ADAPTER, response)
+    return result
 
-@router.get("/{subdomain_id}", response_model=schemas.SubdomainResponse)
-def read_subdomain(subdomain_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_subdomain = db.query(models.Subdomain).options(joinedload(models.Subdomain.domain)).filter(models.Subdomain.id == subdomain_id).first()
+@router.get("/{subdomain_id}", response_model=schemas.SubdomainResponse, dependencies=[Depends(conditional(*CACHE_TABLES))])
+async def read_subdomain(
+    subdomain_id: uuid.UUID,
+    response: Response,
+    expand: List[str] = expand_query(SUBDOMAIN_EXPAND.choices),
+    db=Depends(get_read_session)
+):
+    names = SUBDOMAIN_EXPAND.parse(expand)
+    db_subdomain = await run_db(db, crud.subdomains.get_subdomain, subdomain_id, options=SUBDOMAIN_EXPAND.options(names))
     if db_subdomain is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subdomain not found")
+    if names:
+        return SUBDOMAIN_EXPAND.response(names, db_subdomain, response)
     return db_subdomain
 
 @router.put("/{subdomain_id}", response_model=schemas.SubdomainResponse)
-def update_subdomain(subdomain_id: uuid.UUID, subdomain: schemas.SubdomainUpdate, db: Session = Depends(get_db)):
-    db_subdomain = db.query(models.Subdomain).filter(models.Subdomain.id == subdomain_id).first()
+@router.patch("/{subdomain_id}", response_model=schemas.SubdomainResponse)
+async def update_subdomain(subdomain_id: uuid.UUID, subdomain: schemas.SubdomainUpdate, db=Depends(get_session)):
+    """Change the fields given in the body; omitted fields keep their values."""
+    db_subdomain = await run_db(db, crud.subdomains.update_subdomain, subdomain_id, subdomain)
     if db_subdomain is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subdomain not found")
-    
-    update_data = subdomain.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_subdomain, key, value)
-    
-    db.add(db_subdomain)
-    db.commit()
-    db.refresh(db_subdomain)
     return db_subdomain
 
 @router.delete("/{subdomain_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_subdomain(subdomain_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_subdomain = db.query(models.Subdomain).filter(models.Subdomain.id == subdomain_id).first()
-    if db_subdomain is None:
+async def delete_subdomain(subdomain_id: uuid.UUID, db=Depends(get_session)):
+    if not await run_db(db, crud.subdomains.delete_subdomain, subdomain_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subdomain not found")
-    db.delete(db_subdomain)
-    db.commit()
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
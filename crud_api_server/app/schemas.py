@@ -1,7 +1,7 @@
 import uuid
-from typing import List, Optional
-from pydantic import BaseModel, Field
-from .models import SkillType
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator
+from .models import JobTitleCoreSkill, JobTitleSubdomain, SkillSubdomain, SkillType
 
 # Base Schemas
 
@@ -51,8 +51,8 @@ class SkillUpdate(SkillBase):
     skill_name_en: Optional[str] = None
     skill_name_jp: Optional[str] = None
     skill_type: Optional[SkillType] = None
-    synonyms_en: List[str] = Field(default_factory=list)
-    synonyms_jp: List[str] = Field(default_factory=list)
+    synonyms_en: Optional[List[str]] = None
+    synonyms_jp: Optional[List[str]] = None
 
 class JobTitleUpdate(JobTitleBase):
     job_title: Optional[str] = None
@@ -110,15 +110,145 @@ class JobTitleSubdomainLink(BaseModel):
         from_attributes = True
 
 # Nested Response Schemas for relationships
+#
+# The ORM relationships hold association rows (e.g. Skill.subdomains is a
+# list of SkillSubdomain), so the nested lists unwrap them to the entity
+# on the other side.
+
+def _through(field, link_model, attribute):
+    """A before-validator replacing ``link_model`` rows in ``field`` with their ``attribute``."""
+    def unwrap(cls, value):
+        return [getattr(item, attribute) if isinstance(item, link_model) else item for item in value]
+    return field_validator(field, mode="before")(classmethod(unwrap))
 
 class SubdomainWithSkills(SubdomainResponse):
     skills: List[SkillResponse] = []
 
+    _unwrap_skills = _through("skills", SkillSubdomain, "skill")
+
 class SkillWithSubdomains(SkillResponse):
     subdomains: List[SubdomainResponse] = []
 
+    _unwrap_subdomains = _through("subdomains", SkillSubdomain, "subdomain")
+
 class JobTitleWithSkills(JobTitleResponse):
     core_skills: List[SkillResponse] = []
 
+    _unwrap_core_skills = _through("core_skills", JobTitleCoreSkill, "skill")
+
 class JobTitleWithSubdomains(JobTitleResponse):
-    subdomains: List[SubdomainResponse] = []
\ No newline at end of file
+    subdomains: List[SubdomainResponse] = []
+
+    _unwrap_subdomains = _through("subdomains", JobTitleSubdomain, "subdomain")
+
+class JobTitleWithSkillsAndSubdomains(JobTitleWithSkills, JobTitleWithSubdomains):
+    pass
+
+# Bulk Schemas
+
+class DomainBulkItem(DomainCreate):
+    id: Optional[uuid.UUID] = None
+
+class SubdomainBulkItem(SubdomainCreate):
+    id: Optional[uuid.UUID] = None
+
+class SkillBulkItem(SkillCreate):
+    id: Optional[uuid.UUID] = None
+
+class JobTitleBulkItem(JobTitleCreate):
+    id: Optional[uuid.UUID] = None
+
+class BulkRowError(BaseModel):
+    index: int
+    detail: Any
+
+class BulkResult(BaseModel):
+    received: int
+    written: int
+    errors: List[BulkRowError] = []
+
+class LinkBatchResult(BaseModel):
+    linked: int = 0
+    unlinked: int = 0
+
+# Ranking Schemas
+
+class JobTitleRankRequest(BaseModel):
+    skill_ids: List[uuid.UUID] = []
+    skill_names: List[str] = []
+    metric: Literal["jaccard", "coverage", "weighted_coverage"] = "jaccard"
+    top_k: int = Field(20, ge=1, le=1000)
+    min_matched: int = Field(1, ge=1)
+
+class RankedJobTitle(BaseModel):
+    id: uuid.UUID
+    job_title: str
+    score: float
+    matched: int
+    core_skills: int
+
+class JobTitleRankResult(BaseModel):
+    results: List[RankedJobTitle]
+    unknown_skills: List[str] = []
+
+class RelatedSkill(BaseModel):
+    id: uuid.UUID
+    skill_name_en: str
+    score: float
+    shared_job_titles: int
+    shared_subdomains: int
+
+# Search Schemas
+
+class Suggestion(BaseModel):
+    type: Literal["skill", "job_title", "domain", "subdomain"]
+    id: uuid.UUID
+    label: str
+    matched: str
+
+# Facet Schemas
+
+class SkillTypeFacet(BaseModel):
+    skill_type: SkillType
+    skills: int
+
+class DomainFacet(BaseModel):
+    id: uuid.UUID
+    domain: str
+    subdomains: int
+    skills: int
+    job_titles: int
+
+class SubdomainFacet(BaseModel):
+    id: uuid.UUID
+    subdomain: str
+    domain_id: uuid.UUID
+    skills: int
+    job_titles: int
+
+class JobTitleFacet(BaseModel):
+    id: uuid.UUID
+    job_title: str
+    core_skills: int
+
+class ListFacets(BaseModel):
+    """The facets sent with a list page (include_facets=true): counts over
+    the whole taxonomy, not over the filtered list."""
+    skill_type: Optional[List[SkillTypeFacet]] = None
+    domain: Optional[List[DomainFacet]] = None
+
+class DomainListWithFacets(BaseModel):
+    items: List[DomainResponse]
+    facets: ListFacets
+
+class SubdomainListWithFacets(BaseModel):
+    items: List[SubdomainResponse]
+    facets: ListFacets
+
+class SkillListWithFacets(BaseModel):
+    items: List[SkillResponse]
+    facets: ListFacets
+
+class JobTitleListWithFacets(BaseModel):
+    items: List[JobTitleResponse]
+    facets: ListFacets
@@ -0,0 +1,28 @@
+from fastapi import Response
+from pydantic_core import to_json
+from sqlalchemy import type_coerce
+from sqlalchemy.types import NullType
+
+# The fast list path selects plain columns, turns each row into a dict in
+# the field order of the response schema and hands the page to
+# pydantic-core's encoder. The result is byte-for-byte what FastAPI renders
+# through response_model and JSONResponse (compact separators, raw UTF-8,
+# enums by value); benchmarks/serialization.py checks that.
+
+def json_response(body: bytes, response: Response = None) -> Response:
+    """A JSON response for an already encoded ``body``, keeping the headers
+    (Link, ETag, ...) that were set on the injected ``response``."""
+    headers = {} if response is None else {
+        key: value for key, value in response.headers.items() if key != "content-length"
+    }
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def raw(column):
+    """``column`` exactly as psycopg2 returns it: enums as strings and arrays
+    as the driver's lists, without SQLAlchemy's per-row result processing
+    (for an array, a copy of the list built element by element). The
+    encoder writes the same JSON either way."""
+    return type_coerce(column, NullType()).label(column.key)
+
+def rows_response(rows, response: Response = None) -> Response:
+    return json_response(to_json(rows), response)
@@ -0,0 +1,71 @@
+import numpy as np
+
+# 0/1 incidence matrices (job title x skill, skill x subdomain, ...) kept in
+# compressed sparse form with NumPy, which is all the scoring in
+# app/ranking.py and app/related.py needs: gathering the non-zeros of a
+# set of rows or columns and summing them with bincount.
+
+def _compress(major, minor, size):
+    order = np.argsort(major, kind="stable")
+    ptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(major, minlength=size), out=ptr[1:])
+    return ptr, minor[order].astype(np.int32)
+
+def gather(ptr, indices, selected):
+    """The concatenated index runs ``indices[ptr[i]:ptr[i + 1]]`` of every ``i`` in ``selected``."""
+    starts = ptr[selected]
+    lengths = ptr[selected + 1] - starts
+    if not len(lengths):
+        return indices[:0]
+    # Position k of the output comes from run r at offset k - (start of r in the output).
+    run_starts = np.cumsum(lengths) - lengths
+    return indices[np.repeat(starts - run_starts, lengths) + np.arange(lengths.sum())]
+
+class Incidence:
+    """A 0/1 matrix of ``shape`` built from ``(row, column)`` position pairs,
+    stored both row-compressed and column-compressed."""
+
+    def __init__(self, pairs, shape):
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        width = max(shape[1], 1)
+        rows, cols = np.divmod(np.unique(pairs[:, 0] * width + pairs[:, 1]), width)
+        self.shape = shape
+        self.row_ptr, self.row_indices = _compress(rows, cols, shape[0])
+        self.col_ptr, self.col_indices = _compress(cols, rows, shape[1])
+        self.row_degree = np.diff(self.row_ptr)
+        self.col_degree = np.diff(self.col_ptr)
+
+    def row_hits(self, cols, weights=None):
+        """Per row, how many of ``cols`` it has (or the sum of their ``weights``)."""
+        cols = np.asarray(cols, dtype=np.int64)
+        rows = gather(self.col_ptr, self.col_indices, cols)
+        if weights is not None:
+            weights = np.repeat(weights[cols], self.col_degree[cols])
+        return np.bincount(rows, weights=weights, minlength=self.shape[0])
+
+    def col_hits(self, rows, weights=None):
+        """Per column, how many of ``rows`` have it (or the sum of their ``weights``)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = gather(self.row_ptr, self.row_indices, rows)
+        if weights is not None:
+            weights = np.repeat(weights[rows], self.row_degree[rows])
+        return np.bincount(cols, weights=weights, minlength=self.shape[1])
+
+    def row_sums(self, col_weights):
+        """Per row, the sum of ``col_weights`` over its non-zeros."""
+        rows = np.repeat(np.arange(self.shape[0]), self.row_degree)
+        return np.bincount(rows, weights=col_weights[self.row_indices], minlength=self.shape[0])
+
+def top(scores, k, eligible, tiebreak=None):
+    """Positions of the ``k`` best ``eligible`` scores, best first; ties go to
+    the larger ``tiebreak`` and then to the lower position."""
+    candidates = np.flatnonzero(eligible)
+    if len(candidates) > k:
+        # Keep every candidate tied with the k-th best so tiebreaks stay exact.
+        kth = -np.partition(-scores[candidates], k - 1)[k - 1]
+        candidates = candidates[scores[candidates] >= kth]
+    keys = [candidates]
+    if tiebreak is not None:
+        keys.append(-tiebreak[candidates])
+    keys.append(-scores[candidates])
+    return candidates[np.lexsort(keys)][:k]
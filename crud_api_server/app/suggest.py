@@ -0,0 +1,119 @@
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+
+from sqlalchemy import String, cast, select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .versions import VersionedCache
+
+# Typeahead over every name and synonym in the taxonomy. Each text is
+# normalized (NFKC folds full/half-width forms, casefold, katakana to
+# hiragana) and indexed under its start and every word start, in one sorted
+# list, so a query is a bisect plus a short forward scan over the keys that
+# start with it.
+
+SUGGEST_TYPES = ("skill", "job_title", "domain", "subdomain")
+# Keys examined per query; bounds the cost of one- or two-letter queries.
+SCAN_LIMIT = 2000
+# Memoized queries per index; typeahead traffic is mostly a few short prefixes.
+MEMO_SIZE = 10_000
+
+_KATAKANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+_SEPARATORS = frozenset(" -_/()[].,:;&+・、。「」")
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold().translate(_KATAKANA)
+    return " ".join(text.split())
+
+def _script(char: str) -> str:
+    if "\u3040" <= char <= "\u309f" or char == "ー":
+        return "kana"
+    if "\u4e00" <= char <= "\u9fff" or "\u3400" <= char <= "\u4dbf":
+        return "kanji"
+    return "other"
+
+def _word_starts(text: str):
+    """Positions after a separator or where the script changes, so that the
+    parts of unspaced Japanese compounds (データ分析) can be found too."""
+    for pos, char in enumerate(text):
+        if char in _SEPARATORS:
+            continue
+        if pos == 0 or text[pos - 1] in _SEPARATORS or _script(text[pos - 1]) != _script(char):
+            yield pos
+
+class SuggestIndex:
+    def __init__(self, db: Session):
+        connection = db.connection()
+        sources = [
+            ("domain", connection.execute(select(cast(models.Domain.id, String), models.Domain.domain))),
+            ("subdomain", connection.execute(select(cast(models.Subdomain.id, String), models.Subdomain.subdomain))),
+            ("skill", connection.execute(select(
+                cast(models.Skill.id, String), models.Skill.skill_name_en, models.Skill.skill_name_jp,
+                models.Skill.synonyms_en, models.Skill.synonyms_jp,
+            ))),
+            ("job_title", connection.execute(select(
+                cast(models.JobTitle.id, String), models.JobTitle.job_title,
+                models.JobTitle.synonyms_en, models.JobTitle.synonyms_jp,
+            ))),
+        ]
+        entries = []
+        for type, rows in sources:
+            for id, label, *others in rows:
+                texts = [(label, 0)]
+                if type == "skill":
+                    name_jp, *synonyms = others
+                    if name_jp:
+                        texts.append((name_jp, 0))
+                else:
+                    synonyms = others
+                texts.extend((synonym, 1) for values in synonyms for synonym in values or ())
+                for text, field in texts:
+                    key = normalize(text)
+                    for pos in _word_starts(key):
+                        # (key, word start?, field, matched text length) sorts the
+                        # best hit for a key first.
+                        entries.append((key[pos:], pos > 0, field, len(text), type, id, label, text))
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.entries = [entry[1:] for entry in entries]
+        self.lookup = lru_cache(maxsize=MEMO_SIZE)(self._lookup)
+
+    def suggest(self, query: str, limit: int, types=None):
+        query = normalize(query)
+        if not query:
+            return []
+        return self.lookup(query, limit, frozenset(types or ()))
+
+    def _lookup(self, query: str, limit: int, types: frozenset):
+        best = {}
+        start = bisect_left(self.keys, query)
+        for index in range(start, min(start + SCAN_LIMIT, len(self.keys))):
+            key = self.keys[index]
+            if not key.startswith(query):
+                break
+            inner, field, length, type, id, label, text = self.entries[index]
+            if types and type not in types:
+                continue
+            # Exact whole-text matches, then prefixes of the whole text, then
+            # word-start matches; names before synonyms; shorter texts first.
+            rank = (0 if key == query and not inner else 1 if not inner else 2, field, length, label)
+            if (type, id) not in best or rank < best[type, id][0]:
+                best[type, id] = (rank, text)
+        ranked = sorted(best.items(), key=lambda item: item[1][0])[:limit]
+        return [
+            schemas.Suggestion(type=type, id=id, label=rank[-1], matched=text)
+            for (type, id), (rank, text) in ranked
+        ]
+
+class Suggestions(VersionedCache):
+    tables = ("domain", "subdomain", "skill", "job_title")
+
+    def build(self, db: Session):
+        return SuggestIndex(db)
+
+_suggestions = Suggestions()
+
+def suggest(db: Session, query: str, limit: int = 10, types=None):
+    return _suggestions.get(db).suggest(query, limit, types)
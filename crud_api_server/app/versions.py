@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from sqlalchemy import String, bindparam, event, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from . import models, replica
+from .config import VERSION_POLL_INTERVAL
+from .database import SessionLocal
+
+# Every write bumps a per-table counter in the same transaction as the data
+# change. In-process caches compare these counters to decide whether they
+# are stale, which keeps them coherent across uvicorn workers.
+
+def _on_conflict_increment(stmt):
+    table = models.TableVersion.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.table_name],
+        set_={"version": table.c.version + 1},
+    )
+
+def bump(db: Session, *tables: str):
+    table = models.TableVersion.__table__
+    # Sorted so concurrent writers lock the counter rows in the same order.
+    stmt = insert(table).values([{"table_name": name, "version": 1} for name in sorted(set(tables))])
+    db.execute(_on_conflict_increment(stmt))
+    db.info["versions_bumped"] = True
+
+# The bump half of write(), as text because SQLAlchemy cannot cache the
+# compiled form of a PostgreSQL INSERT ... ON CONFLICT or of a VALUES list.
+_BUMP_CHANGED = text("""
+    INSERT INTO table_version (table_name, version)
+    SELECT name, 1 FROM unnest(:names) AS name
+    WHERE EXISTS (SELECT FROM changed)
+    ORDER BY name
+    ON CONFLICT (table_name) DO UPDATE SET version = table_version.version + 1
+""").bindparams(bindparam("names", type_=ARRAY(String)))
+
+def write(db: Session, stmt, *tables: str, query=select):
+    """Execute ``stmt``, an INSERT/UPDATE/DELETE ... RETURNING, and bump
+    ``tables`` in the same statement if it returned any row.
+
+    ``stmt`` becomes the CTE ``changed``; ``query(changed)`` builds the
+    SELECT whose rows are returned, ``select(changed)`` by default.
+    """
+    changed = stmt.cte("changed")
+    increment = _BUMP_CHANGED.bindparams(names=sorted(set(tables))).columns().cte("bump")
+    # Listed explicitly so that changed is rendered before the bump that reads it.
+    rows = db.execute(query(changed).add_cte(changed, increment)).all()
+    if rows:
+        db.info["versions_bumped"] = True
+    return rows
+
+def read(db: Session, tables=None) -> dict:
+    stmt = select(models.TableVersion.table_name, models.TableVersion.version)
+    if tables is not None:
+        stmt = stmt.where(models.TableVersion.table_name.in_(tables))
+    versions = dict.fromkeys(tables or (), 0)
+    versions.update(db.execute(stmt).all())
+    return versions
+
+_caches = []
+
+def _newer(versions: dict, than: dict) -> bool:
+    return versions != than and all(versions[name] >= than[name] for name in than)
+
+# Builds for callers on the event loop (an AsyncSession's run_sync) run
+# here, on a sync session of their own.
+_builder = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-build")
+
+def _on_loop(db: Session) -> bool:
+    return db.get_bind().dialect.is_async
+
+def _wait(db: Session, future: Future):
+    # On the loop, from inside run_sync's greenlet: suspend this greenlet
+    # and let the loop run until the build is done.
+    # Shielded: a caller going away must not cancel the build under the others.
+    if _on_loop(db):
+        return await_only(asyncio.shield(asyncio.wrap_future(future)))
+    return future.result()
+
+class VersionedCache:
+    """A value built from ``tables`` and rebuilt when their versions move.
+
+    Versions are re-read at most every ``VERSION_POLL_INTERVAL`` seconds,
+    and immediately after this process commits a write. Only newer versions
+    rebuild: the session may be the replica's, which lags the primary that
+    built the cached value, and the cache must never step back to its data.
+
+    One build runs at a time. While it does, other callers serve the
+    previous value, or wait for the build when there is none yet. A caller
+    on a sync session builds on it, in its own threadpool thread; one on the
+    event loop hands the build to a thread, on the primary.
+    """
+
+    tables: tuple = ()
+
+    def __init__(self):
+        self._value = None
+        self._versions = None
+        self._checked_at = 0.0
+        self._building = None
+        # Guards _building only, and is never held across I/O, so taking it
+        # on the event loop thread cannot deadlock.
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def build(self, db: Session):
+        raise NotImplementedError
+
+    def expire(self):
+        self._checked_at = 0.0
+
+    def _build_detached(self):
+        with SessionLocal() as db:
+            versions = read(db, self.tables)
+            return self.build(db), versions
+
+    def get(self, db: Session):
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < VERSION_POLL_INTERVAL:
+            return self._value
+        versions = read(db, self.tables)
+        if self._value is not None and not _newer(versions, self._versions):
+            self._checked_at = now
+            return self._value
+        with self._lock:
+            building = self._building
+            owner = building is None
+            if owner:
+                building = self._building = Future()
+        if not owner:
+            return self._value if self._value is not None else _wait(db, building)
+
+        if _on_loop(db):
+            job = _builder.submit(self._build_detached)
+        else:
+            job = Future()
+            try:
+                job.set_result((self.build(db), versions))
+            except BaseException as exc:
+                job.set_exception(exc)
+        # The result is kept even if this caller is cancelled while it waits.
+        job.add_done_callback(partial(self._finish, building, now))
+        return _wait(db, building)
+
+    def _finish(self, building: Future, now: float, job: Future):
+        try:
+            value, versions = job.result()
+        except BaseException as exc:
+            building.set_exception(exc)
+        else:
+            self._value = value
+            self._versions = versions
+            self._checked_at = now
+            building.set_result(value)
+        finally:
+            with self._lock:
+                self._building = None
+
+@event.listens_for(Session, "after_commit")
+def _expire_caches(session):
+    if session.info.pop("versions_bumped", False):
+        for cache in _caches:
+            cache.expire()
+        replica.note_write()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_bump(session):
+    session.info.pop("versions_bumped", None)
@@ -0,0 +1,112 @@
+"""Fire bursts of concurrent list requests at a uvicorn worker with request
+coalescing (app/coalesce.py) and admission control (app/admission.py) off
+and on.
+
+Two bursts per setting: --burst identical requests for one hot query, as
+when many agents run the same prompt at once, and --burst requests spread
+over --distinct different pages of it (each its own limit), which
+coalescing mostly cannot merge. Admission control runs with the defaults
+(15 slots, 5 s queue timeout) and with a tight setting (4 slots, 50
+queued, 1 s). Each burst reports successes, 503s, other failures, latency
+percentiles of the successes and the SQL statements the worker ran for
+them (from /metrics).
+
+    python -m benchmarks.coalesce --burst 200
+
+Run from crud_api_server/ against a populated database (DATABASE_URL),
+e.g. after benchmarks.generate.
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+SETTINGS = {
+    "off": {"COALESCE_READS": "false", "DB_MAX_CONCURRENCY": "0"},
+    "coalesce": {"COALESCE_READS": "true", "DB_MAX_CONCURRENCY": "0"},
+    "coalesce+admit": {"COALESCE_READS": "true"},
+    "admit 4/50/1s": {"COALESCE_READS": "true", "DB_MAX_CONCURRENCY": "4", "DB_MAX_QUEUE": "50", "DB_QUEUE_TIMEOUT": "1"},
+}
+PATH = "/job_titles/"
+STATEMENTS = re.compile(r'^db_statements_per_request_sum\{method="GET",route="/job_titles/"\} (\S+)$', re.M)
+
+def start(env, port: int, timeout: float = 60.0):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "critical"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0).status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError(f"no response within {timeout}s")
+
+async def statements(client) -> float:
+    match = STATEMENTS.search((await client.get("/metrics")).text)
+    return float(match.group(1)) if match else 0.0
+
+async def burst(client, params):
+    async def one(query):
+        started = time.perf_counter()
+        try:
+            response = await client.get(PATH, params=query)
+        except httpx.HTTPError:
+            return None, 0.0
+        return response.status_code, (time.perf_counter() - started) * 1e3
+
+    before = await statements(client)
+    results = await asyncio.gather(*(one(query) for query in params))
+    return results, await statements(client) - before
+
+def percentile(samples, q):
+    return statistics.quantiles(samples, n=100)[q - 1] if len(samples) > 1 else (samples[0] if samples else 0.0)
+
+async def run(args, setting):
+    limits = httpx.Limits(max_connections=args.burst, max_keepalive_connections=args.burst)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120.0, limits=limits) as client:
+        # Warm the pool and the plans outside the measurement.
+        await client.get(PATH, params={"limit": 1})
+        hot = {"domain_name": args.domain_name, "skill_type": "technical"}
+        bursts = {
+            "identical": [hot] * args.burst,
+            "distinct": [{**hot, "limit": 100 - n % args.distinct} for n in range(args.burst)],
+        }
+        for name, params in bursts.items():
+            results, executed = await burst(client, params)
+            ok = sorted(ms for status, ms in results if status == 200)
+            busy = sum(status == 503 for status, _ in results)
+            failed = len(results) - len(ok) - busy
+            print(f"{setting:<15} {name:<10} {len(ok):>5} {busy:>5} {failed:>6} "
+                  f"{percentile(ok, 50):>8.0f} {percentile(ok, 99):>8.0f} {executed:>6.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=50)
+    parser.add_argument("--domain-name", default="Security")
+    parser.add_argument("--port", type=int, default=8798)
+    args = parser.parse_args()
+
+    print(f"{'setting':<15} {'burst':<10} {'ok':>5} {'503':>5} {'failed':>6} {'p50 ms':>8} {'p99 ms':>8} {'stmts':>6}")
+    for setting, overrides in SETTINGS.items():
+        env = dict(os.environ, PYTHONPATH=os.getcwd(), MOUNT_MCP="false", FACETS_REFRESH_INTERVAL="0", **overrides)
+        server = start(env, args.port)
+        try:
+            asyncio.run(run(args, setting))
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Time the facet views (app/facets.py): reading each one, running its
+defining query live instead, and refreshing it CONCURRENTLY.
+
+    python -m benchmarks.facets --repeat 20
+
+Run from crud_api_server/ against a migrated, populated database
+(DATABASE_URL), e.g. after benchmarks.generate.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import facets
+from app.database import engine
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        facets.refresh(db)
+        print(f"{'view':<18} {'rows':>7} {'view ms':>8} {'live ms':>8} {'refresh ms':>11}")
+        for view in facets.VIEWS:
+            live = db.execute(text("SELECT pg_get_viewdef(CAST(:view AS regclass))"), {"view": view}).scalar()
+            rows = len(db.execute(text(f"SELECT * FROM {view}")).all())
+            read_ms = timed(lambda: db.execute(text(f"SELECT * FROM {view}")).all(), args.repeat)
+            live_ms = timed(lambda: db.execute(text(live)).all(), max(1, args.repeat // 4))
+            refresh_ms = timed(lambda: db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")), max(1, args.repeat // 4))
+            db.commit()
+            print(f"{view:<18} {rows:>7} {read_ms:>8.2f} {live_ms:>8.2f} {refresh_ms:>11.1f}")
+
+if __name__ == "__main__":
+    main()
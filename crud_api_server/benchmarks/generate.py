@@ -0,0 +1,204 @@
+"""Fill the taxonomy tables with a reproducible synthetic data set.
+
+Everything is derived from --seed, including the UUIDs, so two runs with
+the same arguments produce identical tables and load runs can be compared.
+Rows are loaded with COPY and the table versions are bumped in the same
+transaction, so a running server drops its caches.
+
+Fan-out follows the shape of the real taxonomy: a skill sits in one to
+four subdomains, a job title in one to three, and a job title requires
+5-40 core skills, mostly from its own subdomains and otherwise from a
+small set of very common ones (a Zipf-like popularity curve).
+
+    python -m benchmarks.generate --scale 100k --reset
+
+Scales are 1k, 10k, 100k and 1m skills; --skills, --job-titles,
+--domains and --subdomains override the derived sizes. Run from
+crud_api_server/ against a migrated database (DATABASE_URL).
+"""
+import argparse
+import csv
+import io
+import random
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app import versions
+from app.database import engine
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+TABLES = ("domain", "subdomain", "skill", "job_title", "skill_subdomain", "job_title_core_skill", "job_title_subdomain")
+
+DOMAINS = (
+    "Software Engineering", "Data", "Infrastructure", "Security", "Design", "Product",
+    "Sales", "Marketing", "Finance", "Human Resources", "Operations", "Legal",
+    "Healthcare", "Manufacturing", "Education", "Logistics",
+)
+TOPICS = (
+    "Fundamentals", "Tooling", "Architecture", "Testing", "Operations", "Analytics",
+    "Automation", "Compliance", "Strategy", "Research", "Quality", "Integration",
+)
+TECHNOLOGIES = (
+    ("Python", "パイソン"), ("Java", "ジャバ"), ("Go", "ゴー"), ("Rust", "ラスト"), ("TypeScript", "タイプスクリプト"),
+    ("SQL", "エスキューエル"), ("PostgreSQL", "ポストグレス"), ("Kubernetes", "クバネティス"), ("Docker", "ドッカー"),
+    ("Terraform", "テラフォーム"), ("AWS", "エーダブリューエス"), ("React", "リアクト"), ("Spark", "スパーク"),
+    ("Kafka", "カフカ"), ("Linux", "リナックス"), ("Excel", "エクセル"), ("Salesforce", "セールスフォース"),
+    ("Figma", "フィグマ"), ("Tableau", "タブロー"), ("SAP", "エスエーピー"),
+)
+ACTIVITIES = (
+    ("Development", "開発"), ("Testing", "テスト"), ("Design", "設計"), ("Analysis", "分析"),
+    ("Administration", "管理"), ("Migration", "移行"), ("Optimization", "最適化"), ("Security", "セキュリティ"),
+    ("Operations", "運用"), ("Modeling", "モデリング"), ("Reporting", "レポーティング"), ("Integration", "統合"),
+)
+SOFT_SKILLS = (
+    ("Communication", "コミュニケーション"), ("Negotiation", "交渉"), ("Leadership", "リーダーシップ"),
+    ("Presentation", "プレゼンテーション"), ("Mentoring", "メンタリング"), ("Facilitation", "ファシリテーション"),
+    ("Problem Solving", "問題解決"), ("Time Management", "時間管理"),
+)
+SOFT_CONTEXTS = ("", "Cross-team", "Customer", "Executive", "Remote", "Written")
+LEVELS = ("Junior", "", "Senior", "Lead", "Staff", "Principal")
+FIELDS = ("Backend", "Frontend", "Data", "Cloud", "Security", "QA", "Mobile", "ML", "Platform", "Sales", "Finance", "HR")
+ROLES = (
+    ("Engineer", "エンジニア"), ("Developer", "開発者"), ("Analyst", "アナリスト"), ("Manager", "マネージャー"),
+    ("Architect", "アーキテクト"), ("Consultant", "コンサルタント"), ("Specialist", "スペシャリスト"),
+)
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _array(values) -> str:
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'"{value}"' for value in escaped) + "}"
+
+def _numbered(name: str, round: int) -> str:
+    return f"{name} {round + 1}" if round else name
+
+def domains(rng, count):
+    return [(_uuid(rng), _numbered(DOMAINS[n % len(DOMAINS)], n // len(DOMAINS))) for n in range(count)]
+
+def subdomains(rng, count, domain_rows):
+    rows = []
+    for n in range(count):
+        domain_id, domain = domain_rows[n % len(domain_rows)]
+        topic = TOPICS[(n // len(domain_rows)) % len(TOPICS)]
+        rows.append((_uuid(rng), _numbered(f"{domain} {topic}", n // (len(domain_rows) * len(TOPICS))), domain_id))
+    return rows
+
+def skills(rng, count):
+    technical = len(TECHNOLOGIES) * len(ACTIVITIES)
+    soft = len(SOFT_SKILLS) * len(SOFT_CONTEXTS)
+    rows = []
+    for n in range(count):
+        roll = rng.random()
+        if roll < 0.15:
+            (name_en, name_jp), context = SOFT_SKILLS[n % len(SOFT_SKILLS)], SOFT_CONTEXTS[(n // len(SOFT_SKILLS)) % len(SOFT_CONTEXTS)]
+            name_en = _numbered(f"{context} {name_en}".strip(), n // soft)
+            rows.append((_uuid(rng), name_en, name_jp, "soft", [name_en.lower()], []))
+            continue
+        (tech_en, tech_jp), (activity_en, activity_jp) = TECHNOLOGIES[n % len(TECHNOLOGIES)], ACTIVITIES[(n // len(TECHNOLOGIES)) % len(ACTIVITIES)]
+        name_en = _numbered(f"{tech_en} {activity_en}", n // technical)
+        name_jp = f"{tech_jp}{activity_jp}" if rng.random() < 0.6 else None
+        synonyms_en = [f"{tech_en.lower()}-{activity_en.lower()}"] if rng.random() < 0.5 else []
+        synonyms_jp = [f"{tech_en}{activity_jp}"] if name_jp and rng.random() < 0.3 else []
+        rows.append((_uuid(rng), name_en, name_jp, "technical" if roll < 0.9 else "other", synonyms_en, synonyms_jp))
+    return rows
+
+def job_titles(rng, count):
+    combinations = len(LEVELS) * len(FIELDS) * len(ROLES)
+    rows = []
+    for n in range(count):
+        level, field = LEVELS[n % len(LEVELS)], FIELDS[(n // len(LEVELS)) % len(FIELDS)]
+        role_en, role_jp = ROLES[(n // (len(LEVELS) * len(FIELDS))) % len(ROLES)]
+        name = _numbered(f"{level} {field} {role_en}".strip(), n // combinations)
+        rows.append((_uuid(rng), name, [f"{field} {role_en}".lower()], [f"{field}{role_jp}"]))
+    return rows
+
+def _popular(rng, count):
+    # u ** 3 piles most draws onto the first few percent of skills.
+    return int(count * rng.random() ** 3)
+
+def links(rng, skill_rows, subdomain_rows, job_rows):
+    skill_subdomain = []
+    by_subdomain = [[] for _ in subdomain_rows]
+    for skill_id, *_ in skill_rows:
+        for pos in rng.sample(range(len(subdomain_rows)), min(1 + int(rng.expovariate(1.5)), 4, len(subdomain_rows))):
+            skill_subdomain.append((skill_id, subdomain_rows[pos][0]))
+            by_subdomain[pos].append(skill_id)
+
+    job_title_subdomain = []
+    job_title_core_skill = []
+    for job_id, *_ in job_rows:
+        own = rng.sample(range(len(subdomain_rows)), min(rng.randint(1, 3), len(subdomain_rows)))
+        job_title_subdomain.extend((job_id, subdomain_rows[pos][0]) for pos in own)
+        local = [skill_id for pos in own for skill_id in by_subdomain[pos]]
+        wanted = min(max(5, int(rng.lognormvariate(2.6, 0.5))), 40, len(skill_rows))
+        chosen = set()
+        for _ in range(wanted * 3):
+            if len(chosen) >= wanted:
+                break
+            if local and rng.random() < 0.7:
+                chosen.add(rng.choice(local))
+            else:
+                chosen.add(skill_rows[_popular(rng, len(skill_rows))][0])
+        job_title_core_skill.extend((job_id, skill_id) for skill_id in sorted(chosen))
+    return skill_subdomain, job_title_core_skill, job_title_subdomain
+
+def copy(cursor, table, columns, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows[start:start + batch_size]:
+            writer.writerow([_array(value) if isinstance(value, list) else value for value in row])
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--skills", type=int)
+    parser.add_argument("--job-titles", type=int)
+    parser.add_argument("--domains", type=int)
+    parser.add_argument("--subdomains", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="empty the seven tables first")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    skill_count = args.skills or SCALES[args.scale]
+    domain_count = args.domains or max(8, round(skill_count ** (1 / 3)))
+    subdomain_count = args.subdomains or domain_count * 10
+    job_title_count = args.job_titles or max(100, skill_count // 10)
+
+    started = time.perf_counter()
+    rng = random.Random(args.seed)
+    domain_rows = domains(rng, domain_count)
+    subdomain_rows = subdomains(rng, subdomain_count, domain_rows)
+    skill_rows = skills(rng, skill_count)
+    job_rows = job_titles(rng, job_title_count)
+    skill_subdomain, job_title_core_skill, job_title_subdomain = links(rng, skill_rows, subdomain_rows, job_rows)
+    print(f"generated in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        cursor = db.connection().connection.cursor()
+        if args.reset:
+            cursor.execute(f"TRUNCATE {', '.join(TABLES)}")
+        copy(cursor, "domain", ("id", "domain"), domain_rows, args.batch_size)
+        copy(cursor, "subdomain", ("id", "subdomain", "domain_id"), subdomain_rows, args.batch_size)
+        copy(cursor, "skill", ("id", "skill_name_en", "skill_name_jp", "skill_type", "synonyms_en", "synonyms_jp"), skill_rows, args.batch_size)
+        copy(cursor, "job_title", ("id", "job_title", "synonyms_en", "synonyms_jp"), job_rows, args.batch_size)
+        copy(cursor, "skill_subdomain", ("skill_id", "subdomain_id"), skill_subdomain, args.batch_size)
+        copy(cursor, "job_title_core_skill", ("job_title_id", "skill_id"), job_title_core_skill, args.batch_size)
+        copy(cursor, "job_title_subdomain", ("job_title_id", "subdomain_id"), job_title_subdomain, args.batch_size)
+        versions.bump(db, *TABLES)
+        db.commit()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql("ANALYZE " + ", ".join(TABLES))
+    print(f"loaded in {time.perf_counter() - started:.1f}s")
+    for table, rows in zip(TABLES, (domain_rows, subdomain_rows, skill_rows, job_rows, skill_subdomain, job_title_core_skill, job_title_subdomain)):
+        print(f"{table:<22} {len(rows):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Drive a running server with a concurrent, reproducible request mix.
+
+Reads a sample of the data through the API, then runs --concurrency
+workers for --duration seconds. Each iteration is either a read, drawn from
+every combination of every list filter, the single-entity reads, search,
+related skills and ranking, or (with probability --write-ratio) a full
+create / read / update / link / delete cycle on one entity type. Filter
+values are taken from related sampled rows, so combined filters mostly
+match something.
+
+Every request is recorded under a scenario key such as
+``GET /skills/?domain_name&skill_type`` and the raw latencies are written
+to --output for benchmarks/report.py.
+
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --duration 60 --output before.json
+
+Workers are seeded from --seed, so two runs issue the same request sequence
+as long as the responses (and so the data) are the same.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import time
+
+import httpx
+
+LIST_FILTERS = {
+    "domains": ("subdomain_name",),
+    "subdomains": ("domain_id", "domain_name", "skill_name_en"),
+    "skills": (
+        "skill_type", "synonym_en", "subdomain_id", "subdomain_name",
+        "domain_id", "domain_name", "job_title_id", "job_title_name",
+    ),
+    "job_titles": (
+        "synonym_en", "skill_id", "skill_name_en", "skill_type",
+        "subdomain_id", "subdomain_name", "domain_id", "domain_name",
+    ),
+}
+LIST_EXPANDS = {"subdomains": "skills", "skills": "subdomains", "job_titles": "core_skills,subdomains"}
+ENTITIES = ("domains", "subdomains", "skills", "job_titles")
+
+def _fragment(rng, name):
+    return rng.choice(name.split())
+
+class Sample:
+    """Rows read through the API that request parameters are drawn from."""
+
+    async def load(self, client, offsets):
+        self.domains, self.subdomains, self.skills, self.job_titles = [], [], [], []
+        for name, rows in (
+            ("domains", self.domains), ("subdomains", self.subdomains),
+            ("skills", self.skills), ("job_titles", self.job_titles),
+        ):
+            for skip in offsets:
+                params = {"skip": skip, "limit": 100}
+                if name in LIST_EXPANDS:
+                    params["expand"] = LIST_EXPANDS[name]
+                page = (await client.get(f"/{name}/", params=params)).raise_for_status().json()
+                if not page:
+                    break
+                rows.extend(page)
+        if not (self.domains and self.subdomains and self.skills and self.job_titles):
+            raise SystemExit("every table needs rows; run benchmarks.generate first")
+        self.domain_names = {row["id"]: row["domain"] for row in self.domains}
+        self.jobs_by_skill = {}
+        for job in self.job_titles:
+            for skill in job["core_skills"]:
+                self.jobs_by_skill.setdefault(skill["id"], []).append(job)
+
+    def filter_values(self, rng, entity):
+        """One consistent set of values for every filter of ``entity``."""
+        if entity == "domains":
+            subdomain = rng.choice(self.subdomains)
+            return {"subdomain_name": _fragment(rng, subdomain["subdomain"])}
+        if entity == "subdomains":
+            subdomain = rng.choice([row for row in self.subdomains if row["skills"]] or self.subdomains)
+            skill = rng.choice(subdomain["skills"]) if subdomain["skills"] else rng.choice(self.skills)
+            return {
+                "domain_id": subdomain["domain_id"],
+                "domain_name": _fragment(rng, subdomain["domain"]["domain"]),
+                "skill_name_en": _fragment(rng, skill["skill_name_en"]),
+            }
+        if entity == "skills":
+            skill = rng.choice(self.skills)
+            subdomain = rng.choice(skill["subdomains"]) if skill["subdomains"] else rng.choice(self.subdomains)
+            job = rng.choice(self.jobs_by_skill.get(skill["id"]) or self.job_titles)
+            return {
+                "skill_type": skill["skill_type"],
+                "synonym_en": rng.choice(skill["synonyms_en"] or ["-"]),
+                "subdomain_id": subdomain["id"],
+                "subdomain_name": _fragment(rng, subdomain["subdomain"]),
+                "domain_id": subdomain["domain_id"],
+                "domain_name": _fragment(rng, self.domain_names.get(subdomain["domain_id"], "-")),
+                "job_title_id": job["id"],
+                "job_title_name": _fragment(rng, job["job_title"]),
+            }
+        job = rng.choice(self.job_titles)
+        skill = rng.choice(job["core_skills"]) if job["core_skills"] else rng.choice(self.skills)
+        subdomain = rng.choice(job["subdomains"]) if job["subdomains"] else rng.choice(self.subdomains)
+        return {
+            "synonym_en": rng.choice(job["synonyms_en"] or ["-"]),
+            "skill_id": skill["id"],
+            "skill_name_en": _fragment(rng, skill["skill_name_en"]),
+            "skill_type": skill["skill_type"],
+            "subdomain_id": subdomain["id"],
+            "subdomain_name": _fragment(rng, subdomain["subdomain"]),
+            "domain_id": subdomain["domain_id"],
+            "domain_name": _fragment(rng, self.domain_names.get(subdomain["domain_id"], "-")),
+        }
+
+def list_scenarios():
+    """Every subset of every list endpoint's filters, the empty one included."""
+    scenarios = []
+    for entity, filters in LIST_FILTERS.items():
+        for size in range(len(filters) + 1):
+            scenarios.extend((entity, combination) for combination in itertools.combinations(filters, size))
+    return scenarios
+
+class Recorder:
+    def __init__(self):
+        self.scenarios = {}
+        self.recording = False
+
+    async def request(self, client, key, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as exc:
+            response, status = None, type(exc).__name__
+        elapsed = (time.perf_counter() - started) * 1e3
+        if self.recording:
+            entry = self.scenarios.setdefault(key, {"latencies_ms": [], "statuses": {}})
+            entry["latencies_ms"].append(round(elapsed, 3))
+            entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+        return response if response is not None and response.is_success else None
+
+async def read(rng, client, recorder, sample, scenarios, page_size):
+    roll = rng.random()
+    if roll < 0.7:
+        entity, combination = rng.choice(scenarios)
+        values = sample.filter_values(rng, entity)
+        params = {name: values[name] for name in combination}
+        params["limit"] = page_size
+        key = f"GET /{entity}/?{'&'.join(combination)}" if combination else f"GET /{entity}/"
+        await recorder.request(client, key, "GET", f"/{entity}/", params=params)
+    elif roll < 0.85:
+        entity = rng.choice(ENTITIES)
+        row = rng.choice(getattr(sample, entity))
+        await recorder.request(client, f"GET /{entity}/{{id}}", "GET", f"/{entity}/{row['id']}")
+    elif roll < 0.93:
+        label = rng.choice(sample.skills + sample.job_titles)
+        text = label.get("skill_name_en") or label["job_title"]
+        query = text[:rng.randint(1, min(len(text), 8))]
+        await recorder.request(client, "GET /search/suggest", "GET", "/search/suggest", params={"q": query})
+    elif roll < 0.97:
+        skill = rng.choice(sample.skills)
+        await recorder.request(client, "GET /skills/{id}/related", "GET", f"/skills/{skill['id']}/related")
+    else:
+        job = rng.choice(sample.job_titles)
+        skill_ids = [skill["id"] for skill in job["core_skills"]][:rng.randint(1, 10)]
+        await recorder.request(client, "POST /job_titles/rank", "POST", "/job_titles/rank", json={"skill_ids": skill_ids})
+
+async def write(rng, client, recorder, sample, label):
+    entity = rng.choice(ENTITIES)
+    if entity == "domains":
+        body, update = {"domain": f"{label} domain"}, {"domain": f"{label} domain renamed"}
+    elif entity == "subdomains":
+        domain_id = rng.choice(sample.domains)["id"]
+        body, update = {"subdomain": f"{label} subdomain", "domain_id": domain_id}, {"subdomain": f"{label} subdomain renamed"}
+    elif entity == "skills":
+        body = {"skill_name_en": f"{label} skill", "skill_type": rng.choice(("soft", "technical", "other")), "synonyms_en": [label]}
+        update = {"skill_name_jp": f"{label} スキル"}
+    else:
+        body, update = {"job_title": f"{label} job title", "synonyms_en": [label]}, {"job_title": f"{label} job title renamed"}
+
+    created = await recorder.request(client, f"POST /{entity}/", "POST", f"/{entity}/", json=body)
+    if created is None:
+        return
+    url = f"/{entity}/{created.json()['id']}"
+    await recorder.request(client, f"GET /{entity}/{{id}}", "GET", url)
+    await recorder.request(client, f"PUT /{entity}/{{id}}", "PUT", url, json=update)
+    if entity == "skills":
+        subdomain_ids = [row["id"] for row in rng.sample(sample.subdomains, min(2, len(sample.subdomains)))]
+        await recorder.request(client, "PUT /skills/{id}/subdomains", "PUT", f"{url}/subdomains", json=subdomain_ids)
+    elif entity == "job_titles":
+        skill_ids = [row["id"] for row in rng.sample(sample.skills, min(10, len(sample.skills)))]
+        await recorder.request(client, "PUT /job_titles/{id}/core_skills", "PUT", f"{url}/core_skills", json=skill_ids)
+    await recorder.request(client, f"DELETE /{entity}/{{id}}", "DELETE", url)
+
+async def worker(number, args, client, recorder, sample, scenarios, deadline):
+    rng = random.Random(args.seed * 1_000_003 + number)
+    for iteration in itertools.count():
+        if time.monotonic() >= deadline:
+            return
+        if rng.random() < args.write_ratio:
+            await write(rng, client, recorder, sample, f"bench {args.seed}-{number}-{iteration}")
+        else:
+            await read(rng, client, recorder, sample, scenarios, args.page_size)
+
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        sample = Sample()
+        await sample.load(client, args.sample_offsets)
+        scenarios = list_scenarios()
+        recorder = Recorder()
+
+        async def phase(seconds):
+            deadline = time.monotonic() + seconds
+            await asyncio.gather(*(
+                worker(number, args, client, recorder, sample, scenarios, deadline)
+                for number in range(args.concurrency)
+            ))
+
+        if args.warmup:
+            await phase(args.warmup)
+        recorder.recording = True
+        started = time.monotonic()
+        await phase(args.duration)
+        elapsed = time.monotonic() - started
+
+    return {
+        "meta": {
+            "base_url": args.base_url, "revision": _revision(), "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "concurrency": args.concurrency, "write_ratio": args.write_ratio, "page_size": args.page_size,
+            "seed": args.seed, "label": args.label,
+        },
+        "duration_s": round(elapsed, 3),
+        "scenarios": recorder.scenarios,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-offsets", type=int, nargs="+", default=[0, 1_000, 10_000, 100_000],
+                        help="list offsets the parameter sample is read from")
+    parser.add_argument("--label", help="free text stored with the results, e.g. the change under test")
+    parser.add_argument("--output", default="load.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f)
+    requests = sum(len(entry["latencies_ms"]) for entry in results["scenarios"].values())
+    print(f"{requests} requests in {results['duration_s']:.1f}s across {len(results['scenarios'])} scenarios -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare the native MCP tool (app/mcp_tools.py) with the tools and
+resources generated from the OpenAPI schema, through an in-process client.
+
+For each scenario it reports the median latency, the MCP calls made and
+the bytes of text returned to the model, plus the size of the tool and
+resource listings a client loads up front. The generated GET resources
+take no query parameters, so the scenarios are the lookups both can do:
+first pages of every list, and related skills for a few skills.
+
+    python -m benchmarks.mcp_tools --repeat 20
+
+Run from crud_api_server/ against a populated database (DATABASE_URL),
+e.g. after benchmarks.generate.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastmcp import Client
+
+from app.main import create_app
+from app.mcp_server import create_mcp
+
+OPENAPI = "resource://openapi/"
+LISTS = ("domains", "subdomains", "skills", "job_titles")
+
+def listing_bytes(*listings) -> int:
+    return sum(len(json.dumps(item.model_dump(mode="json"), separators=(",", ":"))) for items in listings for item in items)
+
+async def read_all(client, uris):
+    texts = []
+    for uri in uris:
+        texts.extend(content.text for content in await client.read_resource(uri))
+    return texts
+
+async def native(client, queries):
+    return [content.text for content in await client.call_tool("query_taxonomy", {"queries": queries})]
+
+async def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        texts = await fn()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples), sum(len(text.encode()) for text in texts)
+
+async def run(args):
+    app = create_app(mount_mcp=False)
+    async with Client(create_mcp(app, "openapi")) as generated, Client(create_mcp(app, "native")) as tools:
+        print(f"listing bytes: generated {listing_bytes(await generated.list_tools(), await generated.list_resources(), await generated.list_resource_templates())}, "
+              f"native {listing_bytes(await tools.list_tools())}\n")
+
+        first = json.loads((await native(tools, [{"resource": "skills", "limit": args.skills, "select": ["id"]}]))[0])
+        skill_ids = [row[0] for row in first[0]["rows"]]
+        scenarios = {
+            "first page of each list": (
+                [f"{OPENAPI}read_{name}_{name}__get" for name in LISTS],
+                [{"resource": name, "limit": 100} for name in LISTS],
+            ),
+            f"related skills x{len(skill_ids)}": (
+                [f"{OPENAPI}read_related_skills_skills__skill_id__related_get/{id}" for id in skill_ids],
+                [{"resource": "related_skills", "skill_id": id} for id in skill_ids],
+            ),
+        }
+
+        print(f"{'scenario':<26} {'toolset':<10} {'calls':>5} {'p50 ms':>8} {'bytes':>8}")
+        for name, (uris, queries) in scenarios.items():
+            p50, size = await timed(lambda: read_all(generated, uris), args.repeat)
+            print(f"{name:<26} {'generated':<10} {len(uris):>5} {p50:>8.1f} {size:>8}")
+            p50, size = await timed(lambda: native(tools, queries), args.repeat)
+            print(f"{name:<26} {'native':<10} {1:>5} {p50:>8.1f} {size:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skills", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Time the job title ranking index (app/ranking.py).
+
+Seeds a synthetic taxonomy inside a transaction that is rolled back at the
+end (the same data as benchmarks/search_plans.py), builds the index once
+and scores every job title for random skill sets of several sizes with
+each metric, next to the equivalent GROUP BY query for reference.
+
+    python -m benchmarks.ranking --skills 200000 --job-titles 20000
+
+Run from crud_api_server/ against a migrated database (DATABASE_URL).
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import engine
+from app.ranking import RankingIndex
+from benchmarks.search_plans import SEED
+
+METRICS = ("jaccard", "coverage", "weighted_coverage")
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples), max(samples)
+
+def sql_overlap(db: Session, skill_ids, top_k):
+    link = models.JobTitleCoreSkill
+    matched = func.count().label("matched")
+    stmt = (
+        select(link.job_title_id, matched)
+        .where(link.skill_id.in_(skill_ids))
+        .group_by(link.job_title_id)
+        .order_by(matched.desc())
+        .limit(top_k)
+    )
+    return db.execute(stmt).all()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--subdomains", type=int, default=500)
+    parser.add_argument("--skills", type=int, default=200_000)
+    parser.add_argument("--job-titles", type=int, default=20_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        db.connection().exec_driver_sql(SEED, vars(args))
+        started = time.perf_counter()
+        index = RankingIndex(db)
+        print(f"index built in {time.perf_counter() - started:.2f}s: "
+              f"{index.matrix.shape[0]} job titles x {index.matrix.shape[1]} skills, "
+              f"{len(index.matrix.row_indices)} links\n")
+
+        rng = np.random.default_rng(0)
+        skill_ids = list(index.skill_index)
+        print(f"{'skills':>6} {'metric':<18} {'p50 ms':>8} {'max ms':>8}")
+        for size in args.sizes:
+            chosen = rng.choice(len(skill_ids), size=size, replace=False)
+            for metric in METRICS:
+                p50, worst = timed(lambda: index.rank(chosen, metric, args.top_k), args.repeat)
+                print(f"{size:>6} {metric:<18} {p50:>8.3f} {worst:>8.3f}")
+            ids = [skill_ids[pos] for pos in chosen]
+            p50, worst = timed(lambda: sql_overlap(db, ids, args.top_k), max(1, args.repeat // 10))
+            print(f"{size:>6} {'SQL GROUP BY':<18} {p50:>8.3f} {worst:>8.3f}")
+        db.rollback()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Summarize benchmarks/load.py results, or compare two runs.
+
+    python -m benchmarks.report after.json
+    python -m benchmarks.report before.json after.json
+
+Rows are grouped by endpoint (the filter combinations of a list endpoint
+are folded together), or by full scenario with --by scenario. A
+comparison prints the baseline and candidate p50/p95/p99 and throughput
+for every row both runs have, with the relative change; rows whose p95
+moved by more than --threshold percent are flagged.
+"""
+import argparse
+import json
+import math
+
+COLUMNS = ("p50", "p95", "p99")
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return math.nan
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+def group_key(scenario: str, by: str) -> str:
+    return scenario if by == "scenario" else scenario.split("?")[0]
+
+def summarize(results, by):
+    groups = {}
+    for scenario, entry in results["scenarios"].items():
+        group = groups.setdefault(group_key(scenario, by), {"latencies": [], "errors": 0})
+        group["latencies"].extend(entry["latencies_ms"])
+        group["errors"] += sum(count for status, count in entry["statuses"].items() if not status.startswith(("2", "3")))
+    summary = {}
+    for key, group in groups.items():
+        latencies = sorted(group["latencies"])
+        summary[key] = {
+            "count": len(latencies),
+            "errors": group["errors"],
+            "rps": len(latencies) / results["duration_s"],
+            **{column: percentile(latencies, float(column[1:])) for column in COLUMNS},
+            "max": latencies[-1] if latencies else math.nan,
+        }
+    everything = sorted(value for entry in results["scenarios"].values() for value in entry["latencies_ms"])
+    summary["TOTAL"] = {
+        "count": len(everything),
+        "errors": sum(row["errors"] for row in summary.values()),
+        "rps": len(everything) / results["duration_s"],
+        **{column: percentile(everything, float(column[1:])) for column in COLUMNS},
+        "max": everything[-1] if everything else math.nan,
+    }
+    return summary
+
+def _describe(results):
+    meta = results["meta"]
+    return (f"{meta.get('label') or '-'} @ {meta.get('revision') or '?'}, {meta['concurrency']} workers, "
+            f"{results['duration_s']:.0f}s, write ratio {meta['write_ratio']}")
+
+def _ordered(summary):
+    return sorted(summary, key=lambda key: (key == "TOTAL", key))
+
+def single(results, by):
+    summary = summarize(results, by)
+    width = max(len(key) for key in summary)
+    print(_describe(results))
+    print(f"{'':<{width}} {'count':>7} {'errors':>6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for key in _ordered(summary):
+        row = summary[key]
+        print(f"{key:<{width}} {row['count']:>7} {row['errors']:>6} {row['rps']:>8.1f} "
+              f"{row['p50']:>8.2f} {row['p95']:>8.2f} {row['p99']:>8.2f} {row['max']:>8.2f}")
+
+def _change(before, after):
+    if not before or math.isnan(before) or math.isnan(after):
+        return math.nan
+    return (after - before) / before * 100
+
+def compare(baseline, candidate, by, threshold):
+    before, after = summarize(baseline, by), summarize(candidate, by)
+    keys = [key for key in _ordered(after) if key in before]
+    width = max(len(key) for key in keys)
+    print(f"baseline:  {_describe(baseline)}")
+    print(f"candidate: {_describe(candidate)}")
+    header = " ".join(f"{name + ' ms':>22}" for name in COLUMNS)
+    print(f"  {'':<{width}} {header} {'rps':>22} {'errors':>9}")
+    for key in keys:
+        old, new = before[key], after[key]
+        cells = [f"{old[name]:>7.2f} {new[name]:>7.2f} {_change(old[name], new[name]):>+5.0f}%" for name in COLUMNS]
+        cells.append(f"{old['rps']:>7.1f} {new['rps']:>7.1f} {_change(old['rps'], new['rps']):>+5.0f}%")
+        flag = "!" if abs(_change(old["p95"], new["p95"])) > threshold else " "
+        print(f"{flag} {key:<{width}} {' '.join(cells)} {old['errors']:>4} {new['errors']:>4}")
+    for key in sorted(set(before) ^ set(after)):
+        print(f"  {key}: only in {'baseline' if key in before else 'candidate'}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("results", nargs="+", help="one result file, or a baseline and a candidate")
+    parser.add_argument("--by", choices=("endpoint", "scenario"), default="endpoint")
+    parser.add_argument("--threshold", type=float, default=10, help="flag p95 changes above this many percent")
+    args = parser.parse_args()
+    if len(args.results) > 2:
+        parser.error("give one result file, or a baseline and a candidate")
+
+    runs = []
+    for path in args.results:
+        with open(path) as f:
+            runs.append(json.load(f))
+    if len(runs) == 1:
+        single(runs[0], args.by)
+    else:
+        compare(runs[0], runs[1], args.by, args.threshold)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Show how the search indexes change the plans of the list filters.
+
+Seeds a synthetic taxonomy inside a transaction that is rolled back at the
+end, then runs EXPLAIN ANALYZE for representative list queries twice: once
+with index scans disabled (what the planner had to do before migration
+0002) and once with them enabled.
+
+    python -m benchmarks.search_plans --skills 200000
+
+Run from crud_api_server/ against a migrated database (DATABASE_URL).
+"""
+import argparse
+import time
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import engine
+from app.filters import JOB_TITLE_FILTERS, SKILL_FILTERS
+
+# Related rows are picked by hashing into a numbered copy of the target
+# table; the numbering join is a hash join, so seeding stays linear.
+SEED = """
+INSERT INTO domain (id, domain)
+    SELECT gen_random_uuid(), 'domain ' || md5(g::text) FROM generate_series(1, %(domains)s) g;
+INSERT INTO subdomain (id, subdomain, domain_id)
+    SELECT gen_random_uuid(), 'subdomain ' || md5(g::text), d.id
+    FROM generate_series(1, %(subdomains)s) g
+    JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM domain) d
+        ON d.n = g %% (SELECT count(*) FROM domain);
+INSERT INTO skill (id, skill_name_en, skill_type, synonyms_en, synonyms_jp)
+    SELECT gen_random_uuid(), 'skill ' || md5(g::text),
+           (ARRAY['soft', 'technical', 'other'])[1 + g %% 3]::skilltype,
+           ARRAY['syn' || g, 'alias' || (g %% 1000)], ARRAY['同義語' || g]
+    FROM generate_series(1, %(skills)s) g;
+INSERT INTO job_title (id, job_title, synonyms_en, synonyms_jp)
+    SELECT gen_random_uuid(), 'job title ' || md5(g::text), ARRAY['jt' || g], ARRAY[]::varchar[]
+    FROM generate_series(1, %(job_titles)s) g;
+INSERT INTO skill_subdomain (skill_id, subdomain_id)
+    SELECT s.id, sd.id
+    FROM skill s CROSS JOIN generate_series(1, 2) k
+    JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM subdomain) sd
+        ON sd.n = abs(hashtext(s.id::text || k)) %% (SELECT count(*) FROM subdomain)
+    ON CONFLICT DO NOTHING;
+INSERT INTO job_title_core_skill (job_title_id, skill_id)
+    SELECT j.id, s.id
+    FROM job_title j CROSS JOIN generate_series(1, 15) k
+    JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM skill) s
+        ON s.n = abs(hashtext(j.id::text || k)) %% (SELECT count(*) FROM skill)
+    ON CONFLICT DO NOTHING;
+INSERT INTO job_title_subdomain (job_title_id, subdomain_id)
+    SELECT j.id, sd.id
+    FROM job_title j CROSS JOIN generate_series(1, 2) k
+    JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM subdomain) sd
+        ON sd.n = abs(hashtext(j.id::text || k)) %% (SELECT count(*) FROM subdomain)
+    ON CONFLICT DO NOTHING;
+ANALYZE;
+"""
+
+def queries(db: Session):
+    skill_id = db.query(models.JobTitleCoreSkill.skill_id).limit(1).scalar()
+    subdomain_id = db.query(models.Subdomain.id).limit(1).scalar()
+    yield "skills ?skill_name substring", db.query(models.Skill).filter(models.Skill.skill_name_en.ilike("%abc1%"))
+    yield "skills ?synonym_en", SKILL_FILTERS.apply(db.query(models.Skill), synonym_en="syn4242")
+    yield "skills ?subdomain_id", SKILL_FILTERS.apply(db.query(models.Skill), subdomain_id=subdomain_id)
+    yield "job_titles ?skill_id", JOB_TITLE_FILTERS.apply(db.query(models.JobTitle), skill_id=skill_id)
+    yield "job_titles ?skill_name_en", JOB_TITLE_FILTERS.apply(db.query(models.JobTitle), skill_name_en="abc1")
+    yield "job_titles ?domain_name", JOB_TITLE_FILTERS.apply(db.query(models.JobTitle), domain_name="abc")
+
+def explain(db: Session, query, limit: int):
+    compiled = query.order_by(None).limit(limit).statement.compile(dialect=postgresql.dialect())
+    rows = db.connection().exec_driver_sql("EXPLAIN (ANALYZE, COSTS OFF) " + str(compiled), compiled.params)
+    return [row[0] for row in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--subdomains", type=int, default=500)
+    parser.add_argument("--skills", type=int, default=200_000)
+    parser.add_argument("--job-titles", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        started = time.perf_counter()
+        db.connection().exec_driver_sql(SEED, vars(args))
+        print(f"seeded in {time.perf_counter() - started:.1f}s\n")
+        for name, query in queries(db):
+            for indexes in ("off", "on"):
+                db.connection().exec_driver_sql(f"SET LOCAL enable_indexscan = {indexes}")
+                db.connection().exec_driver_sql(f"SET LOCAL enable_bitmapscan = {indexes}")
+                print(f"== {name} (indexes {indexes})")
+                print("\n".join(explain(db, query, args.limit)))
+                print()
+        db.rollback()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare the default list serialization with the FAST_SERIALIZATION path.
+
+Seeds a synthetic taxonomy inside a transaction that is rolled back at the
+end (the same data as benchmarks/search_plans.py), then for every list
+endpoint loads one page both ways and times it:
+
+  orm   ORM objects, validated through the route's response_model and
+        rendered by JSONResponse, as FastAPI does it
+  fast  column tuples encoded by pydantic-core (app/serialization.py)
+
+Every page is checked to be byte-identical between the two paths.
+
+    python -m benchmarks.serialization --limit 100 --repeat 200
+
+Run from crud_api_server/ against a migrated database (DATABASE_URL), with
+TAXONOMY_CACHE off.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.database import engine
+from app.routers import domains, job_titles, skills, subdomains
+from app.serialization import rows_response
+from benchmarks.search_plans import SEED
+
+ENDPOINTS = (
+    ("domains", domains.router, "read_domains", crud.domains.list_domains),
+    ("subdomains", subdomains.router, "read_subdomains", crud.subdomains.list_subdomains),
+    ("skills", skills.router, "read_skills", crud.skills.list_skills),
+    ("job_titles", job_titles.router, "read_job_titles", crud.job_titles.list_job_titles),
+)
+
+def _route(router, name):
+    return next(route for route in router.routes if route.name == name)
+
+async def orm_page(db: Session, route, list_fn, limit: int):
+    db.expunge_all()
+    started = time.perf_counter()
+    items = list_fn(db, limit=limit)
+    fetched = time.perf_counter()
+    content = await serialize_response(field=route.response_field, response_content=items, is_coroutine=True)
+    body = JSONResponse(content).body
+    return body, fetched - started, time.perf_counter() - fetched
+
+async def fast_page(db: Session, route, list_fn, limit: int):
+    started = time.perf_counter()
+    items = list_fn(db, limit=limit, as_dicts=True)
+    fetched = time.perf_counter()
+    body = rows_response(items).body
+    return body, fetched - started, time.perf_counter() - fetched
+
+async def run(db: Session, limit: int, repeat: int):
+    print(f"{'endpoint':<12} {'path':<5} {'fetch ms':>9} {'encode ms':>10} {'total ms':>9}")
+    for name, router, route_name, list_fn in ENDPOINTS:
+        route = _route(router, route_name)
+        paths = {"orm": orm_page, "fast": fast_page}
+        fetch = dict.fromkeys(paths, float("inf"))
+        encode = dict.fromkeys(paths, float("inf"))
+        # Alternated, so that both paths run under the same cache and load.
+        for _ in range(repeat):
+            bodies = set()
+            for path, page in paths.items():
+                body, fetch_time, encode_time = await page(db, route, list_fn, limit)
+                bodies.add(body)
+                fetch[path] = min(fetch[path], fetch_time)
+                encode[path] = min(encode[path], encode_time)
+            if len(bodies) != 1:
+                raise SystemExit(f"{name}: fast path output differs from the default path")
+        for path in paths:
+            print(f"{name:<12} {path:<5} {fetch[path] * 1e3:>9.3f} {encode[path] * 1e3:>10.3f} {(fetch[path] + encode[path]) * 1e3:>9.3f}")
+    print("\nall pages byte-identical")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--subdomains", type=int, default=500)
+    parser.add_argument("--skills", type=int, default=20_000)
+    parser.add_argument("--job-titles", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        db.connection().exec_driver_sql(SEED, vars(args))
+        asyncio.run(run(db, args.limit, args.repeat))
+        db.rollback()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Time worker startup: importing app.main, and from launching uvicorn to
+the first successful response, with and without the mounted MCP server.
+
+Each sample is a fresh interpreter, so nothing is warm but the OS page
+cache.
+
+    python -m benchmarks.startup --repeat 5
+
+Run from crud_api_server/. The database is not needed: startup must not
+touch it.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+IMPORT = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+def import_seconds(env) -> float:
+    result = subprocess.run([sys.executable, "-c", IMPORT], env=env, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def first_response_seconds(env, port: int, timeout: float = 60.0) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    print(f"{'MOUNT_MCP':<10} {'import s':>9} {'first response s':>17}")
+    for mount in ("false", "true"):
+        env = dict(os.environ, MOUNT_MCP=mount, PYTHONPATH=os.getcwd())
+        imports = [import_seconds(env) for _ in range(args.repeat)]
+        responses = [first_response_seconds(env, args.port) for _ in range(args.repeat)]
+        print(f"{mount:<10} {statistics.median(imports):>9.3f} {statistics.median(responses):>17.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time the typeahead index (app/suggest.py).
+
+Seeds a synthetic taxonomy inside a transaction that is rolled back at the
+end (the same data as benchmarks/search_plans.py), builds the index once and
+completes random prefixes of the seeded names, one to six characters long,
+both cold and with the per-index memo warm.
+
+    python -m benchmarks.suggest --skills 200000 --job-titles 20000
+
+Run from crud_api_server/ against a migrated database (DATABASE_URL).
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.suggest import SuggestIndex
+from benchmarks.search_plans import SEED
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--subdomains", type=int, default=500)
+    parser.add_argument("--skills", type=int, default=200_000)
+    parser.add_argument("--job-titles", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        db.connection().exec_driver_sql(SEED, vars(args))
+        started = time.perf_counter()
+        index = SuggestIndex(db)
+        print(f"index built in {time.perf_counter() - started:.2f}s: {len(index.keys)} keys\n")
+        db.rollback()
+
+    rng = random.Random(0)
+    print(f"{'chars':>5} {'memo':<5} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'qps':>8}")
+    for length in range(1, 7):
+        queries = [key[:length] for key in rng.choices(index.keys, k=args.queries)]
+        for memo in ("cold", "warm"):
+            samples = []
+            for query in queries:
+                if memo == "cold":
+                    index.lookup.cache_clear()
+                started = time.perf_counter()
+                index.suggest(query, args.limit)
+                samples.append((time.perf_counter() - started) * 1e3)
+            samples.sort()
+            p50, p99 = samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+            print(f"{length:>5} {memo:<5} {p50:>8.3f} {p99:>8.3f} {samples[-1]:>8.3f} {len(samples) / sum(samples) * 1e3:>8.0f}")
+
+if __name__ == "__main__":
+    main()
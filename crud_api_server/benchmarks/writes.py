@@ -0,0 +1,96 @@
+"""Compare the single-statement write path (app/crud/skills.py) with the
+ORM path it replaced (load, assign, flush, bump, commit, refresh).
+
+Each path creates, updates and deletes ``--rows`` skills and reports
+writes per second and SQL statements per write. Every write commits, as
+it does behind the API; the delete pass removes what the create pass added,
+so only the table version counters are left changed.
+
+    python -m benchmarks.writes --rows 2000
+
+Run from crud_api_server/ against a migrated database (DATABASE_URL).
+"""
+import argparse
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas, versions
+from app.database import engine
+
+def legacy_create(db: Session, skill: schemas.SkillCreate):
+    db_skill = models.Skill(**skill.model_dump())
+    db.add(db_skill)
+    versions.bump(db, "skill")
+    db.commit()
+    db.refresh(db_skill)
+    return db_skill
+
+def legacy_update(db: Session, skill_id, skill: schemas.SkillUpdate):
+    db_skill = crud.skills.get_skill(db, skill_id)
+    if db_skill is None:
+        return None
+    for key, value in skill.model_dump(exclude_unset=True).items():
+        setattr(db_skill, key, value)
+    versions.bump(db, "skill")
+    db.commit()
+    db.refresh(db_skill)
+    return db_skill
+
+def legacy_delete(db: Session, skill_id) -> bool:
+    db_skill = crud.skills.get_skill(db, skill_id)
+    if db_skill is None:
+        return False
+    db.delete(db_skill)
+    versions.bump(db, "skill", "skill_subdomain", "job_title_core_skill")
+    db.commit()
+    return True
+
+PATHS = {
+    "orm": (legacy_create, legacy_update, legacy_delete),
+    "returning": (crud.skills.create_skill, crud.skills.update_skill, crud.skills.delete_skill),
+}
+
+def skill_id(result):
+    return result["id"] if isinstance(result, dict) else result.id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    print(f"{'path':<10} {'op':<7} {'writes/s':>9} {'stmts/write':>12}")
+    for path, (create, update, delete) in PATHS.items():
+        with Session(engine) as db:
+            ids = []
+
+            def create_all():
+                for n in range(args.rows):
+                    skill = schemas.SkillCreate(skill_name_en=f"bench {path} {n}", skill_type=models.SkillType.technical)
+                    ids.append(skill_id(create(db, skill)))
+
+            def update_all():
+                for n, id_ in enumerate(ids):
+                    update(db, id_, schemas.SkillUpdate(skill_name_en=f"bench {path} {n} renamed"))
+
+            def delete_all():
+                for id_ in ids:
+                    delete(db, id_)
+
+            for op, fn in (("create", create_all), ("update", update_all), ("delete", delete_all)):
+                statements = 0
+                started = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - started
+                print(f"{path:<10} {op:<7} {args.rows / elapsed:>9.0f} {statements / args.rows:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""initial schema
+
+Tables as previously created by Base.metadata.create_all. Databases that
+were bootstrapped that way should be marked with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-06-02
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "domain",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("domain", sa.String(), nullable=False),
+    )
+    op.create_table(
+        "skill",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("skill_name_en", sa.String(), nullable=False),
+        sa.Column("skill_name_jp", sa.String()),
+        sa.Column("skill_type", sa.Enum("soft", "technical", "other", name="skilltype"), nullable=False),
+        sa.Column("synonyms_en", postgresql.ARRAY(sa.String())),
+        sa.Column("synonyms_jp", postgresql.ARRAY(sa.String())),
+    )
+    op.create_table(
+        "job_title",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("job_title", sa.String(), nullable=False),
+        sa.Column("synonyms_en", postgresql.ARRAY(sa.String())),
+        sa.Column("synonyms_jp", postgresql.ARRAY(sa.String())),
+    )
+    op.create_table(
+        "subdomain",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("subdomain", sa.String(), nullable=False),
+        sa.Column("domain_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("domain.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_table(
+        "skill_subdomain",
+        sa.Column("skill_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("subdomain_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("subdomain.id", ondelete="CASCADE"), primary_key=True),
+    )
+    op.create_table(
+        "job_title_core_skill",
+        sa.Column("job_title_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("job_title.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("skill_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True),
+    )
+    op.create_table(
+        "job_title_subdomain",
+        sa.Column("job_title_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("job_title.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("subdomain_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("subdomain.id", ondelete="CASCADE"), primary_key=True),
+    )
+
+def downgrade():
+    op.drop_table("job_title_subdomain")
+    op.drop_table("job_title_core_skill")
+    op.drop_table("skill_subdomain")
+    op.drop_table("subdomain")
+    op.drop_table("job_title")
+    op.drop_table("skill")
+    op.drop_table("domain")
+    sa.Enum(name="skilltype").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,69 @@
+"""search and join indexes
+
+Trigram GIN indexes for the ILIKE '%x%' name filters, GIN indexes for the
+synonym arrays (ARRAY @> lookups), B-tree indexes for the link-table FK
+columns not already leading a primary key, and (name, id) indexes for
+keyset pagination. Indexes are built CONCURRENTLY so the migration can run
+against a live database.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-06-02
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+TRIGRAM = [
+    ("domain", "domain"),
+    ("subdomain", "subdomain"),
+    ("skill", "skill_name_en"),
+    ("job_title", "job_title"),
+]
+ARRAYS = [
+    ("skill", "synonyms_en"),
+    ("skill", "synonyms_jp"),
+    ("job_title", "synonyms_en"),
+    ("job_title", "synonyms_jp"),
+]
+FOREIGN_KEYS = [
+    ("subdomain", "domain_id"),
+    ("skill_subdomain", "subdomain_id"),
+    ("job_title_core_skill", "skill_id"),
+    ("job_title_subdomain", "subdomain_id"),
+]
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for table, column in TRIGRAM:
+            op.create_index(
+                f"ix_{table}_{column}_keyset", table, [column, "id"],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.create_index(
+                f"ix_{table}_{column}_trgm", table, [column],
+                postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        for table, column in ARRAYS:
+            op.create_index(
+                f"ix_{table}_{column}", table, [column],
+                postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+            )
+        for table, column in FOREIGN_KEYS:
+            op.create_index(
+                f"ix_{table}_{column}", table, [column],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, column in FOREIGN_KEYS + ARRAYS:
+            op.drop_index(f"ix_{table}_{column}", table_name=table, postgresql_concurrently=True, if_exists=True)
+        for table, column in TRIGRAM:
+            op.drop_index(f"ix_{table}_{column}_trgm", table_name=table, postgresql_concurrently=True, if_exists=True)
+            op.drop_index(f"ix_{table}_{column}_keyset", table_name=table, postgresql_concurrently=True, if_exists=True)
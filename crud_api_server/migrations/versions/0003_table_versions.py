@@ -0,0 +1,26 @@
+"""per-table version counters
+
+Bumped by every write; in-process caches poll them to detect changes made
+by other workers.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-06-09
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "table_version",
+        sa.Column("table_name", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+def downgrade():
+    op.drop_table("table_version")
@@ -0,0 +1,82 @@
+"""facet count materialized views
+
+Counts for the /facets endpoints and include_facets=true: skills per
+skill type, subdomains/skills/job titles per domain, skills/job titles
+per subdomain and core skills per job title. Each view has a unique index
+so it can be refreshed CONCURRENTLY; facet_refresh records when.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-06-23
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Each count is one GROUP BY over a link table joined back by the entity's
+# id, which refreshes several times faster than a correlated count per row.
+VIEWS = {
+    "facet_skill_type": """
+        SELECT skill_type, count(*) AS skills
+        FROM skill
+        GROUP BY skill_type
+    """,
+    "facet_domain": """
+        SELECT d.id, d.domain,
+            coalesce(sd.n, 0) AS subdomains, coalesce(sk.n, 0) AS skills, coalesce(jt.n, 0) AS job_titles
+        FROM domain d
+        LEFT JOIN (SELECT domain_id, count(*) AS n FROM subdomain GROUP BY domain_id) sd ON sd.domain_id = d.id
+        LEFT JOIN (
+            SELECT s.domain_id, count(DISTINCT ss.skill_id) AS n
+            FROM skill_subdomain ss JOIN subdomain s ON s.id = ss.subdomain_id
+            GROUP BY s.domain_id
+        ) sk ON sk.domain_id = d.id
+        LEFT JOIN (
+            SELECT s.domain_id, count(DISTINCT js.job_title_id) AS n
+            FROM job_title_subdomain js JOIN subdomain s ON s.id = js.subdomain_id
+            GROUP BY s.domain_id
+        ) jt ON jt.domain_id = d.id
+    """,
+    "facet_subdomain": """
+        SELECT s.id, s.subdomain, s.domain_id, coalesce(sk.n, 0) AS skills, coalesce(jt.n, 0) AS job_titles
+        FROM subdomain s
+        LEFT JOIN (SELECT subdomain_id, count(*) AS n FROM skill_subdomain GROUP BY subdomain_id) sk ON sk.subdomain_id = s.id
+        LEFT JOIN (SELECT subdomain_id, count(*) AS n FROM job_title_subdomain GROUP BY subdomain_id) jt ON jt.subdomain_id = s.id
+    """,
+    "facet_job_title": """
+        SELECT j.id, j.job_title, coalesce(c.n, 0) AS core_skills
+        FROM job_title j
+        LEFT JOIN (SELECT job_title_id, count(*) AS n FROM job_title_core_skill GROUP BY job_title_id) c ON c.job_title_id = j.id
+    """,
+}
+# (view, index name, columns, unique)
+INDEXES = [
+    ("facet_skill_type", "ux_facet_skill_type", "skill_type", True),
+    ("facet_domain", "ux_facet_domain", "id", True),
+    ("facet_subdomain", "ux_facet_subdomain", "id", True),
+    ("facet_subdomain", "ix_facet_subdomain_keyset", "subdomain, id", False),
+    ("facet_subdomain", "ix_facet_subdomain_domain_id", "domain_id", False),
+    ("facet_job_title", "ux_facet_job_title", "id", True),
+    ("facet_job_title", "ix_facet_job_title_keyset", "job_title, id", False),
+]
+
+def upgrade():
+    op.create_table(
+        "facet_refresh",
+        sa.Column("view_name", sa.String(), primary_key=True),
+        sa.Column("source_version", sa.BigInteger(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    for name, query in VIEWS.items():
+        op.execute(f"CREATE MATERIALIZED VIEW {name} AS {query}")
+    for view, index, columns, unique in INDEXES:
+        op.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX {index} ON {view} ({columns})")
+
+def downgrade():
+    for name in VIEWS:
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
+    op.drop_table("facet_refresh")
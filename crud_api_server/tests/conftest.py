@@ -0,0 +1,160 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app import coalesce, models
+from app import database as app_database
+from app.database import engine, get_read_session, get_session
+from app.main import create_app
+
+# Tests that need PostgreSQL run against DATABASE_URL, migrated with
+# python -m app.migrate, and are skipped when it cannot be reached. Each one
+# works inside a transaction that is rolled back, so the database may be
+# empty or hold a generated data set.
+
+# A small taxonomy, seeded per test. Names get a per-test prefix; the
+# relations are chosen so that filters on one relation only match when a
+# single linked row satisfies all of them.
+DOMAINS = ("alpha", "beta")
+SUBDOMAINS = {"red": "alpha", "blue": "alpha", "red two": "beta"}
+SKILLS = {
+    # name: (skill_type, synonyms_en, subdomains)
+    "python": ("technical", ["snake"], ["red", "blue"]),
+    "speaking": ("soft", ["talk"], ["blue", "red two"]),
+    "pyspark": ("technical", ["snake"], ["red two"]),
+    "lonely": ("other", [], []),
+}
+JOB_TITLES = {
+    # name: (synonyms_en, core skills, subdomains)
+    "developer": (["coder"], ["python", "speaking"], ["red"]),
+    "analyst": ([], ["pyspark", "speaking"], ["red two"]),
+    "manager": (["coder"], ["speaking"], ["blue", "red two"]),
+    "idle": ([], [], []),
+}
+
+class Taxonomy:
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.domains = {name: uuid.uuid4() for name in DOMAINS}
+        self.subdomains = {name: uuid.uuid4() for name in SUBDOMAINS}
+        self.skills = {name: uuid.uuid4() for name in SKILLS}
+        self.job_titles = {name: uuid.uuid4() for name in JOB_TITLES}
+
+    def name(self, name: str) -> str:
+        return f"{self.prefix} {name}"
+
+    def seed(self, db: Session):
+        db.add_all(models.Domain(id=id, domain=self.name(name)) for name, id in self.domains.items())
+        db.flush()
+        db.add_all(
+            models.Subdomain(id=id, subdomain=self.name(name), domain_id=self.domains[SUBDOMAINS[name]])
+            for name, id in self.subdomains.items()
+        )
+        for name, (skill_type, synonyms, subdomains) in SKILLS.items():
+            db.add(models.Skill(
+                id=self.skills[name], skill_name_en=self.name(name), skill_type=models.SkillType(skill_type),
+                synonyms_en=synonyms, synonyms_jp=[],
+            ))
+        for name, (synonyms, _, _) in JOB_TITLES.items():
+            db.add(models.JobTitle(id=self.job_titles[name], job_title=self.name(name), synonyms_en=synonyms, synonyms_jp=[]))
+        db.flush()
+        for name, (_, _, subdomains) in SKILLS.items():
+            db.add_all(models.SkillSubdomain(skill_id=self.skills[name], subdomain_id=self.subdomains[s]) for s in subdomains)
+        for name, (_, skills, subdomains) in JOB_TITLES.items():
+            job_title_id = self.job_titles[name]
+            db.add_all(models.JobTitleCoreSkill(job_title_id=job_title_id, skill_id=self.skills[s]) for s in skills)
+            db.add_all(models.JobTitleSubdomain(job_title_id=job_title_id, subdomain_id=self.subdomains[s]) for s in subdomains)
+        db.flush()
+        db.expunge_all()
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with engine.connect() as connection:
+            migrated = inspect(connection).has_table("table_version")
+    except OperationalError as exc:
+        pytest.skip(f"PostgreSQL at DATABASE_URL is not reachable: {exc.orig}")
+    if not migrated:
+        pytest.skip("the database at DATABASE_URL is not migrated (python -m app.migrate)")
+    return engine
+
+@pytest.fixture(autouse=True)
+def _async_pool():
+    """asyncpg connections belong to the event loop that opened them, and
+    each test runs its own loop: drop them (unclosed) after every test."""
+    yield
+    for async_engine in (app_database.async_engine, app_database.async_read_engine):
+        if async_engine is not None:
+            async_engine.sync_engine.dispose(close=False)
+
+@pytest.fixture
+def db(database):
+    connection = database.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture
+def taxonomy(db) -> Taxonomy:
+    seeded = Taxonomy(f"test-{uuid.uuid4().hex[:12]}")
+    seeded.seed(db)
+    # Into the test's transaction: a session rollback (the ETag check ends
+    # its read with one) must not take the seed with it.
+    db.commit()
+    return seeded
+
+@pytest.fixture(scope="module")
+def seeded(database):
+    """``(session, taxonomy)``: one seeded taxonomy for a whole module, for
+    tests that only read and build an index over the whole database, which
+    takes seconds on a generated data set."""
+    connection = database.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        seeded = Taxonomy(f"test-{uuid.uuid4().hex[:12]}")
+        seeded.seed(session)
+        session.commit()
+        yield session, seeded
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """The app, with every request on the test's session. Coalesced reads
+    would open sessions of their own, so they are off."""
+
+    def session():
+        yield db
+
+    monkeypatch.setattr(coalesce, "COALESCE_READS", False)
+    app = create_app(mount_mcp=False)
+    app.dependency_overrides[get_session] = session
+    app.dependency_overrides[get_read_session] = session
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def statements(database):
+    """The SQL statements run on the engine while the test runs."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(database, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(database, "before_cursor_execute", record)
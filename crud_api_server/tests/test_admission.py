@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.admission import BUSY_DETAIL, Limiter
+from app.config import DB_RETRY_AFTER
+
+# The admission limiter on its own, on one event loop: no database.
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def _assert_busy(exc: HTTPException):
+    assert exc.status_code == 503
+    assert exc.detail == BUSY_DETAIL
+    assert exc.headers == {"Retry-After": str(DB_RETRY_AFTER)}
+
+def test_waiters_are_served_in_arrival_order():
+    async def main():
+        limiter = Limiter(1, 3, 5)
+        await limiter.acquire()
+        served = []
+
+        async def wait(name):
+            await limiter.acquire()
+            served.append(name)
+
+        tasks = []
+        for name in "abc":
+            tasks.append(asyncio.ensure_future(wait(name)))
+            await _settle()
+        for expected in ("a", "ab", "abc"):
+            limiter.release()
+            await _settle()
+            assert "".join(served) == expected
+            assert limiter.active == 1
+        limiter.release()
+        assert limiter.active == 0
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+def test_a_full_queue_is_busy():
+    async def main():
+        limiter = Limiter(1, 1, 5)
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await _settle()
+        with pytest.raises(HTTPException) as raised:
+            await limiter.acquire()
+        _assert_busy(raised.value)
+        limiter.release()
+        await waiting
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_a_long_wait_is_busy():
+    async def main():
+        limiter = Limiter(1, 1, 0.05)
+        await limiter.acquire()
+        with pytest.raises(HTTPException) as raised:
+            await limiter.acquire()
+        _assert_busy(raised.value)
+        # The timed-out waiter left the queue.
+        assert not limiter._waiters
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_a_cancelled_waiter_leaves_the_queue():
+    async def main():
+        limiter = Limiter(1, 2, 5)
+        await limiter.acquire()
+        cancelled = asyncio.ensure_future(limiter.acquire())
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await _settle()
+        cancelled.cancel()
+        await _settle()
+        assert len(limiter._waiters) == 1
+        limiter.release()
+        await waiting
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_a_slot_granted_to_a_cancelled_waiter_is_passed_on():
+    async def main():
+        limiter = Limiter(1, 2, 5)
+        await limiter.acquire()
+        granted = asyncio.ensure_future(limiter.acquire())
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await _settle()
+        # The slot goes to the first waiter, which is cancelled before it runs.
+        limiter.release()
+        granted.cancel()
+        await waiting
+        assert granted.cancelled()
+        assert limiter.active == 1
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_leases_release_once():
+    async def main():
+        limiter = Limiter(1, 0, 5)
+        lease = await limiter.lease()
+        lease.release()
+        await lease.arelease()
+        assert limiter.active == 0
+        async with limiter.slot():
+            assert limiter.active == 1
+        assert limiter.active == 0
+
+    asyncio.run(main())
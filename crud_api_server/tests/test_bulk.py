@@ -0,0 +1,88 @@
+import json
+import uuid
+
+from sqlalchemy import select
+
+from app import bulk, crud, models, versions
+
+# Bulk upserts through POST /{entity}/bulk, as JSON arrays and NDJSON
+# streams. ``written`` counts the rows the database inserted or changed.
+
+def _domains(db, taxonomy, *names):
+    stmt = select(models.Domain.domain).where(models.Domain.domain.in_([taxonomy.name(name) for name in names]))
+    return sorted(db.scalars(stmt))
+
+def _ndjson(client, path, lines):
+    body = "\n".join(lines).encode()
+    return client.post(path, content=body, headers={"content-type": "application/x-ndjson"})
+
+def test_json_array(client, db, taxonomy):
+    response = client.post("/domains/bulk", json=[
+        {"domain": taxonomy.name("one")},
+        {"domain": None},
+        {"domain": taxonomy.name("two")},
+    ])
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["received"], result["written"]) == (3, 2)
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert _domains(db, taxonomy, "one", "two") == [taxonomy.name("one"), taxonomy.name("two")]
+
+def test_ndjson_stream(client, db, taxonomy):
+    response = _ndjson(client, "/domains/bulk", [
+        json.dumps({"domain": taxonomy.name("one")}),
+        "",
+        "{not json",
+        json.dumps({"name": "missing the domain field"}),
+        json.dumps({"domain": taxonomy.name("two")}),
+    ])
+    assert response.status_code == 200
+    result = response.json()
+    # The blank line is not a row.
+    assert (result["received"], result["written"]) == (4, 2)
+    errors = result["errors"]
+    assert [error["index"] for error in errors] == [1, 2]
+    assert errors[0]["detail"].startswith("Invalid JSON")
+    assert _domains(db, taxonomy, "one", "two") == [taxonomy.name("one"), taxonomy.name("two")]
+
+def test_body_must_be_an_array(client):
+    assert client.post("/domains/bulk", json={"domain": "x"}).status_code == 400
+    assert client.post("/domains/bulk", content=b"[", headers={"content-type": "application/json"}).status_code == 400
+
+def test_duplicates_and_unchanged_rows_are_not_counted(client, db, taxonomy):
+    id = str(uuid.uuid4())
+    rows = [{"id": id, "domain": taxonomy.name("first")}, {"id": id, "domain": taxonomy.name("last")}]
+    result = client.post("/domains/bulk", json=rows).json()
+    assert (result["received"], result["written"]) == (2, 1)
+    assert _domains(db, taxonomy, "first", "last") == [taxonomy.name("last")]
+
+    before = versions.read(db, ["domain"])
+    result = client.post("/domains/bulk", json=rows[1:]).json()
+    assert (result["received"], result["written"]) == (1, 0)
+    assert versions.read(db, ["domain"]) == before
+
+    result = client.post("/domains/bulk", json=[{"id": id, "domain": taxonomy.name("renamed")}]).json()
+    assert result["written"] == 1
+    assert versions.read(db, ["domain"])["domain"] == before["domain"] + 1
+
+def test_unknown_domain_is_a_row_error(client, taxonomy):
+    result = client.post("/subdomains/bulk", json=[
+        {"subdomain": taxonomy.name("kept"), "domain_id": str(taxonomy.domains["alpha"])},
+        {"subdomain": taxonomy.name("orphan"), "domain_id": str(uuid.uuid4())},
+    ]).json()
+    assert result["written"] == 1
+    assert result["errors"] == [{"index": 1, "detail": "Domain not found"}]
+
+def test_failed_chunk_rolls_back_the_request(client, db, taxonomy, monkeypatch):
+    # The domain check is skipped, so the second chunk fails on the foreign
+    # key after the first one was written.
+    monkeypatch.setattr(bulk, "BULK_CHUNK_SIZE", 1)
+    monkeypatch.setattr(crud.bulk, "existing_ids", lambda db, column, ids: set(ids))
+    response = client.post("/subdomains/bulk", json=[
+        {"subdomain": taxonomy.name("kept"), "domain_id": str(taxonomy.domains["alpha"])},
+        {"subdomain": taxonomy.name("orphan"), "domain_id": str(uuid.uuid4())},
+    ])
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Bulk write rolled back")
+    names = [taxonomy.name("kept"), taxonomy.name("orphan")]
+    assert db.scalars(select(models.Subdomain.id).where(models.Subdomain.subdomain.in_(names))).all() == []
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.coalesce import Coalescer
+
+# The single-flight itself, on plain coroutines: no database.
+
+class Source:
+    """An async read that counts its executions and can be held open."""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.fail = False
+
+    async def __call__(self, value):
+        self.calls += 1
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("read failed")
+        return [value, self.calls]
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        coalescer, source = Coalescer(ttl=0, max_entries=10), Source()
+        source.gate.clear()
+        waiting = [asyncio.ensure_future(coalescer.run("key", source, "a")) for _ in range(5)]
+        other = asyncio.ensure_future(coalescer.run("other", source, "b"))
+        await asyncio.sleep(0)
+        source.gate.set()
+        results = await asyncio.gather(*waiting)
+        assert all(result is results[0] for result in results)
+        assert await other == ["b", 2]
+        assert source.calls == 2
+
+    asyncio.run(main())
+
+def test_a_cancelled_waiter_does_not_cancel_the_others():
+    async def main():
+        coalescer, source = Coalescer(ttl=0, max_entries=10), Source()
+        source.gate.clear()
+        first = asyncio.ensure_future(coalescer.run("key", source, "a"))
+        second = asyncio.ensure_future(coalescer.run("key", source, "a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        source.gate.set()
+        assert await second == ["a", 1]
+        assert first.cancelled()
+
+    asyncio.run(main())
+
+def test_results_are_kept_for_the_ttl():
+    async def main():
+        coalescer, source = Coalescer(ttl=0.1, max_entries=10), Source()
+        first = await coalescer.run("key", source, "a")
+        assert await coalescer.run("key", source, "a") is first
+        await asyncio.sleep(0.15)
+        assert await coalescer.run("key", source, "a") == ["a", 2]
+
+    asyncio.run(main())
+
+@pytest.mark.parametrize("ttl, max_entries", [(0, 10), (1, 0)])
+def test_nothing_is_kept_when_disabled(ttl, max_entries):
+    async def main():
+        coalescer, source = Coalescer(ttl=ttl, max_entries=max_entries), Source()
+        await coalescer.run("key", source, "a")
+        await coalescer.run("key", source, "a")
+        assert source.calls == 2
+        assert coalescer._recent == {}
+
+    asyncio.run(main())
+
+def test_at_most_max_entries_are_kept():
+    async def main():
+        coalescer, source = Coalescer(ttl=10, max_entries=2), Source()
+        for key in "abc":
+            await coalescer.run(key, source, key)
+        # The oldest went first.
+        assert list(coalescer._recent) == ["b", "c"]
+
+    asyncio.run(main())
+
+def test_errors_are_not_kept():
+    async def main():
+        coalescer, source = Coalescer(ttl=10, max_entries=10), Source()
+        source.fail = True
+        source.gate.clear()
+        waiting = [asyncio.ensure_future(coalescer.run("key", source, "a")) for _ in range(3)]
+        await asyncio.sleep(0)
+        source.gate.set()
+        results = await asyncio.gather(*waiting, return_exceptions=True)
+        # Shared while in flight, then retried.
+        assert source.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        source.fail = False
+        assert await coalescer.run("key", source, "a") == ["a", 2]
+
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+# Create, update (PUT and PATCH, which take the same partial body) and
+# delete, through the API. Each write is one INSERT/UPDATE/DELETE ...
+# RETURNING statement, version bump included, and a missing id is a 404.
+
+def _create_bodies(taxonomy):
+    return {
+        "domains": {"domain": taxonomy.name("new")},
+        "subdomains": {"subdomain": taxonomy.name("new"), "domain_id": str(taxonomy.domains["alpha"])},
+        "skills": {"skill_name_en": taxonomy.name("new"), "skill_type": "technical", "synonyms_en": ["a", "b"], "synonyms_jp": ["c"]},
+        "job_titles": {"job_title": taxonomy.name("new"), "synonyms_en": ["a", "b"], "synonyms_jp": ["c"]},
+    }
+
+# entity: (name field, the taxonomy's ids)
+ENTITIES = {
+    "domains": ("domain", "domains"),
+    "subdomains": ("subdomain", "subdomains"),
+    "skills": ("skill_name_en", "skills"),
+    "job_titles": ("job_title", "job_titles"),
+}
+
+@pytest.fixture
+def writes(db):
+    """The statements run on the test's connection, less the savepoints
+    that stand in for its transactions."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            executed.append(statement)
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+@pytest.mark.parametrize("entity", list(ENTITIES))
+def test_create(client, taxonomy, writes, entity):
+    body = _create_bodies(taxonomy)[entity]
+    response = client.post(f"/{entity}/", json=body)
+    assert response.status_code == 201
+    created = response.json()
+    assert len(writes) == 1
+    for key, value in body.items():
+        assert created[key] == value
+    if entity == "subdomains":
+        assert created["domain"] == {"domain": taxonomy.name("alpha"), "id": str(taxonomy.domains["alpha"])}
+    assert client.get(f"/{entity}/{created['id']}").json() == created
+
+@pytest.mark.parametrize("method", ["put", "patch"])
+@pytest.mark.parametrize("entity", list(ENTITIES))
+def test_update(client, taxonomy, writes, entity, method):
+    name_field, ids = ENTITIES[entity]
+    id = next(iter(getattr(taxonomy, ids).values()))
+    response = client.request(method, f"/{entity}/{id}", json={name_field: taxonomy.name("renamed")})
+    assert response.status_code == 200
+    assert response.json()[name_field] == taxonomy.name("renamed")
+    assert len(writes) == 1
+    assert client.get(f"/{entity}/{id}").json() == response.json()
+
+@pytest.mark.parametrize("method", ["put", "patch"])
+@pytest.mark.parametrize("entity", list(ENTITIES))
+def test_update_missing_id(client, entity, method):
+    name_field, _ = ENTITIES[entity]
+    # With changes (the UPDATE finds no row) and without (the lookup finds none).
+    for body in ({name_field: "x"}, {}):
+        assert client.request(method, f"/{entity}/{uuid.uuid4()}", json=body).status_code == 404
+
+@pytest.mark.parametrize("entity", ["skills", "job_titles"])
+def test_patch_keeps_omitted_synonyms(client, taxonomy, entity):
+    created = client.post(f"/{entity}/", json=_create_bodies(taxonomy)[entity]).json()
+    name_field, _ = ENTITIES[entity]
+    patched = client.patch(f"/{entity}/{created['id']}", json={name_field: taxonomy.name("renamed")}).json()
+    assert (patched["synonyms_en"], patched["synonyms_jp"]) == (["a", "b"], ["c"])
+    # An explicit null keeps the value too; a list replaces it.
+    patched = client.patch(f"/{entity}/{created['id']}", json={"synonyms_en": None, "synonyms_jp": []}).json()
+    assert (patched["synonyms_en"], patched["synonyms_jp"]) == (["a", "b"], [])
+
+def test_patch_clears_the_japanese_skill_name(client, taxonomy):
+    created = client.post("/skills/", json=dict(_create_bodies(taxonomy)["skills"], skill_name_jp="名前")).json()
+    assert client.patch(f"/skills/{created['id']}", json={"skill_type": "soft"}).json()["skill_name_jp"] == "名前"
+    patched = client.patch(f"/skills/{created['id']}", json={"skill_name_jp": None}).json()
+    assert (patched["skill_name_jp"], patched["skill_type"]) == (None, "soft")
+
+def test_subdomain_moves_to_another_domain(client, taxonomy):
+    id = taxonomy.subdomains["red"]
+    patched = client.patch(f"/subdomains/{id}", json={"domain_id": str(taxonomy.domains["beta"])}).json()
+    assert patched["subdomain"] == taxonomy.name("red")
+    assert patched["domain"] == {"domain": taxonomy.name("beta"), "id": str(taxonomy.domains["beta"])}
+
+@pytest.mark.parametrize("entity", list(ENTITIES))
+def test_delete(client, taxonomy, writes, entity):
+    _, ids = ENTITIES[entity]
+    # Rows that refer to it go with it through ON DELETE CASCADE.
+    id = next(iter(getattr(taxonomy, ids).values()))
+    assert client.delete(f"/{entity}/{id}").status_code == 204
+    assert len(writes) == 1
+    assert client.get(f"/{entity}/{id}").status_code == 404
+    assert client.delete(f"/{entity}/{id}").status_code == 404
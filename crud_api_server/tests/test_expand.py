@@ -0,0 +1,33 @@
+import json
+from itertools import combinations
+
+import pytest
+
+from app import crud
+from app.expand import JOB_TITLE_EXPAND, SKILL_EXPAND, SUBDOMAIN_EXPAND
+
+# An expanded page costs the page's query plus one selectinload per
+# expanded relation, whatever the page size, and serializing it loads
+# nothing more. Each list is narrowed to the seeded rows by a filter on
+# their prefix, which matches the three linked ones.
+
+LISTS = {
+    "subdomains": (crud.subdomains.list_subdomains, SUBDOMAIN_EXPAND, "domain_name"),
+    "skills": (crud.skills.list_skills, SKILL_EXPAND, "subdomain_name"),
+    "job_titles": (crud.job_titles.list_job_titles, JOB_TITLE_EXPAND, "subdomain_name"),
+}
+
+@pytest.mark.parametrize("list_name", list(LISTS))
+def test_statements_per_expanded_page(db, taxonomy, statements, list_name):
+    list_fn, expansion, prefix_filter = LISTS[list_name]
+    for size in range(1, len(expansion.choices) + 1):
+        for names in map(frozenset, combinations(expansion.choices, size)):
+            for limit in (1, 2, 3):
+                db.expunge_all()
+                db.connection()  # begins the session's savepoint outside the count
+                statements.clear()
+                items = list_fn(db, limit=limit, options=expansion.options(names), **{prefix_filter: taxonomy.prefix})
+                body = json.loads(expansion.response(names, items).body)
+                assert len(body) == limit
+                assert all(set(names) <= set(item) for item in body)
+                assert len(statements) == 1 + len(names), (names, limit, statements)
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import export
+from app.admission import Limiter
+from app.main import create_app
+from app.routers import export as export_router
+
+# An export holds an admission slot while it streams, and gives it back
+# however the stream ends.
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = Limiter(1, 0, 0.1)
+    monkeypatch.setattr(export_router, "limiter", limiter)
+    return limiter
+
+def test_export_releases_its_slot(database, limiter):
+    with TestClient(create_app(mount_mcp=False)) as client:
+        for _ in range(3):
+            response = client.get("/export/domain", params={"format": "csv"})
+            assert response.status_code == 200
+            assert limiter.active == 0
+
+def test_export_waits_for_a_slot(database, limiter):
+    lease = asyncio.run(limiter.lease())
+    try:
+        with TestClient(create_app(mount_mcp=False)) as client:
+            assert client.get("/export/domain").status_code == 503
+    finally:
+        lease.release()
+    assert limiter.active == 0
+
+def test_closing_a_stream_early_releases_its_slot(database, limiter):
+    async def read_one_chunk():
+        lease = await limiter.lease()
+        chunks = export.stream((export.ExportTable.domain,), export.ExportWriter(export.ExportFormat.csv), lease)
+        await chunks.__anext__()
+        assert limiter.active == 1
+        await chunks.aclose()
+        lease.release()  # a second release, as the response's background task does
+
+    asyncio.run(read_one_chunk())
+    assert limiter.active == 0
+
+def test_closing_a_sync_stream_closes_its_session(database, limiter, monkeypatch):
+    closed_in = []
+    stream_sync = export._stream_sync
+
+    def tracked(tables, writer):
+        try:
+            yield from stream_sync(tables, writer)
+        finally:
+            closed_in.append(threading.current_thread())
+
+    monkeypatch.setattr(export, "AsyncSessionLocal", None)
+    monkeypatch.setattr(export, "_stream_sync", tracked)
+
+    async def read_one_chunk():
+        chunks = export.stream((export.ExportTable.domain,), export.ExportWriter(export.ExportFormat.csv), await limiter.lease())
+        await chunks.__anext__()
+        await chunks.aclose()
+        # Closed by then, and not on the event loop thread.
+        assert closed_in and closed_in[0] is not threading.current_thread()
+
+    asyncio.run(read_one_chunk())
+    assert limiter.active == 0
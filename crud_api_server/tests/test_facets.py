@@ -0,0 +1,47 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app import facets, schemas
+from app.database import SessionLocal
+from app.main import create_app
+from app.routers import skills
+
+# Against DATABASE_URL itself, outside a rolled-back transaction: starting
+# the app refreshes the facet views, and the requests only read.
+
+@pytest.fixture
+def client(database):
+    with TestClient(create_app(mount_mcp=False)) as client:
+        yield client
+
+def test_views_are_refreshed_after_startup(client):
+    # In the background: startup does not wait for it.
+    deadline = time.monotonic() + 60
+    with SessionLocal() as db:
+        while facets._behind(db) and time.monotonic() < deadline:
+            db.rollback()
+            time.sleep(0.1)
+        assert facets._behind(db) == {}
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_list_with_facets_matches_response_model(client, monkeypatch, fast):
+    monkeypatch.setattr(skills, "FAST_SERIALIZATION", fast)
+    plain = client.get("/skills/", params={"limit": 2, "skill_type": "technical"})
+    enveloped = client.get("/skills/", params={"limit": 2, "skill_type": "technical", "include_facets": True})
+    assert plain.status_code == enveloped.status_code == 200
+
+    items = TypeAdapter(list[schemas.SkillResponse]).validate_python(plain.json())
+    body = schemas.SkillListWithFacets.model_validate(enveloped.json())
+    assert body.items == items
+    # Global counts: every skill type, whatever the skill_type filter.
+    with SessionLocal() as db:
+        assert body.facets.skill_type == TypeAdapter(list[schemas.SkillTypeFacet]).validate_python(facets.skill_types(db))
+
+def test_list_response_model_documents_both_shapes(client):
+    schema = client.get("/openapi.json").json()["paths"]["/skills/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert {option.get("$ref", option.get("type")) for option in schema["anyOf"]} == {
+        "array", "#/components/schemas/SkillListWithFacets",
+    }
@@ -0,0 +1,149 @@
+from itertools import combinations
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app import models
+from app.filters import DOMAIN_FILTERS, JOB_TITLE_FILTERS, SKILL_FILTERS, SUBDOMAIN_FILTERS
+from conftest import JOB_TITLES, SKILLS, SUBDOMAINS
+
+# Every combination of every list filter, checked twice: the compiled SQL
+# has one EXISTS per relation the combination touches, and against the
+# seeded taxonomy the rows are exactly those a plain Python reading of the
+# filter semantics selects. The values are names from conftest; ids are
+# resolved against the seeded taxonomy.
+
+# list: (FilterSet, model, {filter: value})
+VALUES = {
+    "domains": (DOMAIN_FILTERS, models.Domain, {"subdomain_name": "red"}),
+    "subdomains": (SUBDOMAIN_FILTERS, models.Subdomain, {
+        "domain_id": ("domain", "alpha"), "domain_name": "beta", "skill_name_en": "py",
+    }),
+    "skills": (SKILL_FILTERS, models.Skill, {
+        "skill_type": models.SkillType.technical, "synonym_en": "snake",
+        "subdomain_id": ("subdomain", "red two"), "subdomain_name": "blue",
+        "domain_id": ("domain", "alpha"), "domain_name": "beta",
+        "job_title_id": ("job_title", "developer"), "job_title_name": "analyst",
+    }),
+    "job_titles": (JOB_TITLE_FILTERS, models.JobTitle, {
+        "synonym_en": "coder", "skill_id": ("skill", "speaking"), "skill_name_en": "py",
+        "skill_type": models.SkillType.technical, "subdomain_id": ("subdomain", "red two"),
+        "subdomain_name": "blue", "domain_id": ("domain", "alpha"), "domain_name": "beta",
+    }),
+}
+
+def _subdomain(name):
+    return {"subdomain": name, "domain": SUBDOMAINS[name]}
+
+def _skill(name):
+    skill_type, synonyms, _ = SKILLS[name]
+    return {"skill": name, "skill_type": skill_type, "synonyms": synonyms}
+
+# For each list: the entities, and for each filter the relation it goes
+# through (None: the entity itself) and what it asks of that row.
+def _rows(list_name):
+    if list_name == "domains":
+        return {
+            domain: {"subdomain": [_subdomain(s) for s, d in SUBDOMAINS.items() if d == domain]}
+            for domain in ("alpha", "beta")
+        }
+    if list_name == "subdomains":
+        return {
+            name: {None: [_subdomain(name)], "skill": [_skill(s) for s, (_, _, subs) in SKILLS.items() if name in subs]}
+            for name in SUBDOMAINS
+        }
+    if list_name == "skills":
+        return {
+            name: {
+                None: [_skill(name)],
+                "subdomain": [_subdomain(s) for s in SKILLS[name][2]],
+                "job_title": [{"job_title": j} for j, (_, skills, _) in JOB_TITLES.items() if name in skills],
+            }
+            for name in SKILLS
+        }
+    return {
+        name: {
+            None: [{"synonyms": synonyms}],
+            "skill": [_skill(s) for s in skills],
+            "subdomain": [_subdomain(s) for s in subdomains],
+        }
+        for name, (synonyms, skills, subdomains) in JOB_TITLES.items()
+    }
+
+def _expected_test(list_name, filter_name, value):
+    """(relation, predicate over a related row) for one filter."""
+    if isinstance(value, tuple):
+        value = value[1]
+    relation = VALUES[list_name][0].filters[filter_name].relation
+    if list_name == "subdomains" and filter_name in ("domain_id", "domain_name"):
+        relation = None
+    if list_name == "domains":
+        relation = "subdomain"
+    tests = {
+        "subdomain_name": lambda row: value in row["subdomain"],
+        "subdomain_id": lambda row: row["subdomain"] == value,
+        "domain_name": lambda row: value in row["domain"],
+        "domain_id": lambda row: row["domain"] == value,
+        "skill_name_en": lambda row: value in row["skill"],
+        "skill_id": lambda row: row["skill"] == value,
+        "skill_type": lambda row: row["skill_type"] == value.value,
+        "synonym_en": lambda row: value in row["synonyms"],
+        "job_title_id": lambda row: row["job_title"] == value,
+        "job_title_name": lambda row: value in row["job_title"],
+    }
+    return relation, tests[filter_name]
+
+def expected(list_name, chosen) -> set:
+    matched = set()
+    for name, related in _rows(list_name).items():
+        by_relation = {}
+        for filter_name in chosen:
+            relation, test = _expected_test(list_name, filter_name, VALUES[list_name][2][filter_name])
+            by_relation.setdefault(relation, []).append(test)
+        # All tests on one relation must hold for the same related row.
+        if all(any(all(test(row) for test in tests) for row in related[relation]) for relation, tests in by_relation.items()):
+            matched.add(name)
+    return matched
+
+def _combinations(names):
+    return [chosen for size in range(len(names) + 1) for chosen in combinations(names, size)]
+
+CASES = [
+    (list_name, chosen)
+    for list_name, (_, _, values) in VALUES.items()
+    for chosen in _combinations(tuple(values))
+]
+
+def _resolve(taxonomy, value):
+    if isinstance(value, tuple):
+        kind, name = value
+        return getattr(taxonomy, f"{kind}s")[name]
+    return value
+
+@pytest.mark.parametrize("list_name", list(VALUES))
+def test_one_exists_per_relation(list_name):
+    filter_set, model, values = VALUES[list_name]
+    query = Session().query(model)
+    for chosen in _combinations(tuple(values)):
+        # Any non-empty value compiles the same way.
+        applied = filter_set.apply(query, **{name: "x" for name in chosen})
+        sql = str(applied.statement.compile(dialect=postgresql.dialect()))
+        relations = {filter_set.filters[name].relation for name in chosen} - {None}
+        assert sql.count("EXISTS (") == len(relations), (chosen, sql)
+        assert " JOIN " not in sql.split("WHERE")[0], (chosen, sql)
+
+def test_rows_for_every_combination(db, taxonomy):
+    entity_ids = {
+        "domains": taxonomy.domains, "subdomains": taxonomy.subdomains,
+        "skills": taxonomy.skills, "job_titles": taxonomy.job_titles,
+    }
+    for list_name, chosen in CASES:
+        filter_set, model, values = VALUES[list_name]
+        ids = entity_ids[list_name]
+        names = {id: name for name, id in ids.items()}
+        query = db.query(model.id).filter(model.id.in_(list(ids.values())))
+        query = filter_set.apply(query, **{name: _resolve(taxonomy, values[name]) for name in chosen})
+        rows = [id for id, in query.all()]
+        assert len(rows) == len(set(rows)), (list_name, chosen)
+        assert {names[id] for id in rows} == expected(list_name, chosen), (list_name, chosen)
@@ -0,0 +1,48 @@
+from app import facets, versions
+
+# List and item responses carry an ETag over the versions of the tables
+# they read (app/http_cache.py).
+
+def _etag(client, path, **params):
+    response = client.get(path, params=params)
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+def _bump(db, *tables):
+    versions.bump(db, *tables)
+    db.commit()
+
+def test_facet_refresh_only_moves_lists_that_include_facets(client, db):
+    plain = _etag(client, "/skills/", limit=1)
+    enveloped = _etag(client, "/skills/", limit=1, include_facets="true")
+    _bump(db, facets.VERSION_TABLE)
+    assert _etag(client, "/skills/", limit=1) == plain
+    assert _etag(client, "/skills/", limit=1, include_facets="true") != enveloped
+
+def test_etag_is_stable(client, taxonomy):
+    params = {"subdomain_name": taxonomy.prefix}
+    assert _etag(client, "/domains/", **params) == _etag(client, "/domains/", **params)
+    # The query is part of it.
+    assert _etag(client, "/domains/", **params) != _etag(client, "/domains/", limit=1, **params)
+
+def test_if_none_match_is_answered_with_304(client, taxonomy):
+    etag = _etag(client, "/domains/")
+    response = client.get("/domains/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    assert client.get("/domains/", headers={"If-None-Match": f'W/"other", {etag}'}).status_code == 304
+    assert client.get("/domains/", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_write_to_a_dependent_table_changes_the_etag(client, taxonomy):
+    params = {"subdomain_name": taxonomy.prefix}
+    etag = _etag(client, "/domains/", **params)
+    # /domains/ reads subdomain through its filter: a subdomain write moves it.
+    response = client.post("/subdomains/", json={"subdomain": taxonomy.name("new"), "domain_id": str(taxonomy.domains["beta"])})
+    assert response.status_code == 201
+    assert _etag(client, "/domains/", **params) != etag
+    assert client.get("/domains/", params=params, headers={"If-None-Match": etag}).status_code == 200
+    # A table it does not read leaves it alone.
+    etag = _etag(client, "/domains/", **params)
+    assert client.post("/skills/", json={"skill_name_en": taxonomy.name("new"), "skill_type": "other"}).status_code == 201
+    assert _etag(client, "/domains/", **params) == etag
@@ -0,0 +1,93 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app import models, versions
+
+# Link, unlink and replace, through the API. Each reports how many links it
+# made or removed, and only a call that changed something bumps the table's
+# version (and so moves the ETags of responses that read it).
+
+# path: (model, left column, right column, taxonomy attributes of the two sides)
+LINKS = {
+    "skill_subdomain": (models.SkillSubdomain, "skill_id", "subdomain_id", ("skills", "subdomains")),
+    "job_title_core_skill": (models.JobTitleCoreSkill, "job_title_id", "skill_id", ("job_titles", "skills")),
+    "job_title_subdomain": (models.JobTitleSubdomain, "job_title_id", "subdomain_id", ("job_titles", "subdomains")),
+}
+
+def _version(db, model):
+    return versions.read(db, [model.__tablename__])[model.__tablename__]
+
+def _linked(db, model, left, right, owner_id):
+    table = model.__table__
+    return set(db.scalars(select(table.c[right]).where(table.c[left] == owner_id)))
+
+@pytest.mark.parametrize("path", list(LINKS))
+def test_link_and_unlink(client, db, taxonomy, path):
+    model, left, right, (owners, others) = LINKS[path]
+    owner_id = getattr(taxonomy, owners)["lonely" if owners == "skills" else "idle"]
+    other_ids = list(getattr(taxonomy, others).values())[:2]
+    body = [{left: str(owner_id), right: str(other_id)} for other_id in other_ids]
+
+    before = _version(db, model)
+    # A pair sent twice is linked once.
+    assert client.post(f"/links/{path}", json=body + body[:1]).json() == {"linked": 2, "unlinked": 0}
+    assert _linked(db, model, left, right, owner_id) == set(other_ids)
+    assert _version(db, model) == before + 1
+
+    assert client.post(f"/links/{path}", json=body).json() == {"linked": 0, "unlinked": 0}
+    assert _version(db, model) == before + 1
+
+    assert client.post(f"/links/{path}/unlink", json=body[:1]).json() == {"linked": 0, "unlinked": 1}
+    assert _linked(db, model, left, right, owner_id) == set(other_ids[1:])
+    assert _version(db, model) == before + 2
+
+    assert client.post(f"/links/{path}/unlink", json=body[:1]).json() == {"linked": 0, "unlinked": 0}
+    assert _version(db, model) == before + 2
+
+@pytest.mark.parametrize("path", list(LINKS))
+def test_link_to_a_missing_row(client, taxonomy, path):
+    _, left, right, (owners, _) = LINKS[path]
+    owner_id = next(iter(getattr(taxonomy, owners).values()))
+    response = client.post(f"/links/{path}", json=[{left: str(owner_id), right: str(uuid.uuid4())}])
+    assert response.status_code == 404
+
+# path: (model, owner column, other column, owner, the owner's current links, taxonomy attributes)
+REPLACE = {
+    "/skills/{}/subdomains": (models.SkillSubdomain, "skill_id", "subdomain_id", "python", ["red", "blue"], ("skills", "subdomains")),
+    "/job_titles/{}/core_skills": (models.JobTitleCoreSkill, "job_title_id", "skill_id", "developer", ["python", "speaking"], ("job_titles", "skills")),
+    "/job_titles/{}/subdomains": (models.JobTitleSubdomain, "job_title_id", "subdomain_id", "manager", ["blue", "red two"], ("job_titles", "subdomains")),
+}
+
+@pytest.mark.parametrize("path", list(REPLACE))
+def test_replace(client, db, taxonomy, path):
+    model, left, right, owner, current, (owners, others) = REPLACE[path]
+    owner_id = getattr(taxonomy, owners)[owner]
+    others = getattr(taxonomy, others)
+    url = path.format(owner_id)
+    assert _linked(db, model, left, right, owner_id) == {others[name] for name in current}
+
+    before = _version(db, model)
+    # Keeps the first, drops the second, adds one.
+    new = next(name for name in others if name not in current)
+    wanted = [others[current[0]], others[new], others[new]]
+    assert client.put(url, json=[str(id) for id in wanted]).json() == {"linked": 1, "unlinked": 1}
+    assert _linked(db, model, left, right, owner_id) == set(wanted)
+    assert _version(db, model) == before + 1
+
+    # The same set again changes nothing.
+    assert client.put(url, json=[str(id) for id in wanted]).json() == {"linked": 0, "unlinked": 0}
+    assert _version(db, model) == before + 1
+
+    assert client.put(url, json=[]).json() == {"linked": 0, "unlinked": 2}
+    assert _linked(db, model, left, right, owner_id) == set()
+    assert _version(db, model) == before + 2
+
+@pytest.mark.parametrize("path", list(REPLACE))
+def test_replace_missing(client, taxonomy, path):
+    _, _, _, owner, _, (owners, _) = REPLACE[path]
+    assert client.put(path.format(uuid.uuid4()), json=[]).status_code == 404
+    # An unknown row on the other side is a foreign-key violation.
+    owner_id = getattr(taxonomy, owners)[owner]
+    assert client.put(path.format(owner_id), json=[str(uuid.uuid4())]).status_code == 404
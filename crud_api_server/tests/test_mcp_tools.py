@@ -0,0 +1,30 @@
+import asyncio
+import json
+import logging
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy.exc import ProgrammingError
+
+from app import mcp_tools
+
+QUERIES = TypeAdapter(list[mcp_tools.SubQuery])
+
+def test_failing_sub_query_keeps_the_batch(database, monkeypatch, caplog):
+    def broken(db, **kwargs):
+        raise ProgrammingError("SELECT", {}, Exception("boom"))
+
+    monkeypatch.setattr(mcp_tools.SkillsQuery, "LIST", staticmethod(broken))
+    queries = QUERIES.validate_python([
+        {"resource": "domains", "limit": 1},
+        {"resource": "skills", "skill_type": "technical"},
+        {"resource": "related_skills", "skill_id": str(uuid.uuid4())},
+    ])
+    with caplog.at_level(logging.ERROR, logger=mcp_tools.__name__):
+        results = json.loads(asyncio.run(mcp_tools.query_taxonomy(queries)))
+
+    domains, skills, related = results
+    assert domains["fields"] == list(mcp_tools.DomainsQuery.FIELDS)
+    assert skills == {"error": "The skills query failed"}
+    assert related == {"error": "Skill not found"}
+    assert "boom" in caplog.text
@@ -0,0 +1,63 @@
+import base64
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.pagination import decode_cursor, encode_cursor
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+@pytest.mark.parametrize("name", ["Data Science", "データ", "", "a,b\"c"])
+def test_cursor_round_trip(name):
+    id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(name, id)) == (name, id)
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _raw_cursor("x")[:-1] + "*",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    _raw_cursor({"name": "x"}),
+    _raw_cursor(["x"]),
+    _raw_cursor(["x", str(uuid.uuid4()), 1]),
+    _raw_cursor(["x", 5]),
+    _raw_cursor([5, str(uuid.uuid4())]),
+    _raw_cursor(["x", None]),
+    _raw_cursor(["x", "not a uuid"]),
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+def test_invalid_cursor_over_http(client):
+    response = client.get("/domains/", params={"cursor": _raw_cursor(["x", 5])})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+def test_link_header_walks_every_page(client, taxonomy):
+    # Two seeded domains have subdomains under the test prefix.
+    response = client.get("/domains/", params={"subdomain_name": taxonomy.prefix, "limit": 1})
+    pages = []
+    while True:
+        assert response.status_code == 200
+        pages.append([domain["domain"] for domain in response.json()])
+        if "link" not in response.headers:
+            break
+        url, rel = response.headers["link"].split("; ")
+        assert rel == 'rel="next"'
+        response = client.get(url.strip("<>"))
+
+    assert pages == [[taxonomy.name("alpha")], [taxonomy.name("beta")], []]
+
+def test_no_link_header_on_a_short_page(client, taxonomy):
+    response = client.get("/domains/", params={"subdomain_name": taxonomy.prefix, "limit": 3})
+    assert len(response.json()) == 2
+    assert "link" not in response.headers
+
+def test_cursor_replaces_skip(client, taxonomy):
+    response = client.get("/domains/", params={"subdomain_name": taxonomy.prefix, "limit": 1, "skip": 0})
+    url = response.headers["link"].split(";")[0].strip("<>")
+    assert "skip=" not in url and "cursor=" in url
@@ -0,0 +1,92 @@
+import math
+from itertools import combinations
+
+import pytest
+from sqlalchemy import func, select
+
+from app import crud, models, ranking
+from conftest import JOB_TITLES, SKILLS
+
+# The incidence-matrix ranking against a plain Python one over the seeded
+# job titles. Nothing else in the database shares their skills, so the
+# seeded job titles are the only ones either ranks. The index is built once
+# per module, over the seeded fixture; the rebuild test writes, on its own.
+
+METRICS = ("jaccard", "coverage", "weighted_coverage")
+SKILL_SETS = [set(names) for size in (1, 2, 3) for names in combinations(SKILLS, size)]
+
+@pytest.fixture(scope="module")
+def index(seeded):
+    return ranking.RankingIndex(seeded[0])
+
+@pytest.fixture(scope="module")
+def job_count(seeded):
+    return seeded[0].scalar(select(func.count()).select_from(models.JobTitle))
+
+def _reference(taxonomy, chosen, metric, top_k, min_matched, job_count):
+    """(job title id, score, matched) best first: by score, then matched,
+    then the job title's place in (name, id) order."""
+    required = {name: set(skills) for name, (_, skills, _) in JOB_TITLES.items()}
+    degree = {skill: sum(skill in skills for skills in required.values()) for skill in SKILLS}
+    idf = {skill: math.log((1 + job_count) / (1 + degree[skill])) + 1 for skill in SKILLS}
+    ranked = []
+    for name, skills in required.items():
+        matched = len(chosen & skills)
+        if matched < min_matched:
+            continue
+        if metric == "jaccard":
+            score = matched / len(chosen | skills)
+        elif metric == "coverage":
+            score = matched / len(skills)
+        else:
+            score = sum(idf[skill] for skill in chosen & skills) / sum(idf[skill] for skill in skills)
+        ranked.append((-score, -matched, taxonomy.name(name), str(taxonomy.job_titles[name]), score))
+    ranked.sort()
+    return [(id, score, -matched) for _, matched, _, id, score in ranked[:top_k]]
+
+def _ranked(index, taxonomy, chosen, metric, top_k, min_matched=1):
+    skills, unknown = index.resolve([taxonomy.skills[name] for name in chosen], [])
+    assert unknown == []
+    return [(str(row.id), row.score, row.matched) for row in index.rank(skills, metric, top_k, min_matched)]
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_matches_the_reference(index, seeded, job_count, metric):
+    _, taxonomy = seeded
+    for chosen in SKILL_SETS:
+        for top_k in (1, 2, 10):
+            for min_matched in (1, 2):
+                expected = _reference(taxonomy, chosen, metric, top_k, min_matched, job_count)
+                actual = _ranked(index, taxonomy, chosen, metric, top_k, min_matched)
+                assert [(id, matched) for id, _, matched in actual] == [(id, matched) for id, _, matched in expected], (chosen, top_k)
+                assert [score for _, score, _ in actual] == pytest.approx([score for _, score, _ in expected])
+
+def test_ties(index, seeded):
+    _, taxonomy = seeded
+    # developer and manager both cover all their core skills: developer
+    # matched more of them.
+    ranked = _ranked(index, taxonomy, {"python", "speaking"}, "coverage", 10)
+    assert [id for id, _, _ in ranked] == [str(taxonomy.job_titles[name]) for name in ("developer", "manager", "analyst")]
+    # analyst and developer tie on score and matched: name order.
+    ranked = _ranked(index, taxonomy, {"speaking"}, "jaccard", 10)
+    assert [id for id, _, _ in ranked] == [str(taxonomy.job_titles[name]) for name in ("manager", "analyst", "developer")]
+
+def test_resolve(index, seeded):
+    _, taxonomy = seeded
+    skills, unknown = index.resolve([taxonomy.skills["python"], "00000000-0000-0000-0000-000000000000"], [
+        f"  {taxonomy.name('SPEAKING')} ", taxonomy.name("nothing"),
+    ])
+    assert sorted(index.skill_index[str(taxonomy.skills[name])] for name in ("python", "speaking")) == sorted(skills)
+    assert unknown == ["00000000-0000-0000-0000-000000000000", taxonomy.name("nothing")]
+
+def test_rebuilds_on_a_version_bump(db, taxonomy):
+    cache = ranking.JobTitleRanking()
+    before = cache.get(db)
+    skills, _ = before.resolve([taxonomy.skills["lonely"]], [])
+    assert before.rank(skills, "jaccard", 10) == []
+
+    crud.links.link(db, models.JobTitleCoreSkill, [(taxonomy.job_titles["idle"], taxonomy.skills["lonely"])])
+    after = cache.get(db)
+    assert after is not before
+    skills, _ = after.resolve([taxonomy.skills["lonely"]], [])
+    assert [row.id for row in after.rank(skills, "jaccard", 10)] == [taxonomy.job_titles["idle"]]
+    assert cache.get(db) is after
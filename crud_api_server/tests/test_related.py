@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+
+from app import crud, models, related
+from conftest import JOB_TITLES, SKILLS
+
+# Related skills against a plain Python count of shared job titles and
+# subdomains over the seeded taxonomy, whose skills share nothing with the
+# rest of the database. The index is built once per module, over the seeded
+# fixture; the rebuild test writes, on its own.
+
+@pytest.fixture(scope="module")
+def index(seeded):
+    return related.RelatedSkillsIndex(seeded[0])
+
+def _reference(index, taxonomy, skill, top_k):
+    """(skill id, score, shared job titles, shared subdomains) best first:
+    by score, then shared job titles, then the index's own order."""
+    jobs = {name: {job for job, (_, skills, _) in JOB_TITLES.items() if name in skills} for name in SKILLS}
+    subdomains = {name: set(linked) for name, (_, _, linked) in SKILLS.items()}
+    ranked = []
+    for other in SKILLS:
+        shared_jobs = len(jobs[skill] & jobs[other])
+        shared_subdomains = len(subdomains[skill] & subdomains[other])
+        score = shared_jobs + related.SUBDOMAIN_WEIGHT * shared_subdomains
+        if other == skill or score <= 0:
+            continue
+        id = str(taxonomy.skills[other])
+        ranked.append((-score, -shared_jobs, index.skill_index[id], (id, score, shared_jobs, shared_subdomains)))
+    ranked.sort()
+    return [row for *_, row in ranked[:top_k]]
+
+@pytest.mark.parametrize("top_k", [1, 2, 10])
+def test_matches_the_reference(index, seeded, top_k):
+    _, taxonomy = seeded
+    for skill in SKILLS:
+        actual = [
+            (str(row.id), row.score, row.shared_job_titles, row.shared_subdomains)
+            for row in index.related(taxonomy.skills[skill], top_k)
+        ]
+        assert actual == _reference(index, taxonomy, skill, top_k), skill
+
+def test_ties(index, seeded):
+    _, taxonomy = seeded
+    # python (developer, subdomain blue) and pyspark (analyst, subdomain
+    # red two) tie with speaking on score and on shared job titles: index order.
+    rows = index.related(taxonomy.skills["speaking"], 10)
+    assert [(row.score, row.shared_job_titles) for row in rows] == [(1.5, 1), (1.5, 1)]
+    assert [index.skill_index[str(row.id)] for row in rows] == sorted(
+        index.skill_index[str(taxonomy.skills[name])] for name in ("python", "pyspark")
+    )
+
+def test_unknown_and_unrelated_skills(index, seeded):
+    _, taxonomy = seeded
+    assert index.related(uuid.uuid4(), 10) is None
+    assert index.related(taxonomy.skills["lonely"], 10) == []
+
+def test_rebuilds_on_a_version_bump(db, taxonomy):
+    cache = related.RelatedSkills()
+    before = cache.get(db)
+    assert before.related(taxonomy.skills["lonely"], 10) == []
+
+    crud.links.link(db, models.JobTitleCoreSkill, [(taxonomy.job_titles["manager"], taxonomy.skills["lonely"])])
+    after = cache.get(db)
+    assert after is not before
+    assert [(row.id, row.shared_job_titles) for row in after.related(taxonomy.skills["lonely"], 10)] == [
+        (taxonomy.skills["speaking"], 1),
+    ]
+    assert cache.get(db) is after
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.startup import first_response_seconds, import_seconds
+
+# Importing the app must stay cheap: with MOUNT_MCP off nothing imports
+# fastmcp (or the mcp SDK under it). A fresh interpreter, since this one
+# may already have loaded them.
+#
+# Startup is also timed, as benchmarks/startup.py does, against budgets
+# several times what it takes on one CPU, so that only a regression (a
+# blocking call at import or in the lifespan) fails them. The facet view
+# refresher runs at its default setting: startup must not wait for it,
+# nor for a database that is not there.
+
+IMPORT_BUDGET = 5.0
+FIRST_RESPONSE_BUDGET = 15.0
+UNREACHABLE_DATABASE = "postgresql://postgres@127.0.0.1:9/postgres"
+
+CHECK = "import sys, app.main; print(sorted({name.split('.')[0] for name in sys.modules} & {'fastmcp', 'mcp'}))"
+
+def test_import_without_mcp():
+    env = dict(os.environ, MOUNT_MCP="false", PYTHONPATH=str(Path(__file__).parents[1]))
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK], env=env, cwd=Path(__file__).parents[1],
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+def _env(**overrides):
+    env = {name: value for name, value in os.environ.items() if name != "FACETS_REFRESH_INTERVAL"}
+    return dict(env, PYTHONPATH=str(Path(__file__).parents[1]), **overrides)
+
+def test_import_time():
+    assert import_seconds(_env(MOUNT_MCP="false")) < IMPORT_BUDGET
+
+@pytest.mark.parametrize("database", [True, False], ids=["database", "no database"])
+def test_time_to_first_response(database):
+    env = _env(MOUNT_MCP="false")
+    if not database:
+        for name in ("ASYNC_DATABASE_URL", "READ_DATABASE_URL", "ASYNC_READ_DATABASE_URL"):
+            env.pop(name, None)
+        env["DATABASE_URL"] = UNREACHABLE_DATABASE
+    assert first_response_seconds(env, port=8797, timeout=FIRST_RESPONSE_BUDGET) < FIRST_RESPONSE_BUDGET
@@ -0,0 +1,98 @@
+import pytest
+
+from app import crud, schemas, suggest
+from conftest import DOMAINS, JOB_TITLES, SKILLS, SUBDOMAINS
+
+# Typeahead against a plain scan of the seeded names and synonyms. Queries
+# start with the seeded prefix, or with its unique part, so that nothing
+# else in the database matches. The index is built once per module, over
+# the seeded fixture; the rebuild test writes, on its own.
+
+@pytest.fixture(scope="module")
+def index(seeded):
+    return suggest.SuggestIndex(seeded[0])
+
+def _texts(taxonomy):
+    """(type, id, label, [(text, field)]) for every seeded row; field 0 is
+    a name, 1 a synonym."""
+    rows = [("domain", taxonomy.domains[name], name, []) for name in DOMAINS]
+    rows += [("subdomain", taxonomy.subdomains[name], name, []) for name in SUBDOMAINS]
+    rows += [("skill", taxonomy.skills[name], name, synonyms) for name, (_, synonyms, _) in SKILLS.items()]
+    rows += [("job_title", taxonomy.job_titles[name], name, synonyms) for name, (synonyms, _, _) in JOB_TITLES.items()]
+    for type, id, name, synonyms in rows:
+        label = taxonomy.name(name)
+        yield type, id, label, [(label, 0)] + [(synonym, 1) for synonym in synonyms]
+
+def _reference(taxonomy, query, limit, types=()):
+    """Exact matches of a whole text, then its prefixes, then matches at a
+    later word start; names before synonyms; shorter texts, then labels."""
+    query = suggest.normalize(query)
+    best = {}
+    for type, id, label, texts in _texts(taxonomy):
+        if types and type not in types:
+            continue
+        for text, field in texts:
+            key = suggest.normalize(text)
+            starts = [pos for pos in range(1, len(key)) if key[pos - 1] in suggest._SEPARATORS]
+            if key == query:
+                match = 0
+            elif key.startswith(query):
+                match = 1
+            elif any(key.startswith(query, pos) for pos in starts):
+                match = 2
+            else:
+                continue
+            rank = (match, field, len(text), label)
+            if (type, id) not in best or rank < best[type, id][0]:
+                best[type, id] = (rank, text)
+    ranked = sorted(best.items(), key=lambda item: item[1][0])[:limit]
+    return [schemas.Suggestion(type=type, id=id, label=rank[-1], matched=text) for (type, id), (rank, text) in ranked]
+
+def _queries(taxonomy):
+    unique = taxonomy.prefix.removeprefix("test-")
+    return [
+        taxonomy.prefix,
+        taxonomy.name("p"),
+        taxonomy.name("red"),
+        taxonomy.name("red t"),
+        taxonomy.name("manager"),
+        unique,
+        f"{unique} py",
+        taxonomy.prefix.upper(),
+    ]
+
+@pytest.mark.parametrize("limit", [1, 3, 50])
+@pytest.mark.parametrize("types", [(), ("skill",), ("domain", "subdomain")])
+def test_matches_the_reference(index, seeded, limit, types):
+    _, taxonomy = seeded
+    for query in _queries(taxonomy):
+        assert index.suggest(query, limit, types) == _reference(taxonomy, query, limit, types), query
+
+def test_ranking(index, seeded):
+    _, taxonomy = seeded
+    # The exact name first, then the name it prefixes.
+    assert [row.label for row in index.suggest(taxonomy.name("red"), 10)] == [taxonomy.name("red"), taxonomy.name("red two")]
+    # Full-width forms and case fold to the same query.
+    full_width = "".join(chr(ord(char) + 0xFEE0) if "!" <= char <= "~" else char for char in taxonomy.name("PY"))
+    assert index.suggest(full_width, 10) == index.suggest(taxonomy.name("py"), 10)
+    assert [row.label for row in index.suggest(taxonomy.name("py"), 10)] == [taxonomy.name("python"), taxonomy.name("pyspark")]
+    assert index.suggest("   ", 10) == []
+
+def test_rebuilds_on_a_version_bump(db, taxonomy):
+    cache = suggest.Suggestions()
+    before = cache.get(db)
+    query = taxonomy.name("zeta")
+    assert before.suggest(query, 10) == []
+
+    skill = crud.skills.create_skill(db, schemas.SkillCreate(
+        skill_name_en=taxonomy.name("data analysis"), skill_name_jp=f"{taxonomy.prefix}データ分析",
+        skill_type="technical", synonyms_en=[query],
+    ))
+    after = cache.get(db)
+    assert after is not before
+    # Found through its synonym, and through its Japanese name in hiragana.
+    assert after.suggest(query, 10) == [
+        schemas.Suggestion(type="skill", id=skill["id"], label=taxonomy.name("data analysis"), matched=query),
+    ]
+    assert [row.matched for row in after.suggest(f"{taxonomy.prefix}でーた", 10)] == [f"{taxonomy.prefix}データ分析"]
+    assert cache.get(db) is after
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import versions
+from app.config import ASYNC_DATABASE_URL
+from app.database import engine
+
+# VersionedCache with the table versions supplied by the test: nothing here
+# touches the database.
+
+class Counting(versions.VersionedCache):
+    tables = ("cached",)
+
+    def __init__(self, delay=0.2, fail=False):
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+        self.builds = []
+
+    def build(self, db):
+        self.builds.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("build failed")
+        return object()
+
+@pytest.fixture
+def table_versions(monkeypatch):
+    current = {"cached": 1}
+    monkeypatch.setattr(versions, "read", lambda db, tables=None: dict(current))
+    return current
+
+def test_concurrent_cold_start_builds_once(table_versions):
+    cache = Counting()
+    with ThreadPoolExecutor(8) as pool:
+        values = list(pool.map(lambda _: cache.get(Session(engine)), range(8)))
+    assert len(cache.builds) == 1
+    assert all(value is values[0] for value in values)
+
+def test_stale_value_is_served_while_rebuilding(table_versions):
+    cache = Counting()
+    first = cache.get(Session(engine))
+    table_versions["cached"] = 2
+    cache.expire()
+    with ThreadPoolExecutor(4) as pool:
+        values = list(pool.map(lambda _: cache.get(Session(engine)), range(4)))
+    assert len(cache.builds) == 2
+    assert first in values and len(set(map(id, values))) == 2
+
+def test_only_newer_versions_rebuild(table_versions):
+    cache = Counting(delay=0)
+    value = cache.get(Session(engine))
+    # A lagging replica reports older versions: keep the newer value.
+    table_versions["cached"] = 0
+    cache.expire()
+    assert cache.get(Session(engine)) is value
+    table_versions["cached"] = 2
+    cache.expire()
+    assert cache.get(Session(engine)) is not value
+    assert len(cache.builds) == 2
+
+def test_failed_build_is_not_kept(table_versions):
+    cache = Counting(fail=True)
+    with ThreadPoolExecutor(4) as pool:
+        results = [pool.submit(cache.get, Session(engine)) for _ in range(4)]
+    for result in results:
+        with pytest.raises(RuntimeError):
+            result.result()
+    cache.fail = False
+    assert cache.get(Session(engine)) is not None
+    assert len(cache.builds) == 2
+
+def test_async_callers_wait_off_the_loop(table_versions):
+    cache = Counting()
+
+    async def main():
+        async_engine = create_async_engine(ASYNC_DATABASE_URL)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def get():
+            async with AsyncSession(async_engine) as db:
+                return await db.run_sync(cache.get)
+
+        running = asyncio.create_task(ticker())
+        try:
+            values = await asyncio.gather(*(get() for _ in range(8)))
+        finally:
+            running.cancel()
+            await async_engine.dispose()
+        return values, ticks
+
+    values, ticks = asyncio.run(main())
+    assert len(cache.builds) == 1 and cache.builds[0].startswith("cache-build")
+    assert all(value is values[0] for value in values)
+    # The loop kept running during the 0.2 s build.
+    assert ticks >= 5